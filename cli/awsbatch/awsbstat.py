@@ -18,6 +18,7 @@ import re
 import sys
 from builtins import range
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import argparse
 
@@ -32,6 +33,10 @@ from awsbatch.utils import (
     shell_join,
 )
 
+# describe_jobs accepts up to DESCRIBE_JOBS_CHUNK_SIZE job ids per call, chunks are described concurrently
+DESCRIBE_JOBS_CHUNK_SIZE = 100
+DESCRIBE_JOBS_MAX_WORKERS = 10
+
 AWS_BATCH_JOB_STATUS = ["SUBMITTED", "PENDING", "RUNNABLE", "STARTING", "RUNNING", "SUCCEEDED", "FAILED"]
 
 
@@ -413,15 +418,33 @@ class AWSBstatCommand(object):
 
         describe_jobs API call has a hard limit on the number of job that can be
         retrieved with a single call. In case job_ids has more than 100 items, this function
-        distributes the describe_jobs call across multiple requests.
+        distributes the describe_jobs call across multiple requests, submitted concurrently.
+        Throttled requests are retried with backoff by the shared boto3 client.
 
         :param job_ids: list of ids for the jobs to describe.
-        :return: list of described jobs.
+        :return: list of described jobs, in the order of the chunks.
         """
+        jobs_chunks = [
+            job_ids[index : index + DESCRIBE_JOBS_CHUNK_SIZE]  # noqa: E203
+            for index in range(0, len(job_ids), DESCRIBE_JOBS_CHUNK_SIZE)
+        ]
+
+        def describe_jobs_chunk(jobs_chunk):
+            return self.batch_client.describe_jobs(jobs=jobs_chunk)["jobs"]
+
+        if len(jobs_chunks) <= 1:
+            described_chunks = [describe_jobs_chunk(jobs_chunk) for jobs_chunk in jobs_chunks]
+        else:
+            executor = ThreadPoolExecutor(max_workers=min(DESCRIBE_JOBS_MAX_WORKERS, len(jobs_chunks)))
+            try:
+                # map returns the results in the order of the chunks, whatever their completion order
+                described_chunks = list(executor.map(describe_jobs_chunk, jobs_chunks))
+            finally:
+                executor.shutdown(wait=True)
+
         jobs = []
-        for index in range(0, len(job_ids), 100):
-            jobs_chunk = job_ids[index : index + 100]  # noqa: E203
-            jobs.extend(self.batch_client.describe_jobs(jobs=jobs_chunk)["jobs"])
+        for described_chunk in described_chunks:
+            jobs.extend(described_chunk)
         return jobs
 
     def __add_jobs(self, jobs, details=False):
@@ -18,14 +18,14 @@ import logging
 import os
 from logging.handlers import RotatingFileHandler
 
-import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError, ParamValidationError
 from configparser import ConfigParser, NoOptionError, NoSectionError
 from tabulate import tabulate
 
 from awsbatch.utils import fail, get_region_by_stack_id, hide_keys
-from pcluster.config.pcluster_config import default_config_file_path
+from pcluster import boto3_clients
+from pcluster.constants import PCLUSTER_CONFIG_FILE
 
 PCLUSTER_STACK_PREFIX = "parallelcluster-"
 
@@ -120,7 +120,7 @@ class Boto3ClientFactory(object):
         :return: the boto3 client
         """
         try:
-            return boto3.client(
+            return boto3_clients.get_client(
                 service,
                 region_name=self.region,
                 aws_access_key_id=self.aws_access_key_id,
@@ -149,7 +149,7 @@ class AWSBatchCliConfig(object):
         self.aws_secret_access_key = None
         self.region = None
         self.env_blacklist = None
-        parallelcluster_config_file = default_config_file_path()
+        parallelcluster_config_file = os.path.expanduser(PCLUSTER_CONFIG_FILE)
         if os.path.isfile(parallelcluster_config_file):
             self.__init_from_parallelcluster_config(parallelcluster_config_file, log)
 
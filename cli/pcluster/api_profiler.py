@@ -0,0 +1,252 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from botocore.compat import urlencode
+
+from pcluster import boto3_clients, throttling
+
+LOGGER = logging.getLogger(__name__)
+
+START_TIME_CONTEXT_KEY = "pcluster_profiler_start_time"
+OPERATION_CONTEXT_KEY = "pcluster_profiler_operation"
+CALLER_CONTEXT_KEY = "pcluster_profiler_caller"
+REQUEST_BYTES_CONTEXT_KEY = "pcluster_profiler_request_bytes"
+
+_PCLUSTER_DIR = os.path.dirname(os.path.abspath(__file__))
+# Frames skipped when looking for the code calling the AWS API
+_SKIPPED_MODULES = ("api_profiler.py", "boto3_clients.py", "throttling.py")
+_SKIPPED_FUNCTIONS = ("retry_on_boto3_throttling", "paginate_boto3", "retry")
+
+
+class ApiProfiler(object):
+    """
+    Recorder of the AWS API calls done by the boto3 clients of the process.
+
+    The profiler is attached to the clients through a hook of the Boto3ClientRegistry and records, for every API call,
+    service, operation, region, latency (including retries), number of retries and throttles, bytes sent and received
+    and the pcluster function doing the call.
+    """
+
+    def __init__(self):
+        """Initialize a profiler with no recorded calls."""
+        self.calls = []
+        self.start_time = None
+        self.end_time = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Attach the profiler to all the boto3 clients created from now on."""
+        self.start_time = time.time()
+        boto3_clients.get_registry().register_client_hook(self.attach)
+
+    def stop(self):
+        """Stop recording the API calls."""
+        self.end_time = time.time()
+        boto3_clients.get_registry().unregister_client_hook(self.attach)
+
+    def attach(self, client, service):
+        """Register the profiler on the events of the given client, see Boto3ClientRegistry.register_client_hook."""
+        service_id = client.meta.service_model.service_id.hyphenize()
+        client.meta.events.register("before-call.{0}".format(service_id), self._before_call)
+        client.meta.events.register(
+            "after-call.{0}".format(service_id), _bind_handler(self._after_call, service, client.meta.region_name)
+        )
+        # Emitted by botocore when no response is received, e.g. on connection errors
+        client.meta.events.register(
+            "after-call-error.{0}".format(service_id),
+            _bind_handler(self._after_call_error, service, client.meta.region_name),
+        )
+
+    def get_summary(self):
+        """Return the recorded calls aggregated by service, operation and region, slowest first."""
+        summary = OrderedDict()
+        for call in self.calls:
+            key = (call["service"], call["operation"], call["region"])
+            if key not in summary:
+                summary[key] = {
+                    "service": call["service"],
+                    "operation": call["operation"],
+                    "region": call["region"],
+                    "calls": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "throttles": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                    "request_bytes": 0,
+                    "response_bytes": 0,
+                }
+            entry = summary[key]
+            entry["calls"] += 1
+            entry["errors"] += 1 if call["error"] else 0
+            entry["total_time"] += call["duration"]
+            entry["max_time"] = max(entry["max_time"], call["duration"])
+            for counter in ("retries", "throttles", "request_bytes", "response_bytes"):
+                entry[counter] += call[counter]
+        return sorted(summary.values(), key=lambda entry: entry["total_time"], reverse=True)
+
+    def print_summary(self, command):
+        """Print a table with the API calls done by the given command."""
+        summary = self.get_summary()
+        total_time = (self.end_time or time.time()) - self.start_time
+        LOGGER.info(
+            "\nAWS API calls of 'pcluster %s': %d calls, %.2f seconds spent in API calls, %.2f seconds elapsed",
+            command,
+            len(self.calls),
+            sum(call["duration"] for call in self.calls),
+            total_time,
+        )
+        if not summary:
+            return
+
+        row_format = "{0:<16} {1:<36} {2:<15} {3:>6} {4:>6} {5:>7} {6:>9} {7:>9} {8:>9} {9:>9} {10:>9} {11:>9}"
+        LOGGER.info(
+            row_format.format(
+                "Service",
+                "Operation",
+                "Region",
+                "Calls",
+                "Errors",
+                "Retries",
+                "Throttles",
+                "Total(s)",
+                "Avg(ms)",
+                "Max(ms)",
+                "Sent(KB)",
+                "Recv(KB)",
+            )
+        )
+        for entry in summary:
+            LOGGER.info(
+                row_format.format(
+                    entry["service"],
+                    entry["operation"] or "-",
+                    entry["region"] or "-",
+                    entry["calls"],
+                    entry["errors"],
+                    entry["retries"],
+                    entry["throttles"],
+                    "{0:.2f}".format(entry["total_time"]),
+                    "{0:.0f}".format(entry["total_time"] * 1000 / entry["calls"]),
+                    "{0:.0f}".format(entry["max_time"] * 1000),
+                    "{0:.1f}".format(entry["request_bytes"] / 1024.0),
+                    "{0:.1f}".format(entry["response_bytes"] / 1024.0),
+                )
+            )
+        throttling_stats = throttling.get_stats()
+        if throttling_stats.get("throttles"):
+            LOGGER.info(
+                "Throttled requests: %d, %.2f seconds spent in backoff, %.2f seconds waiting for the rate limiter",
+                throttling_stats.get("throttles"),
+                throttling_stats.get("backoff_time"),
+                throttling_stats.get("rate_limit_time"),
+            )
+
+    def write_trace(self, trace_file, command):
+        """Write all the recorded calls to the given file as JSON, to compare different runs."""
+        trace = OrderedDict(
+            [
+                ("command", command),
+                ("start_time", self.start_time),
+                ("duration", (self.end_time or time.time()) - self.start_time),
+                ("throttling", throttling.get_stats()),
+                ("summary", self.get_summary()),
+                ("calls", self.calls),
+            ]
+        )
+        with open(trace_file, "w") as trace_fd:
+            json.dump(trace, trace_fd, indent=2)
+        LOGGER.info("AWS API calls trace written to %s", trace_file)
+
+    def _before_call(self, model=None, params=None, context=None, **kwargs):
+        if context is None:
+            return
+        context[START_TIME_CONTEXT_KEY] = time.time()
+        context[OPERATION_CONTEXT_KEY] = model.name if model else None
+        context[CALLER_CONTEXT_KEY] = _get_caller()
+        context[REQUEST_BYTES_CONTEXT_KEY] = _get_body_size((params or {}).get("body"))
+
+    def _after_call(self, service, region, http_response=None, parsed=None, context=None, **kwargs):
+        headers = getattr(http_response, "headers", None) or {}
+        error = (parsed or {}).get("Error", {}).get("Code") if getattr(http_response, "status_code", 0) >= 300 else None
+        self._record_call(
+            service,
+            region,
+            context,
+            retries=(parsed or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0),
+            response_bytes=int(headers.get("content-length") or 0),
+            error=error,
+        )
+
+    def _after_call_error(self, service, region, exception=None, context=None, **kwargs):
+        self._record_call(service, region, context, error=type(exception).__name__)
+
+    def _record_call(self, service, region, context, retries=0, response_bytes=0, error=None):
+        context = context or {}
+        if START_TIME_CONTEXT_KEY not in context:
+            # Responses returned by before-call handlers (e.g. stubbed) are not sent, so they are not recorded
+            return
+        call = OrderedDict(
+            [
+                ("service", service),
+                ("operation", context.get(OPERATION_CONTEXT_KEY)),
+                ("region", region),
+                ("start_time", context.get(START_TIME_CONTEXT_KEY)),
+                ("duration", time.time() - context.get(START_TIME_CONTEXT_KEY)),
+                ("retries", retries),
+                ("throttles", context.get(throttling.THROTTLES_CONTEXT_KEY, 0)),
+                ("request_bytes", context.get(REQUEST_BYTES_CONTEXT_KEY, 0)),
+                ("response_bytes", response_bytes),
+                ("error", error),
+                ("caller", context.get(CALLER_CONTEXT_KEY)),
+            ]
+        )
+        with self._lock:
+            self.calls.append(call)
+
+
+def _bind_handler(handler, *args):
+    """Bind the given arguments to an event handler, botocore requires handlers to accept **kwargs."""
+
+    def _handler(**kwargs):
+        return handler(*args, **kwargs)
+
+    return _handler
+
+
+def _get_body_size(body):
+    """Return the size of the body of a request, query protocol bodies are dictionaries sent url-encoded."""
+    if isinstance(body, dict):
+        return len(urlencode(body, doseq=True))
+    return len(body) if body else 0
+
+
+def _get_caller():
+    """Return the innermost pcluster function in the stack of the current thread, as module.function:line."""
+    frame = sys._getframe(1)
+    while frame:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_PCLUSTER_DIR)
+            and os.path.basename(filename) not in _SKIPPED_MODULES
+            and frame.f_code.co_name not in _SKIPPED_FUNCTIONS
+        ):
+            module = os.path.splitext(os.path.relpath(filename, _PCLUSTER_DIR))[0].replace(os.sep, ".")
+            return "{0}.{1}:{2}".format(module, frame.f_code.co_name, frame.f_lineno)
+        frame = frame.f_back
+    return None
@@ -0,0 +1,200 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import logging
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+from pcluster import throttling
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_POOL_CONNECTIONS = 20
+MAX_POOL_CONNECTIONS_ENV = "AWS_PCLUSTER_MAX_POOL_CONNECTIONS"
+
+
+class Boto3ClientRegistry(object):
+    """
+    Process-wide registry of boto3 clients and resources.
+
+    Creating a boto3 client loads the service model and opens a new connection pool, so clients are built once and
+    shared by all the callers asking for the same service, region, credentials, endpoint and botocore configuration.
+    Clients are thread-safe and are shared among threads, while resources are not, so they are cached per thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clients = {}
+        self._resources = {}
+        self._client_hooks = []
+        self.max_pool_connections = None
+        self.retries = None
+
+    def configure(self, max_pool_connections=None, retries=None):
+        """
+        Set the botocore configuration used for all the clients created from now on.
+
+        Already created clients are dropped, so that next calls get clients built with the new configuration.
+        :param max_pool_connections: size of the connection pool of each client
+        :param retries: botocore retries configuration, e.g. {"max_attempts": 10, "mode": "standard"}
+        """
+        with self._lock:
+            self.max_pool_connections = max_pool_connections
+            self.retries = retries
+            self.reset()
+
+    def register_client_hook(self, hook):
+        """
+        Register a function to be called on every client created by the registry.
+
+        Hooks are useful to attach botocore event handlers to all the clients used by the CLI.
+        Already created clients are dropped, so that the hook is applied to all the clients returned from now on.
+        :param hook: function accepting the client and the service name
+        """
+        with self._lock:
+            if hook not in self._client_hooks:
+                self._client_hooks.append(hook)
+            self.reset()
+
+    def unregister_client_hook(self, hook):
+        """Remove a function previously registered with register_client_hook."""
+        with self._lock:
+            if hook in self._client_hooks:
+                self._client_hooks.remove(hook)
+            self.reset()
+
+    def reset(self):
+        """Drop all the cached clients and resources."""
+        with self._lock:
+            self._clients = {}
+            self._resources = {}
+
+    def get_client(self, service, region_name=None, aws_access_key_id=None, aws_secret_access_key=None, **kwargs):
+        """
+        Return a boto3 client for the given service, creating it if not already available.
+
+        Region and credentials default to the ones set in the environment (see PclusterConfig).
+        :param service: the name of the AWS service
+        :param region_name: the region to connect to
+        :param aws_access_key_id: AWS access key id
+        :param aws_secret_access_key: AWS secret access key
+        :param kwargs: additional arguments for boto3.client, like endpoint_url or a botocore Config object
+        """
+        client_args = self._get_session_args(region_name, aws_access_key_id, aws_secret_access_key, kwargs)
+        key = self._get_cache_key(service, client_args)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    LOGGER.debug(
+                        "Creating boto3 client for service %s in region %s", service, client_args.get("region_name")
+                    )
+                    client = boto3.client(service, **client_args)
+                    for hook in self._client_hooks:
+                        hook(client, service)
+                    self._clients[key] = client
+        return client
+
+    def get_resource(self, service, region_name=None, aws_access_key_id=None, aws_secret_access_key=None, **kwargs):
+        """
+        Return a boto3 resource for the given service, creating it if not already available for the current thread.
+
+        See get_client for the description of the parameters.
+        """
+        resource_args = self._get_session_args(region_name, aws_access_key_id, aws_secret_access_key, kwargs)
+        key = (threading.current_thread().ident,) + self._get_cache_key(service, resource_args)
+        resource = self._resources.get(key)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(key)
+                if resource is None:
+                    LOGGER.debug(
+                        "Creating boto3 resource for service %s in region %s", service, resource_args.get("region_name")
+                    )
+                    resource = boto3.resource(service, **resource_args)
+                    for hook in self._client_hooks:
+                        hook(resource.meta.client, service)
+                    self._resources[key] = resource
+        return resource
+
+    def _get_session_args(self, region_name, aws_access_key_id, aws_secret_access_key, kwargs):
+        """Build the arguments to pass to boto3, by merging the given ones with the registry configuration."""
+        session_args = dict(kwargs)
+        region_name = region_name or os.environ.get("AWS_DEFAULT_REGION")
+        if region_name:
+            session_args["region_name"] = region_name
+
+        # Credentials set in the environment (e.g. from the [aws] section of the config file) are passed explicitly,
+        # so that clients are never shared between different identities.
+        if not aws_access_key_id and not aws_secret_access_key:
+            aws_access_key_id = os.environ.get("AWS_ACCESS_KEY_ID")
+            aws_secret_access_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
+            if aws_access_key_id and aws_secret_access_key and os.environ.get("AWS_SESSION_TOKEN"):
+                session_args["aws_session_token"] = os.environ.get("AWS_SESSION_TOKEN")
+        if aws_access_key_id and aws_secret_access_key:
+            session_args["aws_access_key_id"] = aws_access_key_id
+            session_args["aws_secret_access_key"] = aws_secret_access_key
+
+        config = self._get_config()
+        if session_args.get("config"):
+            # Options explicitly set by the caller (e.g. proxies) take precedence.
+            # botocore updates the retries dictionary in place when creating a client, so options are copied.
+            config = config.merge(copy.deepcopy(session_args.get("config")))
+        session_args["config"] = config
+        return session_args
+
+    def _get_config(self):
+        """Return the botocore configuration shared by all the clients."""
+        max_pool_connections = self.max_pool_connections or int(
+            os.environ.get(MAX_POOL_CONNECTIONS_ENV, DEFAULT_MAX_POOL_CONNECTIONS)
+        )
+        config_args = {"max_pool_connections": max_pool_connections}
+        if self.retries:
+            config_args["retries"] = copy.deepcopy(self.retries)
+        return Config(**config_args)
+
+    @staticmethod
+    def _get_cache_key(service, session_args):
+        config = session_args.get("config")
+        return (
+            service,
+            session_args.get("region_name"),
+            session_args.get("aws_access_key_id"),
+            session_args.get("aws_secret_access_key"),
+            session_args.get("aws_session_token"),
+            session_args.get("endpoint_url"),
+            os.environ.get("AWS_PROFILE"),
+            repr(sorted(config._user_provided_options.items())) if config else None,
+        )
+
+
+_REGISTRY = Boto3ClientRegistry()
+# All the clients share the client-side rate limiting and the backoff on throttling errors
+_REGISTRY.register_client_hook(throttling.get_rate_limiter().attach)
+
+
+def get_registry():
+    """Return the process-wide Boto3ClientRegistry."""
+    return _REGISTRY
+
+
+def get_client(service, **kwargs):
+    """Return a shared boto3 client for the given service. See Boto3ClientRegistry.get_client."""
+    return _REGISTRY.get_client(service, **kwargs)
+
+
+def get_resource(service, **kwargs):
+    """Return a shared boto3 resource for the given service. See Boto3ClientRegistry.get_resource."""
+    return _REGISTRY.get_resource(service, **kwargs)
@@ -21,68 +21,109 @@ from logging.handlers import RotatingFileHandler
 import argparse
 from botocore.exceptions import NoCredentialsError
 
-import pcluster.cli_commands.delete as pcluster_delete
-import pcluster.cli_commands.start as pcluster_start
-import pcluster.cli_commands.stop as pcluster_stop
-import pcluster.cli_commands.update as pcluster_update
-import pcluster.commands as pcluster
-import pcluster.configure.easyconfig as easyconfig
-import pcluster.createami as createami
-import pcluster.utils as utils
-from pcluster.dcv.connect import dcv_connect
+from pcluster.constants import PCLUSTER_CLI_LOG_FILE
+
+# Command modules, boto3 and the configuration mappings are imported only when the command runs,
+# so that commands like "pcluster version" or "pcluster --help" don't pay for loading them.
 
 LOGGER = logging.getLogger(__name__)
 
 
 def create(args):
+    import pcluster.commands as pcluster
+
     pcluster.create(args)
 
 
 def configure(args):
+    import pcluster.configure.easyconfig as easyconfig
+
     easyconfig.configure(args)
 
 
 def ssh(args, extra_args):
+    import pcluster.commands as pcluster
+
     pcluster.ssh(args, extra_args)
 
 
 def dcv(args):
+    from pcluster.dcv.connect import dcv_connect
+
     dcv_connect(args)
 
 
 def status(args):
-    pcluster.status(args)
+    if args.watch:
+        import pcluster.cli_commands.watch as pcluster_watch
+
+        pcluster_watch.watch(args)
+    else:
+        import pcluster.commands as pcluster
+        from pcluster.utils import error
+
+        if len(args.cluster_name) > 1:
+            error("Multiple clusters can be given only with --watch")
+        args.cluster_name = args.cluster_name[0]
+        pcluster.status(args)
 
 
 def list_stacks(args):
+    import pcluster.commands as pcluster
+
     pcluster.list_stacks(args)
 
 
 def delete(args):
-    pcluster_delete.delete(args)
+    import pcluster.cli_commands.delete as pcluster_delete
+    from pcluster.utils import is_cluster_pattern
+
+    if len(args.cluster_name) > 1 or is_cluster_pattern(args.cluster_name[0]):
+        pcluster_delete.delete_clusters(args)
+    else:
+        args.cluster_name = args.cluster_name[0]
+        pcluster_delete.delete(args)
 
 
 def instances(args):
+    import pcluster.commands as pcluster
+
     pcluster.instances(args)
 
 
+def timeline(args):
+    import pcluster.cli_commands.timeline as pcluster_timeline
+
+    pcluster_timeline.timeline(args)
+
+
 def update(args):
+    import pcluster.cli_commands.update as pcluster_update
+
     pcluster_update.execute(args)
 
 
 def version(args):
-    print(pcluster.version())
+    from pcluster.version import get_installed_version
+
+    print(get_installed_version())
 
 
 def start(args):
+    import pcluster.cli_commands.start as pcluster_start
+
     pcluster_start.start(args)
 
 
 def stop(args):
+    import pcluster.cli_commands.stop as pcluster_stop
+
     pcluster_stop.stop(args)
 
 
 def create_ami(args):
+    import pcluster.createami as createami
+
     createami.create_ami(args)
 
 
@@ -96,7 +137,7 @@ def config_logger():
     log_stream_handler.setFormatter(logging.Formatter("%(message)s"))
     logger.addHandler(log_stream_handler)
 
-    logfile = utils.get_cli_log_file()
+    logfile = os.path.expanduser(PCLUSTER_CLI_LOG_FILE)
     try:
         os.makedirs(os.path.dirname(logfile))
     except OSError as e:
@@ -124,6 +165,15 @@ def _addarg_nowait(subparser):
     )
 
 
+def _addarg_refresh_cache(subparser):
+    subparser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        default=False,
+        help="Ignores the EC2 instance types metadata cached in ~/.parallelcluster/cache and retrieves them again.",
+    )
+
+
 def _get_parser():
     """
     Initialize ArgumentParser for pcluster commands.
@@ -135,6 +185,17 @@ def _get_parser():
         "launching and management of HPC clusters in the AWS cloud.",
         epilog='For command specific flags, please run: "pcluster [command] --help"',
     )
+    parser.add_argument(
+        "--profile-api",
+        action="store_true",
+        default=False,
+        help="Prints a summary of the AWS API calls done by the command, with their latency, retries and throttles.",
+    )
+    parser.add_argument(
+        "--profile-api-trace",
+        metavar="TRACE_FILE",
+        help="Writes all the AWS API calls done by the command to the given JSON file. Implies --profile-api.",
+    )
     subparsers = parser.add_subparsers()
     subparsers.required = True
     subparsers.dest = "command"
@@ -162,6 +223,7 @@ Examples::
     _addarg_config(pcreate)
     _addarg_region(pcreate)
     _addarg_nowait(pcreate)
+    _addarg_refresh_cache(pcreate)
     pcreate.add_argument(
         "-nr", "--norollback", action="store_true", default=False, help="Disables stack rollback on error."
     )
@@ -203,6 +265,7 @@ Examples::
     _addarg_config(pupdate)
     _addarg_region(pupdate)
     _addarg_nowait(pupdate)
+    _addarg_refresh_cache(pupdate)
     pupdate.add_argument(
         "-nr",
         "--norollback",
@@ -243,7 +306,12 @@ Examples::
         'it is safe to "Ctrl-C" out. You can return to that status by '
         'calling "pcluster status mycluster".',
     )
-    pdelete.add_argument("cluster_name", help="Names the cluster to delete.")
+    pdelete.add_argument(
+        "cluster_name",
+        nargs="+",
+        help="Names the cluster to delete. Multiple cluster names or patterns (e.g. 'test-*') can be provided "
+        "to delete the clusters together.",
+    )
     pdelete.add_argument(
         "--keep-logs",
         action="store_true",
@@ -284,10 +352,21 @@ Examples::
 
     # status command subparser
     pstatus = subparsers.add_parser("status", help="Pulls the current status of the cluster.")
-    pstatus.add_argument("cluster_name", help="Shows the status of the cluster with the name provided here.")
+    pstatus.add_argument(
+        "cluster_name",
+        nargs="+",
+        help="Shows the status of the cluster with the name provided here. "
+        "With --watch, multiple cluster names or patterns (e.g. 'prod-*') can be provided.",
+    )
     _addarg_config(pstatus)
     _addarg_region(pstatus)
     _addarg_nowait(pstatus)
+    pstatus.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="Shows a dashboard with the status of all the clusters provided, refreshed until interrupted.",
+    )
     pstatus.set_defaults(func=status)
 
     # list command subparser
@@ -297,6 +376,12 @@ Examples::
         epilog="This command lists the names of any CloudFormation stacks named parallelcluster-*",
     )
     plist.add_argument("--color", action="store_true", default=False, help="Display the cluster status in color.")
+    plist.add_argument(
+        "--details",
+        action="store_true",
+        default=False,
+        help="Display the compute fleet status, the master server state and the number of compute instances.",
+    )
     _addarg_config(plist)
     _addarg_region(plist)
     plist.set_defaults(func=list_stacks)
@@ -308,6 +393,21 @@ Examples::
     _addarg_region(pinstances)
     pinstances.set_defaults(func=instances)
 
+    # timeline command subparser
+    ptimeline = subparsers.add_parser(
+        "timeline",
+        help="Displays the time spent creating the resources of a cluster.",
+        description="Rebuild the creation timeline of the resources of the cluster stack and of its substacks from "
+        "the stack events, and display the critical path, the resources that determined the creation time.",
+    )
+    ptimeline.add_argument("cluster_name", help="Display the timeline of the cluster with the name provided here.")
+    ptimeline.add_argument(
+        "--json", action="store_true", default=False, help="Display the timeline in JSON format, to export it."
+    )
+    _addarg_config(ptimeline)
+    _addarg_region(ptimeline)
+    ptimeline.set_defaults(func=timeline)
+
     # ssh command subparser
     ssh_example = textwrap.dedent(
         """Example::
@@ -406,12 +506,14 @@ Variables substituted::
     pami_group2.add_argument("--vpc-id", help="Specifies the VPC to use to build the AWS ParallelCluster AMI.")
     pami_group2.add_argument("--subnet-id", help="Specifies the Subnet to use to build the AWS ParallelCluster AMI.")
     _addarg_region(pami)
+    _addarg_refresh_cache(pami)
     pami.set_defaults(template_url=None)
     pami.set_defaults(func=create_ami)
 
     # configure command subparser
     pconfigure = subparsers.add_parser("configure", help="Start the AWS ParallelCluster configuration.")
     _addarg_config(pconfigure)
+    _addarg_refresh_cache(pconfigure)
     pconfigure.set_defaults(func=configure)
 
     # version command subparser
@@ -441,6 +543,29 @@ Variables substituted::
     return parser
 
 
+def _start_api_profiler(args):
+    """Start recording the AWS API calls if required by the command line arguments."""
+    if not args.profile_api and not args.profile_api_trace:
+        return None
+    from pcluster.api_profiler import ApiProfiler
+
+    api_profiler = ApiProfiler()
+    api_profiler.start()
+    return api_profiler
+
+
+def _stop_api_profiler(api_profiler, args):
+    """Stop recording the AWS API calls, then print the summary and write the trace file if required."""
+    api_profiler.stop()
+    command = " ".join(filter(None, [args.command, getattr(args, "subcommand", None)]))
+    try:
+        api_profiler.print_summary(command)
+        if args.profile_api_trace:
+            api_profiler.write_trace(args.profile_api_trace, command)
+    except Exception as e:
+        LOGGER.error("Unable to report the AWS API calls: %s", e)
+
+
 def main():
     config_logger()
 
@@ -451,11 +576,17 @@ def main():
     args, extra_args = parser.parse_known_args()
     LOGGER.debug(args)
 
+    api_profiler = _start_api_profiler(args)
     try:
         # set region in the environment to make it available to all the boto3 calls
         if "region" in args and args.region:
             os.environ["AWS_DEFAULT_REGION"] = args.region
 
+        if "refresh_cache" in args and args.refresh_cache:
+            from pcluster import metadata_cache
+
+            metadata_cache.get_cache().refresh = True
+
         if args.func.__name__ == "ssh":
             args.func(args, extra_args)
         else:
@@ -473,6 +604,9 @@ def main():
     except Exception as e:
         LOGGER.exception("Unexpected error of type %s: %s", type(e).__name__, e)
         sys.exit(1)
+    finally:
+        if api_profiler:
+            _stop_api_profiler(api_profiler, args)
 
 
 if __name__ == "__main__":
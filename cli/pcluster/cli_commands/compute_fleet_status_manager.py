@@ -12,9 +12,10 @@ import logging
 import time
 from enum import Enum
 
-import boto3
 from boto3.dynamodb.conditions import Attr
 
+from pcluster import boto3_clients
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -65,17 +66,19 @@ class ComputeFleetStatusManager:
 
     def __init__(self, cluster_name):
         self._table_name = "parallelcluster-" + cluster_name
-        self._ddb_resource = boto3.resource("dynamodb")
+        self._ddb_resource = boto3_clients.get_resource("dynamodb")
         self._table = self._ddb_resource.Table(self._table_name)
 
-    def get_status(self, fallback=None):
-        """Get compute fleet status."""
+    def get_status(self, fallback=None, raise_on_error=False):
+        """Get compute fleet status, the fallback is returned on failure unless raise_on_error is True."""
         try:
             compute_fleet_status = self._table.get_item(ConsistentRead=True, Key={"Id": self.COMPUTE_FLEET_STATUS_KEY})
             if not compute_fleet_status or "Item" not in compute_fleet_status:
                 raise Exception("COMPUTE_FLEET status not found in db table")
             return ComputeFleetStatus(compute_fleet_status["Item"][self.COMPUTE_FLEET_STATUS_ATTRIBUTE])
         except Exception as e:
+            if raise_on_error:
+                raise
             LOGGER.error("Failed when retrieving fleet status from DynamoDB with error %s", e)
             return fallback
 
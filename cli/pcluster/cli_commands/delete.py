@@ -10,18 +10,30 @@
 # limitations under the License.
 import logging
 import sys
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from pcluster import utils
+from pcluster import boto3_clients, utils
 from pcluster.config.pcluster_config import PclusterConfig
-from pcluster.utils import NodeType, paginate_boto3
+from pcluster.utils import NodeType
 
 LOGGER = logging.getLogger(__name__)
 
+# Clusters deleted together are deleted and polled concurrently, by up to DELETE_MAX_WORKERS workers
+DELETE_MAX_WORKERS = 10
+DELETE_POLL_INTERVAL = 5
+FINAL_DELETE_STATUSES = ["DELETE_COMPLETE", "DELETE_FAILED"]
+# Maximum number of instances returned by a DescribeInstances page, each page is terminated with a single call
+TERMINATE_BATCH_SIZE = 1000
+TERMINATE_MAX_WORKERS = 4
+# The compute nodes are described again until none is found, up to TERMINATE_MAX_PASSES times
+TERMINATE_MAX_PASSES = 3
+
 
 def delete(args):
     PclusterConfig.init_aws(config_file=args.config_file)
@@ -42,6 +54,182 @@ def delete(args):
     _delete_cluster(args.cluster_name, args.nowait)
 
 
+class ClusterDeletion(object):
+    """Deletion of one of the clusters deleted together by delete_clusters."""
+
+    def __init__(self, cluster_name):
+        """Initialize the deletion of the given cluster, not started yet."""
+        self.cluster_name = cluster_name
+        self.stack_name = utils.get_stack_name(cluster_name)
+        # The stack is followed by id, since its name doesn't refer to it anymore once deleted
+        self.stack_id = None
+        self.stack_status = None
+        self.event_tailer = None
+        # Message of the error that stopped the deletion, if any
+        self.error = None
+
+    def is_done(self):
+        """Return True if the deletion of the stack is not in progress anymore."""
+        return self.error is not None or self.stack_status in FINAL_DELETE_STATUSES
+
+    def get_result(self):
+        """Return the result of the deletion shown to the user."""
+        return "ERROR: {0}".format(self.error) if self.error else self.stack_status
+
+
+def delete_clusters(args):
+    """
+    Delete the clusters matching the given names or patterns, and follow their deletion together.
+
+    All the stacks are deleted upfront, then their status and their events are polled together until every deletion
+    is completed. The compute nodes of each cluster are terminated as soon as the deletion of its stack is completed.
+    """
+    PclusterConfig.init_aws(config_file=args.config_file)
+    cluster_names = utils.expand_cluster_patterns(args.cluster_name)
+    if not cluster_names:
+        utils.error("No cluster found matching {0}".format(", ".join(args.cluster_name)))
+    LOGGER.info("Deleting: %s", ", ".join(cluster_names))
+
+    deletions = [ClusterDeletion(cluster_name) for cluster_name in cluster_names]
+    executor = ThreadPoolExecutor(max_workers=min(DELETE_MAX_WORKERS, len(deletions)))
+    terminate_futures = []
+    try:
+        for future in [
+            executor.submit(_start_cluster_deletion, deletion, args.keep_logs, args.nowait) for deletion in deletions
+        ]:
+            future.result()
+        # As for a single cluster, the compute nodes of the clusters already deleted are terminated even with nowait,
+        # while the ones of the clusters being deleted are terminated only once their deletion has been awaited
+        terminate_futures.extend(
+            executor.submit(_terminate_cluster_nodes, deletion.stack_name)
+            for deletion in deletions
+            if deletion.stack_id is None and deletion.error is None
+        )
+        if not args.nowait:
+            _wait_for_cluster_deletions(deletions, executor, terminate_futures)
+        for future in terminate_futures:
+            future.result()
+    except KeyboardInterrupt:
+        # As for a single cluster, no compute node is terminated anymore once interrupted
+        for future in terminate_futures:
+            future.cancel()
+        LOGGER.info("\nExiting...")
+        sys.exit(0)
+    finally:
+        executor.shutdown(wait=False)
+
+    _print_deletion_results(deletions, args.nowait)
+
+
+def _start_cluster_deletion(deletion, keep_logs, nowait):
+    """Delete the stack of the given cluster, after persisting its log groups if required."""
+    try:
+        stack = utils.get_stack(deletion.stack_name, raise_on_error=True)
+    except ClientError as e:
+        message = e.response.get("Error").get("Message")
+        if message.endswith("does not exist"):
+            if keep_logs:
+                LOGGER.warning(
+                    "Stack for %s does not exist. Cannot prevent its log groups from being deleted.",
+                    deletion.cluster_name,
+                )
+            LOGGER.warning("Cluster %s has already been deleted.", deletion.cluster_name)
+            deletion.stack_status = "DELETE_COMPLETE"
+        else:
+            deletion.error = message
+        return
+
+    deletion.stack_id = stack.get("StackId")
+    try:
+        if keep_logs:
+            _persist_cloudwatch_log_groups(deletion.cluster_name)
+        if not nowait:
+            deletion.event_tailer = utils.StackEventTailer(deletion.stack_id)
+            deletion.event_tailer.skip_existing_events()
+        boto3_clients.get_client("cloudformation").delete_stack(StackName=deletion.stack_id)
+        deletion.stack_status = "DELETE_IN_PROGRESS"
+    except ClientError as e:
+        deletion.error = e.response.get("Error").get("Message")
+    except SystemExit as e:
+        # Errors are reported through sys.exit, they must stop the deletion of this cluster only
+        deletion.error = str(e.code)
+
+
+def _wait_for_cluster_deletions(deletions, executor, terminate_futures):
+    """
+    Poll the clusters being deleted until all the deletions are completed, printing their events and progress.
+
+    :param terminate_futures: list extended with the futures of the termination of the compute nodes of the
+    clusters whose deletion is completed
+    """
+    in_progress = [deletion for deletion in deletions if not deletion.is_done()]
+    while in_progress:
+        _print_deletion_progress(deletions)
+        time.sleep(DELETE_POLL_INTERVAL)
+        events = []
+        for future in [executor.submit(_refresh_cluster_deletion, deletion) for deletion in in_progress]:
+            events.extend(future.result())
+        _print_cluster_events(sorted(events, key=lambda cluster_event: cluster_event[1].get("Timestamp")))
+
+        for deletion in in_progress:
+            if deletion.is_done():
+                terminate_futures.append(executor.submit(_terminate_cluster_nodes, deletion.stack_name))
+        in_progress = [deletion for deletion in in_progress if not deletion.is_done()]
+    _print_deletion_progress(deletions)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def _refresh_cluster_deletion(deletion):
+    """Refresh the status of the given deletion and return the new events of its stack, with the cluster name."""
+    try:
+        deletion.stack_status = utils.get_stack(deletion.stack_id, raise_on_error=True).get("StackStatus")
+        return [(deletion.cluster_name, event) for event in deletion.event_tailer.poll()]
+    except ClientError as e:
+        deletion.error = e.response.get("Error").get("Message")
+        return []
+
+
+def _print_cluster_events(cluster_events):
+    for cluster_name, event in cluster_events:
+        resource_status = "%s: %s - %s" % (cluster_name, event.get("LogicalResourceId"), event.get("ResourceStatus"))
+        if event.get("ResourceStatusReason"):
+            resource_status += " - %s" % event.get("ResourceStatusReason")
+        sys.stdout.write("\r\033[K%s\n" % resource_status)
+    sys.stdout.flush()
+
+
+def _print_deletion_progress(deletions):
+    """Print the number of clusters by deletion status, on a line rewritten at every poll."""
+    counts = OrderedDict()
+    for deletion in deletions:
+        result = "ERROR" if deletion.error else deletion.stack_status
+        counts[result] = counts.get(result, 0) + 1
+    progress = ", ".join("{0} {1}".format(count, result) for result, count in counts.items())
+    sys.stdout.write("\r\033[KStatus: %s" % progress)
+    sys.stdout.flush()
+
+
+def _print_deletion_results(deletions, nowait):
+    """Print the result of the deletion of every cluster, exiting with an error if any deletion failed."""
+    name_width = max(len(deletion.cluster_name) for deletion in deletions)
+    for deletion in deletions:
+        LOGGER.info("%s  %s", deletion.cluster_name.ljust(name_width), deletion.get_result())
+    failed_deletions = [
+        deletion
+        for deletion in deletions
+        if deletion.error or (not nowait and deletion.stack_status != "DELETE_COMPLETE")
+    ]
+    if failed_deletions:
+        LOGGER.info(
+            "%d of %d clusters did not delete successfully. Run 'pcluster delete' again for: %s",
+            len(failed_deletions),
+            len(deletions),
+            " ".join(deletion.cluster_name for deletion in failed_deletions),
+        )
+        sys.exit(1)
+
+
 def _persist_cloudwatch_log_groups(cluster_name):
     """Enable cluster's CloudWatch log groups to persist past cluster deletion."""
     LOGGER.info("Configuring {0}'s CloudWatch log groups to persist past cluster deletion.".format(cluster_name))
@@ -80,11 +268,14 @@ def _persist_stack_resources(stack, template, keys):
 
 def _delete_cluster(cluster_name, nowait):
     """Delete cluster described by cluster_name."""
-    cfn = boto3.client("cloudformation")
+    cfn = boto3_clients.get_client("cloudformation")
     saw_update = False
     terminate_compute_fleet = not nowait
     stack_name = utils.get_stack_name(cluster_name)
     try:
+        if not nowait:
+            event_tailer = utils.StackEventTailer(stack_name)
+            event_tailer.skip_existing_events()
         # delete_stack does not raise an exception if stack does not exist
         # Use describe_stacks to explicitly check if the stack exists
         cfn.delete_stack(StackName=stack_name)
@@ -97,12 +288,7 @@ def _delete_cluster(cluster_name, nowait):
             while stack_status == "DELETE_IN_PROGRESS":
                 time.sleep(5)
                 stack_status = utils.get_stack(stack_name, cfn, raise_on_error=True).get("StackStatus")
-                events = utils.get_stack_events(stack_name, raise_on_error=True)[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
+                utils.print_stack_events(event_tailer.poll())
             sys.stdout.write("\rStatus: %s\n" % stack_status)
             sys.stdout.flush()
             LOGGER.debug("Status: %s", stack_status)
@@ -129,31 +315,113 @@ def _delete_cluster(cluster_name, nowait):
 
 
 def _terminate_cluster_nodes(stack_name):
+    """
+    Terminate the compute nodes of the cluster, which are described and terminated in a pipeline.
+
+    Every page of described instances is terminated by a pool of workers while the following page is described.
+    Since terminating the nodes changes the instances matching the filters while paginating, the nodes are described
+    again until a pass finds none of them.
+    """
     try:
         LOGGER.debug("Compute fleet clean-up: STARTED")
         # FIXME: improve messaging when cluster does not exist
         LOGGER.info("\nChecking if there are any running compute fleet nodes that require termination")
-        ec2 = boto3.client("ec2", config=Config(retries={"max_attempts": 10}))
+        ec2 = boto3_clients.get_client("ec2", config=Config(retries={"max_attempts": 10}))
+        progress = _TerminationProgress(stack_name)
 
-        for instance_ids in _describe_instance_ids_iterator(stack_name):
-            LOGGER.info("Terminating following instances: %s", instance_ids)
-            if instance_ids:
-                ec2.terminate_instances(InstanceIds=instance_ids)
+        for _ in range(TERMINATE_MAX_PASSES):
+            if not _terminate_instances(ec2, stack_name, progress):
+                break
+        else:
+            LOGGER.warning(
+                "Compute fleet nodes were still found after %d checks, some of them may still be running",
+                TERMINATE_MAX_PASSES,
+            )
 
+        if progress.count:
+            LOGGER.info(
+                "Requested termination of %d compute fleet nodes of %s in %.1f seconds (%.1f nodes/s)",
+                progress.count,
+                stack_name,
+                progress.get_elapsed_time(),
+                progress.get_throughput(),
+            )
         LOGGER.debug("Compute fleet clean-up: COMPLETED")
     except Exception as e:
         LOGGER.error("Failed when checking for running EC2 instances with error: %s", e)
 
 
-def _describe_instance_ids_iterator(stack_name, instance_state=("pending", "running", "stopping", "stopped")):
-    ec2 = boto3.client("ec2")
+class _TerminationProgress(object):
+    """Number of compute nodes whose termination has been requested, shared by the termination workers."""
+
+    def __init__(self, stack_name):
+        self.stack_name = stack_name
+        self.count = 0
+        self._start_time = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, instance_ids):
+        with self._lock:
+            self.count += len(instance_ids)
+            LOGGER.info(
+                "Terminating compute fleet nodes of %s: %d requested (%.1f nodes/s)",
+                self.stack_name,
+                self.count,
+                self.get_throughput(),
+            )
+
+    def get_elapsed_time(self):
+        return time.time() - self._start_time
+
+    def get_throughput(self):
+        return self.count / max(self.get_elapsed_time(), 0.001)
+
+
+def _terminate_instances(ec2, stack_name, progress):
+    """
+    Describe the compute nodes page by page and terminate every page with a bounded pool of workers.
+
+    When all the workers are busy the next page is described only after one of them completes.
+    :return: the number of compute nodes found
+    """
+    instances_count = 0
+    executor = ThreadPoolExecutor(max_workers=TERMINATE_MAX_WORKERS)
+    try:
+        pending_futures = set()
+        for instance_ids in _describe_instance_ids_iterator(stack_name, ec2=ec2):
+            if len(pending_futures) >= TERMINATE_MAX_WORKERS:
+                done_futures, pending_futures = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    future.result()
+            pending_futures.add(executor.submit(_terminate_instances_batch, ec2, instance_ids, progress))
+            instances_count += len(instance_ids)
+        for future in pending_futures:
+            future.result()
+    finally:
+        executor.shutdown(wait=True)
+    return instances_count
+
+
+def _terminate_instances_batch(ec2, instance_ids, progress):
+    LOGGER.debug("Terminating following instances: %s", instance_ids)
+    ec2.terminate_instances(InstanceIds=instance_ids)
+    progress.add(instance_ids)
+
+
+def _describe_instance_ids_iterator(stack_name, instance_state=("pending", "running", "stopping", "stopped"), ec2=None):
+    """Return a generator of the ids of the compute nodes, up to TERMINATE_BATCH_SIZE per page."""
+    ec2 = ec2 or boto3_clients.get_client("ec2")
     filters = [
         {"Name": "tag:Application", "Values": [stack_name]},
         {"Name": "instance-state-name", "Values": list(instance_state)},
         {"Name": "tag:aws-parallelcluster-node-type", "Values": [str(NodeType.compute)]},
     ]
-    for page in paginate_boto3(ec2.describe_instances, Filters=filters, PaginationConfig={"PageSize": 100}):
-        instances = []
-        for instance in page.get("Instances", []):
-            instances.append(instance.get("InstanceId"))
-        yield instances
+    paginator = ec2.get_paginator("describe_instances")
+    for page in paginator.paginate(Filters=filters, PaginationConfig={"PageSize": TERMINATE_BATCH_SIZE}):
+        instance_ids = [
+            instance.get("InstanceId")
+            for reservation in page.get("Reservations", [])
+            for instance in reservation.get("Instances", [])
+        ]
+        if instance_ids:
+            yield instance_ids
@@ -13,10 +13,9 @@ import logging
 import sys
 from abc import abstractmethod
 
-import boto3
 from botocore.exceptions import ClientError
 
-from pcluster import utils
+from pcluster import boto3_clients, utils
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus, ComputeFleetStatusManager
 from pcluster.config.pcluster_config import PclusterConfig
 from pcluster.utils import error
@@ -29,14 +28,20 @@ else:
 LOGGER = logging.getLogger(__name__)
 
 
-def start(args):
-    """Start cluster compute fleet."""
+def start(args, stack_snapshot=None):
+    """
+    Start cluster compute fleet.
+
+    :param args: pcluster CLI args
+    :param stack_snapshot: ClusterStackSnapshot of the cluster stack, described once and shared with the configuration
+    """
     pcluster_config = PclusterConfig(
         config_file=args.config_file,
         cluster_name=args.cluster_name,
         auto_refresh=False,
         enforce_version=False,
         skip_load_json_config=True,
+        stack_snapshot=stack_snapshot,
     )
     pcluster_config.cluster_model.get_start_command(pcluster_config).start(args, pcluster_config)
 
@@ -61,13 +66,13 @@ class AWSBatchStartCommand(StartCommand):
         max_vcpus = cluster_section.get_param_value("max_vcpus")
         desired_vcpus = cluster_section.get_param_value("desired_vcpus")
         min_vcpus = cluster_section.get_param_value("min_vcpus")
-        ce_name = utils.get_batch_ce(stack_name)
+        ce_name = utils.get_batch_ce(stack_name, pcluster_config.stack_snapshot)
         self._start_batch_ce(ce_name=ce_name, min_vcpus=min_vcpus, desired_vcpus=desired_vcpus, max_vcpus=max_vcpus)
 
     @staticmethod
     def _start_batch_ce(ce_name, min_vcpus, desired_vcpus, max_vcpus):
         try:
-            boto3.client("batch").update_compute_environment(
+            boto3_clients.get_client("batch").update_compute_environment(
                 computeEnvironment=ce_name,
                 state="ENABLED",
                 computeResources={
@@ -95,7 +100,7 @@ class SITStartCommand(StartCommand):
             if cluster_section.get_param_value("maintain_initial_size")
             else 0
         )
-        asg_name = utils.get_asg_name(stack_name)
+        asg_name = utils.get_asg_name(stack_name, pcluster_config.stack_snapshot)
         utils.set_asg_limits(asg_name=asg_name, min=min_desired_size, max=max_queue_size, desired=min_desired_size)
 
 
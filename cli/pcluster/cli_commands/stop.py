@@ -12,9 +12,7 @@ import abc
 import logging
 import sys
 
-import boto3
-
-from pcluster import utils
+from pcluster import boto3_clients, utils
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus, ComputeFleetStatusManager
 from pcluster.config.pcluster_config import PclusterConfig
 from pcluster.utils import error
@@ -27,14 +25,20 @@ else:
 LOGGER = logging.getLogger(__name__)
 
 
-def stop(args):
-    """Stop cluster compute fleet."""
+def stop(args, stack_snapshot=None):
+    """
+    Stop cluster compute fleet.
+
+    :param args: pcluster CLI args
+    :param stack_snapshot: ClusterStackSnapshot of the cluster stack, described once and shared with the configuration
+    """
     pcluster_config = PclusterConfig(
         config_file=args.config_file,
         cluster_name=args.cluster_name,
         auto_refresh=False,
         enforce_version=False,
         skip_load_json_config=True,
+        stack_snapshot=stack_snapshot,
     )
     pcluster_config.cluster_model.get_stop_command(pcluster_config).stop(args, pcluster_config)
 
@@ -55,12 +59,12 @@ class AWSBatchStopCommand(StopCommand):
         """Stop the compute fleet."""
         LOGGER.info("Disabling AWS Batch compute environment : %s", args.cluster_name)
         stack_name = utils.get_stack_name(args.cluster_name)
-        ce_name = utils.get_batch_ce(stack_name)
+        ce_name = utils.get_batch_ce(stack_name, pcluster_config.stack_snapshot)
         self._stop_batch_ce(ce_name=ce_name)
 
     @staticmethod
     def _stop_batch_ce(ce_name):
-        boto3.client("batch").update_compute_environment(computeEnvironment=ce_name, state="DISABLED")
+        boto3_clients.get_client("batch").update_compute_environment(computeEnvironment=ce_name, state="DISABLED")
 
 
 class SITStopCommand(StopCommand):
@@ -70,7 +74,7 @@ class SITStopCommand(StopCommand):
         """Stop the compute fleet."""
         LOGGER.info("Stopping compute fleet: %s", args.cluster_name)
         stack_name = utils.get_stack_name(args.cluster_name)
-        asg_name = utils.get_asg_name(stack_name)
+        asg_name = utils.get_asg_name(stack_name, pcluster_config.stack_snapshot)
         utils.set_asg_limits(asg_name=asg_name, min=0, max=0, desired=0)
 
 
@@ -0,0 +1,215 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import datetime
+import json
+import logging
+from collections import OrderedDict
+
+from pcluster import utils
+from pcluster.config.pcluster_config import PclusterConfig
+
+LOGGER = logging.getLogger(__name__)
+
+CREATE_START_STATUS = "CREATE_IN_PROGRESS"
+CREATE_END_STATUSES = ["CREATE_COMPLETE", "CREATE_FAILED"]
+GANTT_WIDTH = 50
+
+
+class ResourceInterval(object):
+    """Time spent by CloudFormation creating a resource of the cluster stack or of one of its substacks."""
+
+    def __init__(self, stack_id, logical_id, resource_type, start):
+        """Initialize the interval of a resource whose creation is in progress."""
+        self.stack_id = stack_id
+        # Logical id of the substack in the cluster stack, None for the resources of the cluster stack
+        self.stack = None
+        self.logical_id = logical_id
+        self.resource_type = resource_type
+        self.start = start
+        self.end = None
+        self.status = CREATE_START_STATUS
+        self.critical = False
+
+    @property
+    def name(self):
+        """Return the name of the resource, prefixed by the substack containing it."""
+        return "{0}/{1}".format(self.stack, self.logical_id) if self.stack else self.logical_id
+
+    @property
+    def duration(self):
+        """Return the creation time of the resource, in seconds."""
+        return (self.end - self.start).total_seconds()
+
+    def is_stack(self):
+        """Return True if the resource is a substack, whose interval includes the ones of its resources."""
+        return self.resource_type == utils.STACK_TYPE
+
+
+def timeline(args):
+    """Print the creation timeline of the cluster stack and of its substacks, with its critical path."""
+    PclusterConfig.init_aws(config_file=args.config_file)
+    stack = utils.get_stack(utils.get_stack_name(args.cluster_name))
+    intervals = get_resource_intervals(utils.StackEventTailer(stack.get("StackId")).poll())
+    if not intervals:
+        utils.error("No resource creation events found for the cluster {0}".format(args.cluster_name))
+
+    critical_path = get_critical_path(intervals)
+    if args.json:
+        LOGGER.info(json.dumps(_get_timeline_json(args.cluster_name, intervals, critical_path), indent=2))
+    else:
+        _print_timeline(args.cluster_name, intervals, critical_path)
+
+
+def get_resource_intervals(events):
+    """
+    Rebuild the creation intervals of the resources from the given stack events, sorted by start time.
+
+    Only the last creation of every resource is considered, so that the intervals are not affected by the stack
+    updates. The creation of the resources still in progress is considered ended at the time of the last event.
+
+    :param events: events of the cluster stack and of its substacks, from the oldest to the newest
+    """
+    intervals = OrderedDict()
+    substack_names = {}
+    for event in events:
+        stack_id = event.get("StackId")
+        physical_id = event.get("PhysicalResourceId")
+        if physical_id == stack_id:
+            # Events of the stack itself, the interval of a substack is the one of its resource in the parent stack
+            continue
+        if event.get("ResourceType") == utils.STACK_TYPE and physical_id:
+            substack_names[physical_id] = event.get("LogicalResourceId")
+
+        key = (stack_id, event.get("LogicalResourceId"))
+        interval = intervals.get(key)
+        status = event.get("ResourceStatus")
+        # CloudFormation sends two CREATE_IN_PROGRESS events per resource, the second when the creation is initiated
+        if status == CREATE_START_STATUS and (interval is None or interval.end):
+            intervals.pop(key, None)
+            intervals[key] = ResourceInterval(
+                stack_id, event.get("LogicalResourceId"), event.get("ResourceType"), event.get("Timestamp")
+            )
+        elif status in CREATE_END_STATUSES and interval and not interval.end:
+            interval.end = event.get("Timestamp")
+            interval.status = status
+
+    intervals = list(intervals.values())
+    for interval in intervals:
+        interval.stack = substack_names.get(interval.stack_id)
+        if not interval.end:
+            interval.end = events[-1].get("Timestamp")
+    return sorted(intervals, key=lambda interval: interval.start)
+
+
+def get_critical_path(intervals):
+    """
+    Return the chain of resources that determined the creation time of the cluster, and mark them as critical.
+
+    The path is inferred from the event times, starting from the resource created last: the resource preceding each
+    one in the path is the last created before its creation started. Substacks are not part of the path, their
+    resources are. Predecessors must start strictly before the resource they precede, so that the resources still in
+    progress, whose intervals can be zero-length, don't precede themselves or each other.
+    """
+    resources = [interval for interval in intervals if not interval.is_stack()]
+    critical_path = []
+    current = max(resources, key=lambda resource: resource.end) if resources else None
+    while current:
+        current.critical = True
+        critical_path.append(current)
+        predecessors = [
+            resource for resource in resources if resource.end <= current.start and resource.start < current.start
+        ]
+        current = max(predecessors, key=lambda resource: resource.end) if predecessors else None
+    return list(reversed(critical_path))
+
+
+def _format_seconds(seconds):
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+
+def _get_gantt_bar(interval, start_time, total_time):
+    """Return the bar representing the given interval in a chart GANTT_WIDTH characters wide."""
+    scale = float(GANTT_WIDTH) / total_time if total_time else 0
+    offset = min(int((interval.start - start_time).total_seconds() * scale), GANTT_WIDTH - 1)
+    length = min(max(1, int(round(interval.duration * scale))), GANTT_WIDTH - offset)
+    bar = ("#" if interval.critical else "=") * length
+    return "|{0}|".format((" " * offset + bar).ljust(GANTT_WIDTH))
+
+
+def _print_timeline(cluster_name, intervals, critical_path):
+    start_time = min(interval.start for interval in intervals)
+    end_time = max(interval.end for interval in intervals)
+    total_time = (end_time - start_time).total_seconds()
+    LOGGER.info(
+        "Creation timeline of the cluster %s: %s, from %s to %s",
+        cluster_name,
+        _format_seconds(total_time),
+        start_time,
+        end_time,
+    )
+
+    name_width = max(len(interval.name) for interval in intervals)
+    type_width = max(len(interval.resource_type) for interval in intervals)
+    row_format = "{0:<%d}  {1:<%d}  {2:>8}  {3:>8}  {4}  {5}" % (name_width, type_width)
+    LOGGER.info(row_format.format("Resource", "Type", "Start", "Duration", "Timeline".ljust(GANTT_WIDTH + 2), "Status"))
+    for interval in intervals:
+        LOGGER.info(
+            row_format.format(
+                interval.name,
+                interval.resource_type,
+                _format_seconds((interval.start - start_time).total_seconds()),
+                _format_seconds(interval.duration),
+                _get_gantt_bar(interval, start_time, total_time),
+                interval.status,
+            )
+        )
+
+    LOGGER.info("\nCritical path (# in the timeline):")
+    for interval in critical_path:
+        LOGGER.info("  %s  %s", _format_seconds(interval.duration).rjust(8), interval.name)
+    critical_time = sum(interval.duration for interval in critical_path)
+    LOGGER.info(
+        "%s spent creating the resources of the critical path, %s waiting between them",
+        _format_seconds(critical_time),
+        _format_seconds(max(0, total_time - critical_time)),
+    )
+
+
+def _get_timeline_json(cluster_name, intervals, critical_path):
+    start_time = min(interval.start for interval in intervals)
+    end_time = max(interval.end for interval in intervals)
+    return OrderedDict(
+        [
+            ("cluster", cluster_name),
+            ("start_time", start_time.isoformat()),
+            ("end_time", end_time.isoformat()),
+            ("duration", (end_time - start_time).total_seconds()),
+            (
+                "resources",
+                [
+                    OrderedDict(
+                        [
+                            ("name", interval.name),
+                            ("stack", interval.stack),
+                            ("logical_id", interval.logical_id),
+                            ("type", interval.resource_type),
+                            ("status", interval.status),
+                            ("start_offset", (interval.start - start_time).total_seconds()),
+                            ("duration", interval.duration),
+                            ("critical", interval.critical),
+                        ]
+                    )
+                    for interval in intervals
+                ],
+            ),
+            ("critical_path", [interval.name for interval in critical_path]),
+        ]
+    )
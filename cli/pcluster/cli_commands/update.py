@@ -16,13 +16,13 @@ import sys
 import time
 from builtins import input
 
-import boto3
 from botocore.exceptions import ClientError
 from tabulate import tabulate
 
 import pcluster.utils as utils
+from pcluster import boto3_clients
 from pcluster.cluster_model import ClusterModel
-from pcluster.commands import evaluate_pcluster_template_url, upload_dashboard_resource, upload_hit_resources
+from pcluster.commands import evaluate_pcluster_template_url, upload_substack_templates
 from pcluster.config.config_patch import ConfigPatch
 from pcluster.config.pcluster_config import PclusterConfig
 from pcluster.config.update_policy import UpdatePolicy
@@ -51,29 +51,17 @@ def execute(args):
         base_config.update(target_config)
 
         cfn_params = base_config.to_cfn()
-        cfn_client = boto3.client("cloudformation")
-        _restore_cfn_only_params(cfn_client, args, cfn_params, stack_name, target_config)
+        cfn_client = boto3_clients.get_client("cloudformation")
+        _restore_cfn_only_params(args, cfn_params, stack_name, target_config, base_config.stack_snapshot)
 
         s3_bucket_name = cfn_params["ResourcesS3Bucket"]
 
         is_hit = utils.is_hit_enabled_cluster(base_config.cfn_stack)
-        template_url = None
-        if is_hit:
-            try:
-                upload_hit_resources(s3_bucket_name, target_config, target_config.to_storage().json_params)
-            except Exception:
-                utils.error("Failed when uploading resources to cluster S3 bucket {0}".format(s3_bucket_name))
-            template_url = evaluate_pcluster_template_url(target_config)
-
         try:
-            upload_dashboard_resource(
-                s3_bucket_name,
-                target_config,
-                target_config.to_storage().json_params,
-                target_config.to_storage().cfn_params,
-            )
+            upload_substack_templates(s3_bucket_name, target_config, target_config.to_storage(), is_hit=is_hit)
         except Exception:
-            utils.error("Failed when uploading the dashboard resource to cluster S3 bucket {0}".format(s3_bucket_name))
+            utils.error("Failed when uploading resources to cluster S3 bucket {0}".format(s3_bucket_name))
+        template_url = evaluate_pcluster_template_url(target_config) if is_hit else None
 
         _update_cluster(
             args, cfn_client, cfn_params, stack_name, use_previous_template=not is_hit, template_url=template_url
@@ -217,23 +205,22 @@ def _format_report_column(value):
     return utils.ellipsize(value, 30) if value is not None else "-"
 
 
-def _restore_cfn_only_params(cfn_boto3_client, args, cfn_params, stack_name, target_config):
+def _restore_cfn_only_params(args, cfn_params, stack_name, target_config, stack_snapshot):
     cluster_section = target_config.get_section("cluster")
 
     scheduler = cluster_section.get_param_value("scheduler")
     # Autofill DesiredSize cfn param
     if not args.reset_desired and not utils.is_hit_enabled_scheduler(scheduler):
-        _restore_desired_size(cfn_params, stack_name, scheduler)
+        _restore_desired_size(cfn_params, stack_name, scheduler, stack_snapshot)
     elif scheduler == "awsbatch":
         LOGGER.info("reset_desired flag does not work with awsbatch scheduler")
 
     if scheduler in {"awsbatch", "slurm"}:
         # Autofill ResourcesS3Bucket cfn param
-        params = utils.get_stack(stack_name, cfn_boto3_client).get("Parameters")
-        cfn_params["ResourcesS3Bucket"] = utils.get_cfn_param(params, "ResourcesS3Bucket")
+        cfn_params["ResourcesS3Bucket"] = stack_snapshot.get_param("ResourcesS3Bucket")
 
 
-def _restore_desired_size(cfn_params, stack_name, scheduler):
+def _restore_desired_size(cfn_params, stack_name, scheduler, stack_snapshot):
     """
     Make the ASG desired capacity to be restored to its current value after the update operation.
 
@@ -241,10 +228,10 @@ def _restore_desired_size(cfn_params, stack_name, scheduler):
     updated with that capacity instead of the minimum/initial size of the cluster.
     """
     if scheduler != "awsbatch":
-        asg_settings = utils.get_asg_settings(stack_name)
+        asg_settings = utils.get_asg_settings(stack_name, stack_snapshot)
         desired_capacity = asg_settings.get("DesiredCapacity")
     else:
-        desired_capacity = utils.get_batch_ce_capacity(stack_name)
+        desired_capacity = utils.get_batch_ce_capacity(stack_name, stack_snapshot)
 
     # If there are compute nodes running, preserve current desired capacity (if possible)
     if int(cfn_params["MinSize"]) <= desired_capacity <= int(cfn_params["MaxSize"]):
@@ -0,0 +1,298 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+from pcluster import boto3_clients, utils
+from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatusManager
+from pcluster.config.pcluster_config import PclusterConfig
+
+LOGGER = logging.getLogger(__name__)
+
+# Clusters changing state are refreshed every MIN_REFRESH_INTERVAL seconds, the interval of the others is doubled
+# at every refresh without changes, up to MAX_REFRESH_INTERVAL
+MIN_REFRESH_INTERVAL = 5
+MAX_REFRESH_INTERVAL = 60
+# Clusters matching the given patterns are listed again every CLUSTERS_LIST_INTERVAL seconds
+CLUSTERS_LIST_INTERVAL = 60
+WATCH_MAX_WORKERS = 10
+
+STABLE_STACK_STATUSES = [
+    "CREATE_COMPLETE",
+    "CREATE_FAILED",
+    "ROLLBACK_COMPLETE",
+    "ROLLBACK_FAILED",
+    "UPDATE_COMPLETE",
+    "UPDATE_ROLLBACK_COMPLETE",
+    "UPDATE_ROLLBACK_FAILED",
+    "DELETE_FAILED",
+    "DELETE_COMPLETE",
+]
+STABLE_MASTER_STATES = ["running", "stopped", "terminated", "-"]
+STABLE_COMPUTE_FLEET_STATUSES = ["RUNNING", "STOPPED", "-"]
+DELETED_STACK_STATUS = "DELETE_COMPLETE"
+
+HEADERS = ["Cluster", "Status", "MasterServer", "ComputeFleetStatus", "Error"]
+
+
+class ClusterState(object):
+    """
+    State of a watched cluster and schedule of its next refresh.
+
+    When a refresh fails its error is part of the state, and the other values are the ones of the last successful
+    refresh until the cluster is refreshed again.
+    """
+
+    def __init__(self, cluster_name):
+        """Initialize the state of the given cluster, to be refreshed as soon as possible."""
+        self.cluster_name = cluster_name
+        self.stack_status = "-"
+        self.master_state = "-"
+        self.compute_fleet_status = "-"
+        self.is_hit = False
+        self.error = None
+        self.interval = MIN_REFRESH_INTERVAL
+        self.next_refresh = 0
+
+    @property
+    def stack_name(self):
+        """Return the name of the cluster stack."""
+        return utils.get_stack_name(self.cluster_name)
+
+    def get_row(self):
+        """Return the values shown in the dashboard for the cluster."""
+        return [self.cluster_name, self.stack_status, self.master_state, self.compute_fleet_status, self.error or ""]
+
+    def is_stable(self):
+        """Return True if no transition is in progress for the cluster and its state is up to date."""
+        return (
+            not self.error
+            and self.stack_status in STABLE_STACK_STATUSES
+            and self.master_state in STABLE_MASTER_STATES
+            and self.compute_fleet_status in STABLE_COMPUTE_FLEET_STATUSES
+        )
+
+    def schedule_refresh(self, now, changed):
+        """Schedule the next refresh, backing off while the cluster is stable and unchanged."""
+        if changed or not self.is_stable():
+            self.interval = MIN_REFRESH_INTERVAL
+        else:
+            self.interval = min(self.interval * 2, MAX_REFRESH_INTERVAL)
+        self.next_refresh = now + self.interval
+
+
+class ClusterWatcher(object):
+    """
+    Tracker of the state of multiple clusters.
+
+    At every refresh the clusters due are refreshed concurrently: the stack and the compute fleet status of each
+    cluster are retrieved by a task of their own, while the master servers are described with a single call.
+    Failures are reported in the state of the clusters affected, which are refreshed again at the next refresh.
+    """
+
+    def __init__(self, cluster_patterns):
+        """
+        Initialize the watcher.
+
+        :param cluster_patterns: cluster names or shell-style patterns, like "prod-*"
+        """
+        self.cluster_patterns = cluster_patterns
+        self.clusters = []
+        self._next_clusters_list = 0
+
+    def refresh(self, now):
+        """
+        Refresh the clusters due and return the names of the ones whose row changed.
+
+        Clusters matching the patterns are listed again every CLUSTERS_LIST_INTERVAL seconds.
+        """
+        changed_clusters = set()
+        if now >= self._next_clusters_list:
+            changed_clusters.update(self._update_clusters())
+            self._next_clusters_list = now + CLUSTERS_LIST_INTERVAL
+
+        due_clusters = [cluster for cluster in self.clusters if cluster.next_refresh <= now]
+        if not due_clusters:
+            return changed_clusters
+
+        previous_rows = {cluster.cluster_name: cluster.get_row() for cluster in due_clusters}
+        executor = ThreadPoolExecutor(max_workers=min(WATCH_MAX_WORKERS, len(due_clusters) + 1))
+        try:
+            master_states = executor.submit(_get_master_states, [cluster.stack_name for cluster in due_clusters])
+            for future in [executor.submit(_refresh_cluster, cluster) for cluster in due_clusters]:
+                future.result()
+            master_states_error = None
+            try:
+                master_states = master_states.result()
+            except Exception as e:
+                # The state of the master servers is stale until they are described again at the next refresh
+                master_states_error = _get_error_message(e)
+        finally:
+            executor.shutdown(wait=True)
+
+        for cluster in due_clusters:
+            if master_states_error:
+                cluster.error = cluster.error or master_states_error
+            else:
+                cluster.master_state = master_states.get(cluster.stack_name, "-")
+            previous_row = previous_rows[cluster.cluster_name]
+            if cluster.get_row() != previous_row:
+                changed_clusters.add(cluster.cluster_name)
+                # The first refresh of a cluster is not a change of its state
+                cluster.schedule_refresh(now, changed=previous_row[1] != "-")
+            else:
+                cluster.schedule_refresh(now, changed=False)
+        return changed_clusters
+
+    def get_next_refresh(self):
+        """Return the time of the next refresh."""
+        return min([cluster.next_refresh for cluster in self.clusters] + [self._next_clusters_list])
+
+    def _update_clusters(self):
+        """Add the clusters matching the patterns not watched yet, and return their names."""
+        cluster_names = utils.expand_cluster_patterns(self.cluster_patterns)
+        watched_cluster_names = set(cluster.cluster_name for cluster in self.clusters)
+        new_cluster_names = []
+        for cluster_name in cluster_names:
+            if cluster_name not in watched_cluster_names:
+                self.clusters.append(ClusterState(cluster_name))
+                watched_cluster_names.add(cluster_name)
+                new_cluster_names.append(cluster_name)
+        return new_cluster_names
+
+
+class StatusDashboard(object):
+    """
+    Table with a row for each cluster, printed to a terminal.
+
+    The table is drawn once, then only the rows that changed are rewritten in place. When the output is not a
+    terminal, changed rows are printed as new lines.
+    """
+
+    def __init__(self, output=sys.stdout):
+        """Initialize an empty dashboard."""
+        self.output = output
+        self.interactive = output.isatty()
+        self._rows = []
+        self._widths = [len(header) for header in HEADERS]
+
+    def update(self, rows, changed_names):
+        """Show the given rows, redrawing only the ones of the changed clusters."""
+        widths = [max([width] + [len(str(row[index])) for row in rows]) for index, width in enumerate(self._widths)]
+        if not self.interactive:
+            for row in rows:
+                if row[0] in changed_names:
+                    self._write_line(row, widths)
+        elif widths != self._widths or not self._rows:
+            self._draw_table(rows, widths)
+        else:
+            self._rewrite_rows(rows, changed_names, widths)
+        self._rows = [list(row) for row in rows]
+        self._widths = widths
+        self.output.flush()
+
+    def _draw_table(self, rows, widths):
+        if self._rows:
+            # Move to the beginning of the table, to draw it again with the new column widths
+            self.output.write("\033[{0}A".format(len(self._rows) + 1))
+        self._write_line(HEADERS, widths)
+        for row in rows:
+            self._write_line(row, widths)
+
+    def _rewrite_rows(self, rows, changed_names, widths):
+        for index in range(len(self._rows)):
+            if rows[index][0] in changed_names:
+                # Move up to the row, rewrite it and go back below the table
+                lines_up = len(self._rows) - index
+                self.output.write("\033[{0}A".format(lines_up))
+                self._write_line(rows[index], widths)
+                if lines_up > 1:
+                    self.output.write("\033[{0}B".format(lines_up - 1))
+        for row in rows[len(self._rows) :]:  # noqa: E203
+            self._write_line(row, widths)
+
+    def _write_line(self, values, widths):
+        line = "  ".join(str(value).ljust(width) for value, width in zip(values, widths))
+        self.output.write("\r\033[K{0}\n".format(line) if self.interactive else "{0}\n".format(line.rstrip()))
+
+
+def watch(args):
+    """Show the status of the given clusters, refreshing it until interrupted."""
+    PclusterConfig.init_aws(config_file=args.config_file)
+    watcher = ClusterWatcher(args.cluster_name)
+    dashboard = StatusDashboard()
+    try:
+        while True:
+            now = time.time()
+            changed_names = watcher.refresh(now)
+            if not watcher.clusters:
+                utils.error("No cluster found matching {0}".format(", ".join(args.cluster_name)))
+            dashboard.update([cluster.get_row() for cluster in watcher.clusters], changed_names)
+            time.sleep(max(0, watcher.get_next_refresh() - time.time()))
+    except KeyboardInterrupt:
+        LOGGER.info("\nExiting...")
+        sys.exit(0)
+
+
+def _refresh_cluster(cluster):
+    """Refresh stack status and compute fleet status of the given cluster, keeping the previous ones on failure."""
+    try:
+        try:
+            # Throttled calls are not retried here, but at the next refresh of the cluster
+            stack = boto3_clients.get_client("cloudformation").describe_stacks(StackName=cluster.stack_name)
+            stack = stack.get("Stacks")[0]
+            stack_status = stack.get("StackStatus")
+            is_hit = utils.get_stack_output_value(stack.get("Outputs", []), "IsHITCluster") == "true"
+        except ClientError as e:
+            if not e.response.get("Error").get("Message").endswith("does not exist"):
+                raise
+            stack_status = DELETED_STACK_STATUS
+            is_hit = False
+
+        compute_fleet_status = "-"
+        if is_hit and stack_status != DELETED_STACK_STATUS:
+            compute_fleet_status = ComputeFleetStatusManager(cluster.cluster_name).get_status(raise_on_error=True)
+            compute_fleet_status = str(compute_fleet_status) if compute_fleet_status else "-"
+    except Exception as e:
+        cluster.error = _get_error_message(e)
+        return
+
+    cluster.stack_status = stack_status
+    cluster.is_hit = is_hit
+    cluster.compute_fleet_status = compute_fleet_status
+    cluster.error = None
+
+
+def _get_error_message(error):
+    if isinstance(error, ClientError):
+        return error.response.get("Error").get("Message")
+    return str(error)
+
+
+def _get_master_states(stack_names):
+    """Return the state of the master server of the given clusters, by stack name, with a single call."""
+    master_states = {}
+    filters = [
+        {"Name": "tag:Application", "Values": stack_names},
+        {"Name": "tag:aws-parallelcluster-node-type", "Values": [str(utils.NodeType.master)]},
+        {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
+    ]
+    for reservation in utils.paginate_boto3(boto3_clients.get_client("ec2").describe_instances, Filters=filters):
+        for instance in reservation.get("Instances", []):
+            stack_name = next(
+                (tag.get("Value") for tag in instance.get("Tags", []) if tag.get("Key") == "Application"), None
+            )
+            master_states[stack_name] = instance.get("State").get("Name")
+    return master_states
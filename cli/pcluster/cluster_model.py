@@ -9,12 +9,16 @@
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
 import abc
+import json
 import sys
 from abc import abstractmethod
+from collections import OrderedDict
+from functools import partial
 
-import boto3
 from botocore.exceptions import ClientError
 
+from pcluster import boto3_clients
+from pcluster.config.validation import ValidationTask, get_validation_workers, run_validation_tasks
 from pcluster.utils import (
     error,
     get_availability_zone_of_subnet,
@@ -62,52 +66,76 @@ class ClusterModel(ABC):
 
     def _ec2_run_instance(self, pcluster_config, **kwargs):
         """Wrap ec2 run_instance call. Useful since a successful run_instance call signals 'DryRunOperation'."""
-        try:
-            boto3.client("ec2").run_instances(**kwargs)
-        except ClientError as e:
-            code = e.response.get("Error").get("Code")
-            message = e.response.get("Error").get("Message")
-            if code == "DryRunOperation":
-                pass
-            elif code == "UnsupportedOperation":
-                if "does not support specifying CpuOptions" in message:
-                    pcluster_config.error(message.replace("CpuOptions", "disable_hyperthreading"))
-                pcluster_config.error(message)
-            elif code == "InstanceLimitExceeded":
-                pcluster_config.error(
-                    "You've reached the limit on the number of instances you can run concurrently "
-                    "for the configured instance type.\n{0}".format(message)
-                )
-            elif code == "InsufficientInstanceCapacity":
-                pcluster_config.error("There is not enough capacity to fulfill your request.\n{0}".format(message))
-            elif code == "InsufficientFreeAddressesInSubnet":
-                pcluster_config.error(
-                    "The specified subnet does not contain enough free private IP addresses "
-                    "to fulfill your request.\n{0}".format(message)
-                )
-            elif code == "Unsupported" and get_availability_zone_of_subnet(
-                kwargs["SubnetId"]
-            ) not in get_supported_az_for_one_instance_type(kwargs["InstanceType"]):
-                # If an availability zone without desired instance type is selected, error code is "Unsupported"
-                # Therefore, we need to write our own code to tell the specific problem
-                current_az = get_availability_zone_of_subnet(kwargs["SubnetId"])
-                qualified_az = get_supported_az_for_one_instance_type(kwargs["InstanceType"])
-                pcluster_config.error(
-                    "Your requested instance type ({0}) is not supported in the Availability Zone ({1}) of "
-                    "your requested subnet ({2}). Please retry your request by choosing a subnet in "
-                    "{3}. ".format(kwargs["InstanceType"], current_az, kwargs["SubnetId"], qualified_az)
-                )
-            else:
-                pcluster_config.error(
-                    "Unable to validate configuration parameters. "
-                    "Please double check your cluster configuration.\n{0}".format(message)
+        self._report_run_instance_error(pcluster_config, kwargs, _run_instance(kwargs))
+
+    def _ec2_run_instances(self, pcluster_config, run_instances_args):
+        """
+        Wrap concurrent ec2 run_instance calls, sending identical requests only once.
+
+        Errors are reported in the same order of the given requests, as if the calls were made sequentially.
+        :param run_instances_args: list of dictionaries with the arguments of each run_instances call
+        """
+        unique_run_instances_args = OrderedDict(
+            (json.dumps(kwargs, sort_keys=True), kwargs) for kwargs in run_instances_args
+        ).values()
+        run_validation_tasks(
+            [
+                ValidationTask(
+                    partial(self._report_run_instance_error, pcluster_config, kwargs), partial(_run_instance, kwargs)
                 )
+                for kwargs in unique_run_instances_args
+            ],
+            max_workers=get_validation_workers(),
+        )
+
+    def _report_run_instance_error(self, pcluster_config, kwargs, e):
+        """Report the error returned by a run_instance call made with the given arguments, if any."""
+        if not e:
+            return
+
+        code = e.response.get("Error").get("Code")
+        message = e.response.get("Error").get("Message")
+        if code == "DryRunOperation":
+            pass
+        elif code == "UnsupportedOperation":
+            if "does not support specifying CpuOptions" in message:
+                pcluster_config.error(message.replace("CpuOptions", "disable_hyperthreading"))
+            pcluster_config.error(message)
+        elif code == "InstanceLimitExceeded":
+            pcluster_config.error(
+                "You've reached the limit on the number of instances you can run concurrently "
+                "for the configured instance type.\n{0}".format(message)
+            )
+        elif code == "InsufficientInstanceCapacity":
+            pcluster_config.error("There is not enough capacity to fulfill your request.\n{0}".format(message))
+        elif code == "InsufficientFreeAddressesInSubnet":
+            pcluster_config.error(
+                "The specified subnet does not contain enough free private IP addresses "
+                "to fulfill your request.\n{0}".format(message)
+            )
+        elif code == "Unsupported" and get_availability_zone_of_subnet(
+            kwargs["SubnetId"]
+        ) not in get_supported_az_for_one_instance_type(kwargs["InstanceType"]):
+            # If an availability zone without desired instance type is selected, error code is "Unsupported"
+            # Therefore, we need to write our own code to tell the specific problem
+            current_az = get_availability_zone_of_subnet(kwargs["SubnetId"])
+            qualified_az = get_supported_az_for_one_instance_type(kwargs["InstanceType"])
+            pcluster_config.error(
+                "Your requested instance type ({0}) is not supported in the Availability Zone ({1}) of "
+                "your requested subnet ({2}). Please retry your request by choosing a subnet in "
+                "{3}. ".format(kwargs["InstanceType"], current_az, kwargs["SubnetId"], qualified_az)
+            )
+        else:
+            pcluster_config.error(
+                "Unable to validate configuration parameters. "
+                "Please double check your cluster configuration.\n{0}".format(message)
+            )
 
     def _get_latest_alinux_ami_id(self):
         """Get latest alinux ami id."""
         try:
             alinux_ami_id = (
-                boto3.client("ssm")
+                boto3_clients.get_client("ssm")
                 .get_parameters_by_path(Path="/aws/service/ami-amazon-linux-latest")
                 .get("Parameters")[0]
                 .get("Value")
@@ -172,3 +200,12 @@ def load_cluster_models():
 
 
 load_cluster_models()
+
+
+def _run_instance(kwargs):
+    """Call ec2 run_instances with the given arguments, returning the ClientError raised, if any."""
+    try:
+        boto3_clients.get_client("ec2").run_instances(**kwargs)
+    except ClientError as e:
+        return e
+    return None
@@ -21,46 +21,137 @@ import logging
 import os
 import re
 import sys
+import threading
 import time
 from builtins import str
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 import pkg_resources
 from botocore.exceptions import ClientError
 from tabulate import tabulate
 
 import pcluster.utils as utils
+from pcluster import boto3_clients
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatusManager
 from pcluster.config.hit_converter import HitConverter
 from pcluster.config.pcluster_config import PclusterConfig
-from pcluster.constants import PCLUSTER_NAME_MAX_LENGTH, PCLUSTER_NAME_REGEX, PCLUSTER_STACK_PREFIX
+from pcluster.constants import CLUSTER_CONFIG_KEY, PCLUSTER_NAME_MAX_LENGTH, PCLUSTER_NAME_REGEX, PCLUSTER_STACK_PREFIX
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of clusters described concurrently by "pcluster list"
+LIST_CLUSTERS_MAX_WORKERS = 10
 
-def _create_bucket_with_resources(pcluster_config, storage_data, tags):
-    """Create a bucket associated to the given stack and upload specified resources."""
+
+# Keys of the rendered substack templates in the cluster bucket
+HIT_TEMPLATE_KEY = "templates/compute-fleet-hit-substack.rendered.cfn.yaml"
+DASHBOARD_TEMPLATE_KEY = "templates/cw-dashboard-substack.rendered.cfn.yaml"
+# Maximum number of stages of the cluster creation running concurrently
+CREATE_PIPELINE_MAX_WORKERS = 4
+
+
+class _CreatePipeline(object):
+    """
+    Stages of the cluster creation preceding the creation of the stack.
+
+    Stages are run in background by a thread pool or in the calling thread, and the time spent in each of them
+    is recorded. If the creation is aborted before the stack is created, the running stages are awaited and the
+    bucket created by the pipeline, if any, is deleted.
+    """
+
+    def __init__(self):
+        """Initialize a pipeline with no stages."""
+        self.timings = OrderedDict()
+        self.bucket_name = None
+        self._executor = ThreadPoolExecutor(max_workers=CREATE_PIPELINE_MAX_WORKERS)
+        self._futures = []
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+
+    def submit(self, stage, func, *args):
+        """Run the given stage in background and return its future."""
+        future = self._executor.submit(self._run_stage, stage, func, *args)
+        self._futures.append(future)
+        return future
+
+    def run(self, stage, func, *args):
+        """Run the given stage in the calling thread and return its result."""
+        return self._run_stage(stage, func, *args)
+
+    def create_bucket(self, region, scheduler, packaged_artifacts=None):
+        """Create the bucket of the cluster and upload the artifacts to it in background."""
+
+        def _create_bucket():
+            self.bucket_name = _create_bucket_with_artifacts(region, scheduler, packaged_artifacts)
+            return self.bucket_name
+
+        return self.submit("bucket creation and artifacts upload", _create_bucket)
+
+    def abort(self):
+        """Wait for the running stages, cancelling the pending ones, and delete the bucket if it was created."""
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        if self.bucket_name:
+            utils.delete_s3_bucket(self.bucket_name)
+            self.bucket_name = None
+
+    def complete(self):
+        """Wait for all the stages and log the time spent in each of them."""
+        self._executor.shutdown(wait=True)
+        LOGGER.debug(
+            "Cluster creation stages took %.2f seconds: %s",
+            time.time() - self._start_time,
+            ", ".join("{0} {1:.2f}s".format(stage, timing) for stage, timing in self.timings.items()),
+        )
+
+    def _run_stage(self, stage, func, *args):
+        start_time = time.time()
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.timings[stage] = time.time() - start_time
+
+
+def _get_resources_dirs(scheduler):
+    """Return the directories of the resources required by the scheduler, uploaded to the cluster bucket."""
+    resources_dirs = ["resources/custom_resources"]
+    if scheduler == "awsbatch":
+        resources_dirs.append("resources/batch")
+    return [pkg_resources.resource_filename(__name__, resources_dir) for resources_dir in resources_dirs]
+
+
+def _package_artifacts(scheduler):
+    """Create the archives of the resources in the cache, return their paths by directory, empty on failure."""
+    zip_paths = {}
+    try:
+        for resources in _get_resources_dirs(scheduler):
+            zip_paths.update(utils.get_cached_resources_artifacts(resources))
+    except Exception as e:
+        LOGGER.debug("Unable to package the cluster resources: %s", e)
+    return zip_paths
+
+
+def _create_bucket_with_artifacts(region, scheduler, packaged_artifacts=None):
+    """
+    Create a bucket associated to the given stack and upload the artifacts required by the scheduler.
+
+    :param packaged_artifacts: future of the archives created by _package_artifacts, awaited once the bucket exists
+    """
     s3_bucket_name = utils.generate_random_bucket_name("parallelcluster")
     LOGGER.debug("Creating S3 bucket for cluster resources, named %s", s3_bucket_name)
     try:
-        utils.create_s3_bucket(s3_bucket_name, pcluster_config.region)
+        utils.create_s3_bucket(s3_bucket_name, region)
     except Exception:
         LOGGER.error("Unable to create S3 bucket %s.", s3_bucket_name)
         raise
 
     try:
-        scheduler = pcluster_config.get_section("cluster").get_param_value("scheduler")
-        resources_dirs = ["resources/custom_resources"]
-        if scheduler == "awsbatch":
-            resources_dirs.append("resources/batch")
-
-        for resources_dir in resources_dirs:
-            resources = pkg_resources.resource_filename(__name__, resources_dir)
-            utils.upload_resources_artifacts(s3_bucket_name, root=resources)
-        if utils.is_hit_enabled_scheduler(scheduler):
-            upload_hit_resources(s3_bucket_name, pcluster_config, storage_data.json_params, tags)
-
-        upload_dashboard_resource(s3_bucket_name, pcluster_config, storage_data.json_params, storage_data.cfn_params)
+        zip_paths = packaged_artifacts.result() if packaged_artifacts else {}
+        for resources in _get_resources_dirs(scheduler):
+            utils.upload_resources_artifacts(s3_bucket_name, root=resources, zip_paths=zip_paths)
     except Exception:
         LOGGER.error("Unable to upload cluster resources to the S3 bucket %s.", s3_bucket_name)
         utils.delete_s3_bucket(s3_bucket_name)
@@ -69,61 +160,162 @@ def _create_bucket_with_resources(pcluster_config, storage_data, tags):
     return s3_bucket_name
 
 
-def upload_hit_resources(bucket_name, pcluster_config, json_params, tags=None):
-    if tags is None:
-        tags = []
-    hit_template_url = pcluster_config.get_section("cluster").get_param_value(
+def _prefetch_templates(pipeline, pcluster_config, scheduler):
+    """Fetch the templates of the substacks rendered by the CLI in background, return the futures by url."""
+    template_urls = [_get_dashboard_template_url(pcluster_config)]
+    if utils.is_hit_enabled_scheduler(scheduler):
+        template_urls.append(_get_hit_template_url(pcluster_config))
+    return {url: pipeline.submit("fetch of {0}".format(url), _prefetch_template, url) for url in template_urls}
+
+
+def _prefetch_template(url):
+    """Fetch the given template without logging, return None on failure so that it is fetched again when rendered."""
+    from pcluster import templates
+
+    try:
+        return templates.fetch_template(url, log_errors=False)
+    except Exception as e:
+        LOGGER.debug("Unable to prefetch template %s: %s", url, e)
+        return None
+
+
+def _render_dashboard_template(pcluster_config, storage_data, tags, prefetched_templates):
+    """Render the template of the CloudWatch dashboard substack, which does not depend on the cluster bucket."""
+    fetched_templates = {url: future.result() for url, future in prefetched_templates.items()}
+    return _render_substack_templates(pcluster_config, storage_data, tags, fetched_templates, is_dashboard=True)
+
+
+def _upload_templates(
+    pipeline, bucket_name, pcluster_config, storage_data, tags, prefetched_templates, rendered_templates
+):
+    """
+    Render the templates of the substacks not rendered yet and upload them, together with the cluster configuration.
+
+    Templates are taken from the prefetched ones, unless the configuration changed their url in the meantime.
+    :param rendered_templates: future of the templates already rendered, by substack
+    """
+    fetched_templates = {url: future.result() for url, future in prefetched_templates.items()}
+    scheduler = pcluster_config.get_section("cluster").get_param_value("scheduler")
+    pipeline.run(
+        "templates rendering and upload",
+        upload_substack_templates,
+        bucket_name,
+        pcluster_config,
+        storage_data,
+        tags,
+        utils.is_hit_enabled_scheduler(scheduler),
+        fetched_templates,
+        rendered_templates.result(),
+    )
+
+
+def _get_hit_template_url(pcluster_config):
+    return pcluster_config.get_section("cluster").get_param_value(
         "hit_template_url"
     ) or "{bucket_url}/templates/compute-fleet-hit-substack-{version}.cfn.yaml".format(
         bucket_url=utils.get_bucket_url(pcluster_config.region), version=utils.get_installed_version()
     )
-    s3_client = boto3.client("s3")
 
+
+def _get_dashboard_template_url(pcluster_config):
+    return pcluster_config.get_section("cluster").get_param_value(
+        "cw_dashboard_template_url"
+    ) or "{bucket_url}/templates/cw-dashboard-substack-{version}.cfn.yaml".format(
+        bucket_url=utils.get_bucket_url(pcluster_config.region),
+        version=utils.get_installed_version(),
+    )
+
+
+def _upload_cluster_config(bucket_name, json_params):
+    """Upload the cluster configuration to the cluster bucket and return its version."""
     try:
-        result = s3_client.put_object(
-            Bucket=bucket_name, Body=json.dumps(json_params), Key="configs/cluster-config.json"
+        return (
+            boto3_clients.get_client("s3")
+            .put_object(Bucket=bucket_name, Body=json.dumps(json_params), Key=CLUSTER_CONFIG_KEY)
+            .get("VersionId")
         )
-        file_contents = utils.read_remote_file(hit_template_url)
-        rendered_template = utils.render_template(file_contents, json_params, tags, result.get("VersionId"))
     except ClientError as client_error:
         LOGGER.error("Error when uploading cluster configuration file to bucket %s: %s", bucket_name, client_error)
         raise
-    except Exception as e:
-        LOGGER.error("Error when generating CloudFormation template from url %s: %s", hit_template_url, e)
-        raise
 
+
+def _render_substack_templates(
+    pcluster_config, storage_data, tags, fetched_templates, is_hit=False, is_dashboard=False, config_version=None
+):
+    """Render the templates of the given substacks, fetching the ones not fetched yet, and return them by substack."""
+    # Imported here since it loads jinja2, which is needed only by the commands rendering the templates
+    from pcluster import templates
+
+    template_urls = OrderedDict()
+    if is_hit:
+        template_urls[templates.HIT_SUBSTACK] = _get_hit_template_url(pcluster_config)
+    if is_dashboard:
+        template_urls[templates.DASHBOARD_SUBSTACK] = _get_dashboard_template_url(pcluster_config)
     try:
-        s3_client.put_object(
-            Bucket=bucket_name, Body=rendered_template, Key="templates/compute-fleet-hit-substack.rendered.cfn.yaml"
+        sources = {
+            substack: fetched_templates.get(url) or templates.fetch_template(url)
+            for substack, url in template_urls.items()
+        }
+        return templates.render_substack_templates(
+            storage_data.json_params,
+            storage_data.cfn_params,
+            tags or [],
+            config_version,
+            hit_template=sources.get(templates.HIT_SUBSTACK),
+            dashboard_template=sources.get(templates.DASHBOARD_SUBSTACK),
         )
     except Exception as e:
-        LOGGER.error("Error when uploading CloudFormation template to bucket %s: %s", bucket_name, e)
+        LOGGER.error(
+            "Error when generating CloudFormation templates from urls %s: %s", ", ".join(template_urls.values()), e
+        )
         raise
 
 
-def upload_dashboard_resource(bucket_name, pcluster_config, json_params, cfn_params):
-    params = {"json_params": json_params, "cfn_params": cfn_params}
-    cw_dashboard_template_url = pcluster_config.get_section("cluster").get_param_value(
-        "cw_dashboard_template_url"
-    ) or "{bucket_url}/templates/cw-dashboard-substack-{version}.cfn.yaml".format(
-        bucket_url=utils.get_bucket_url(pcluster_config.region),
-        version=utils.get_installed_version(),
-    )
+def upload_substack_templates(
+    bucket_name, pcluster_config, storage_data, tags=None, is_hit=True, fetched_templates=None, rendered_templates=None
+):
+    """
+    Render the templates of the compute fleet and CloudWatch dashboard substacks and upload them to the cluster bucket.
 
-    try:
-        file_contents = utils.read_remote_file(cw_dashboard_template_url)
-        rendered_template = utils.render_template(file_contents, params, {})
-    except Exception as e:
-        LOGGER.error(
-            "Error when generating CloudWatch Dashboard template from path %s: %s", cw_dashboard_template_url, e
+    The cluster configuration is uploaded as well for HIT clusters, since the compute fleet template refers to it.
+
+    :param storage_data: StorageData of the cluster configuration, shared by the rendering of all the templates
+    :param tags: tags of the cluster, in the Key/Value format
+    :param is_hit: True to render the compute fleet template of HIT clusters
+    :param fetched_templates: sources of the templates already fetched, by url
+    :param rendered_templates: templates already rendered by substack, the compute fleet one is always rendered here
+    """
+    # Imported here since it loads jinja2, which is needed only by the commands rendering the templates
+    from pcluster import templates
+
+    rendered_templates = dict(rendered_templates or {})
+    s3_client = boto3_clients.get_client("s3")
+
+    config_version = _upload_cluster_config(bucket_name, storage_data.json_params) if is_hit else None
+    rendered_templates.update(
+        _render_substack_templates(
+            pcluster_config,
+            storage_data,
+            tags,
+            fetched_templates or {},
+            is_hit=is_hit,
+            is_dashboard=templates.DASHBOARD_SUBSTACK not in rendered_templates,
+            config_version=config_version,
         )
-        raise
+    )
+
+    if is_hit:
+        try:
+            s3_client.put_object(
+                Bucket=bucket_name, Body=rendered_templates[templates.HIT_SUBSTACK], Key=HIT_TEMPLATE_KEY
+            )
+        except Exception as e:
+            LOGGER.error("Error when uploading CloudFormation template to bucket %s: %s", bucket_name, e)
+            raise
 
     try:
-        boto3.client("s3").put_object(
-            Bucket=bucket_name,
-            Body=rendered_template,
-            Key="templates/cw-dashboard-substack.rendered.cfn.yaml",
+        s3_client.put_object(
+            Bucket=bucket_name, Body=rendered_templates[templates.DASHBOARD_SUBSTACK], Key=DASHBOARD_TEMPLATE_KEY
         )
     except Exception as e:
         LOGGER.error("Error when uploading CloudWatch Dashboard template to bucket %s: %s", bucket_name, e)
@@ -134,10 +326,9 @@ def version():
 
 
 def _check_for_updates(pcluster_config):
-    """Check for updates."""
+    """Check for updates, return the message to print if a newer version is available."""
     update_check = pcluster_config.get_section("global").get_param_value("update_check")
-    if update_check:
-        utils.check_if_latest_version()
+    return utils.get_newer_version_message() if update_check else None
 
 
 def _validate_cluster_name(cluster_name):
@@ -161,50 +352,80 @@ def create(args):  # noqa: C901 FIXME!!!
     pcluster_config = PclusterConfig(
         config_file=args.config_file, cluster_label=args.cluster_template, fail_on_file_absence=True
     )
-    pcluster_config.validate()
-
-    # Automatic SIT -> HIT conversion, if needed
-    HitConverter(pcluster_config).convert()
 
-    # get CFN parameters, template url and tags from config
-    storage_data = pcluster_config.to_storage()
-    cfn_params = storage_data.cfn_params
-
-    _check_for_updates(pcluster_config)
-
-    bucket_name = None
+    # Templates fetch, artifacts packaging and update check have no side effects on the account, so they run in
+    # background while the configuration is validated. The bucket is created once the configuration is valid, while
+    # the stack parameters are prepared and the dashboard template is rendered. The compute fleet template refers to
+    # the version of the configuration uploaded to the bucket, so it is rendered once the bucket exists.
+    pipeline = _CreatePipeline()
     try:
-        cfn_client = boto3.client("cloudformation")
-        stack_name = utils.get_stack_name(args.cluster_name)
-
-        # merge tags from configuration, command-line and internal ones
-        tags = _evaluate_tags(pcluster_config, preferred_tags=args.tags)
+        try:
+            scheduler = pcluster_config.get_section("cluster").get_param_value("scheduler")
+            prefetched_templates = _prefetch_templates(pipeline, pcluster_config, scheduler)
+            packaged_artifacts = pipeline.submit("artifacts packaging", _package_artifacts, scheduler)
+            update_message_future = pipeline.submit("update check", _check_for_updates, pcluster_config)
+
+            pipeline.run("validation", pcluster_config.validate)
+
+            # Automatic SIT -> HIT conversion, if needed
+            pipeline.run("HIT conversion", HitConverter(pcluster_config).convert)
+
+            bucket_future = pipeline.create_bucket(pcluster_config.region, scheduler, packaged_artifacts)
+
+            # get CFN parameters, template url and tags from config
+            storage_data = pcluster_config.to_storage()
+            cfn_params = storage_data.cfn_params
+
+            cfn_client = boto3_clients.get_client("cloudformation")
+            stack_name = utils.get_stack_name(args.cluster_name)
+
+            # merge tags from configuration, command-line and internal ones
+            tags = _evaluate_tags(pcluster_config, preferred_tags=args.tags)
+            dashboard_template = pipeline.submit(
+                "dashboard template rendering",
+                _render_dashboard_template,
+                pcluster_config,
+                storage_data,
+                tags,
+                prefetched_templates,
+            )
 
-        bucket_name = _create_bucket_with_resources(pcluster_config, storage_data, tags)
-        if bucket_name:
+            bucket_name = bucket_future.result()
+            _upload_templates(
+                pipeline, bucket_name, pcluster_config, storage_data, tags, prefetched_templates, dashboard_template
+            )
             cfn_params["ResourcesS3Bucket"] = bucket_name
 
-        LOGGER.info("Creating stack named: %s", stack_name)
-
-        # determine the CloudFormation Template URL to use
-        template_url = evaluate_pcluster_template_url(pcluster_config, preferred_template_url=args.template_url)
-
-        # append extra parameters from command-line
-        if args.extra_parameters:
-            LOGGER.debug("Adding extra parameters to the CFN parameters")
-            cfn_params.update(dict(args.extra_parameters))
-
-        # prepare input parameters for stack creation and create the stack
-        LOGGER.debug(cfn_params)
-        params = [{"ParameterKey": key, "ParameterValue": value} for key, value in cfn_params.items()]
-        stack = cfn_client.create_stack(
-            StackName=stack_name,
-            TemplateURL=template_url,
-            Parameters=params,
-            Capabilities=["CAPABILITY_IAM"],
-            DisableRollback=args.norollback,
-            Tags=tags,
-        )
+            update_message = update_message_future.result()
+            if update_message:
+                print(update_message)
+
+            LOGGER.info("Creating stack named: %s", stack_name)
+
+            # determine the CloudFormation Template URL to use
+            template_url = evaluate_pcluster_template_url(pcluster_config, preferred_template_url=args.template_url)
+
+            # append extra parameters from command-line
+            if args.extra_parameters:
+                LOGGER.debug("Adding extra parameters to the CFN parameters")
+                cfn_params.update(dict(args.extra_parameters))
+
+            # prepare input parameters for stack creation and create the stack
+            LOGGER.debug(cfn_params)
+            params = [{"ParameterKey": key, "ParameterValue": value} for key, value in cfn_params.items()]
+            stack = cfn_client.create_stack(
+                StackName=stack_name,
+                TemplateURL=template_url,
+                Parameters=params,
+                Capabilities=["CAPABILITY_IAM"],
+                DisableRollback=args.norollback,
+                Tags=tags,
+            )
+        except BaseException:
+            # Until the stack is created the bucket is not referenced by anything, whatever the error
+            pipeline.abort()
+            raise
+        pipeline.complete()
         LOGGER.debug("StackId: %s", stack.get("StackId"))
 
         if not args.nowait:
@@ -220,21 +441,21 @@ def create(args):  # noqa: C901 FIXME!!!
     except ClientError as e:
         LOGGER.critical(e.response.get("Error").get("Message"))
         sys.stdout.flush()
-        if bucket_name:
-            utils.delete_s3_bucket(bucket_name)
+        if pipeline.bucket_name:
+            utils.delete_s3_bucket(pipeline.bucket_name)
         sys.exit(1)
     except KeyboardInterrupt:
         LOGGER.info("\nExiting...")
         sys.exit(0)
     except KeyError as e:
         LOGGER.critical("ERROR: KeyError - reason:\n%s", e)
-        if bucket_name:
-            utils.delete_s3_bucket(bucket_name)
+        if pipeline.bucket_name:
+            utils.delete_s3_bucket(pipeline.bucket_name)
         sys.exit(1)
     except Exception as e:
         LOGGER.critical(e)
-        if bucket_name:
-            utils.delete_s3_bucket(bucket_name)
+        if pipeline.bucket_name:
+            utils.delete_s3_bucket(pipeline.bucket_name)
         sys.exit(1)
 
 
@@ -329,7 +550,7 @@ def _get_pcluster_version_from_stack(stack):
     :param stack: stack object
     :return: version or empty string
     """
-    return next((tag.get("Value") for tag in stack.get("Tags") if tag.get("Key") == "Version"), "")
+    return next((tag.get("Value") for tag in stack.get("Tags", []) if tag.get("Key") == "Version"), "")
 
 
 def _colorize(stack_status, args):
@@ -354,18 +575,21 @@ def list_stacks(args):
     PclusterConfig.init_aws(config_file=args.config_file)
 
     try:
+        stacks = _describe_cluster_stacks()
+        details = _run_concurrently(_get_cluster_details, stacks) if args.details else None
         result = []
-        for stack in utils.paginate_boto3(boto3.client("cloudformation").describe_stacks):
-            if stack.get("ParentId") is None and stack.get("StackName").startswith(PCLUSTER_STACK_PREFIX):
-                pcluster_version = _get_pcluster_version_from_stack(stack)
-                result.append(
-                    [
-                        stack.get("StackName")[len(PCLUSTER_STACK_PREFIX) :],  # noqa: E203
-                        _colorize(stack.get("StackStatus"), args),
-                        pcluster_version,
-                    ]
-                )
-        LOGGER.info(tabulate(result, tablefmt="plain"))
+        for index, stack in enumerate(stacks):
+            row = [
+                stack.get("StackName")[len(PCLUSTER_STACK_PREFIX) :],  # noqa: E203
+                _colorize(stack.get("StackStatus"), args),
+                _get_pcluster_version_from_stack(stack),
+            ]
+            result.append(row + details[index] if details else row)
+        if details:
+            headers = ["Cluster", "Status", "Version", "ComputeFleetStatus", "MasterServer", "ComputeInstances"]
+            LOGGER.info(tabulate(result, headers=headers, tablefmt="plain"))
+        else:
+            LOGGER.info(tabulate(result, tablefmt="plain"))
     except ClientError as e:
         LOGGER.critical(e.response.get("Error").get("Message"))
         sys.exit(1)
@@ -374,8 +598,61 @@ def list_stacks(args):
         sys.exit(0)
 
 
+def _describe_cluster_stacks():
+    """
+    Return the descriptions of the ParallelCluster root stacks in the region.
+
+    Stacks are listed with ListStacks, which only returns summaries and supports filtering by status,
+    then only the cluster root stacks are described, concurrently, to retrieve their tags and outputs.
+    """
+    stack_summaries = [
+        stack_summary
+        for stack_summary in utils.paginate_boto3(
+            boto3_clients.get_client("cloudformation").list_stacks, StackStatusFilter=utils.LISTED_STACK_STATUSES
+        )
+        if stack_summary.get("ParentId") is None and stack_summary.get("StackName").startswith(PCLUSTER_STACK_PREFIX)
+    ]
+    return _run_concurrently(_describe_cluster_stack, stack_summaries)
+
+
+def _describe_cluster_stack(stack_summary):
+    """Return the description of the stack with the given summary, or the summary itself if not available."""
+    try:
+        return utils.get_stack(stack_summary.get("StackId"), raise_on_error=True)
+    except ClientError as e:
+        # e.g. the stack has been deleted in the meantime
+        LOGGER.debug("Unable to describe stack %s: %s", stack_summary.get("StackName"), e)
+        return stack_summary
+
+
+def _get_cluster_details(stack):
+    """Return compute fleet status, master server state and number of compute instances of the given cluster."""
+    stack_name = stack.get("StackName")
+    compute_fleet_status = None
+    if utils.get_stack_output_value(stack.get("Outputs", []), "IsHITCluster") == "true":
+        compute_fleet_status = ComputeFleetStatusManager(utils.get_cluster_name(stack_name)).get_status()
+    master_server = utils.describe_cluster_instances(stack_name, node_type=utils.NodeType.master)
+    compute_instances = utils.describe_cluster_instances(stack_name, node_type=utils.NodeType.compute)
+    return [
+        str(compute_fleet_status) if compute_fleet_status else "-",
+        master_server[0].get("State").get("Name") if master_server else "-",
+        len(compute_instances),
+    ]
+
+
+def _run_concurrently(func, items):
+    """Return the results of func applied to each item, in the same order, calling it concurrently."""
+    if not items:
+        return []
+    executor = ThreadPoolExecutor(max_workers=min(LIST_CLUSTERS_MAX_WORKERS, len(items)))
+    try:
+        return list(executor.map(func, items))
+    finally:
+        executor.shutdown(wait=True)
+
+
 def _poll_master_server_state(stack_name):
-    ec2 = boto3.client("ec2")
+    ec2 = boto3_clients.get_client("ec2")
     try:
         instances = utils.describe_cluster_instances(stack_name, node_type=utils.NodeType.master)
         if not instances:
@@ -477,18 +754,20 @@ def ssh(args, extra_args):  # noqa: C901 FIXME!!!
         sys.exit(0)
 
 
-def status(args):  # noqa: C901 FIXME!!!
+def status(args, stack_snapshot=None):  # noqa: C901 FIXME!!!
     stack_name = utils.get_stack_name(args.cluster_name)
 
     # Parse configuration file to read the AWS section
     PclusterConfig.init_aws(config_file=args.config_file)
 
-    cfn = boto3.client("cloudformation")
+    stack_snapshot = stack_snapshot or utils.ClusterStackSnapshot(stack_name)
     try:
-        stack = utils.get_stack(stack_name, cfn)
+        stack = stack_snapshot.stack
         sys.stdout.write("\rStatus: %s" % stack.get("StackStatus"))
         sys.stdout.flush()
         if not args.nowait:
+            event_tailer = utils.StackEventTailer(stack_name)
+            event_tailer.skip_existing_events()
             while stack.get("StackStatus") not in [
                 "CREATE_COMPLETE",
                 "UPDATE_COMPLETE",
@@ -498,13 +777,9 @@ def status(args):  # noqa: C901 FIXME!!!
                 "DELETE_FAILED",
             ]:
                 time.sleep(5)
-                stack = utils.get_stack(stack_name, cfn)
-                events = utils.get_stack_events(stack_name)[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
+                stack_snapshot.invalidate()
+                stack = stack_snapshot.stack
+                utils.print_stack_events(event_tailer.poll())
             sys.stdout.write("\rStatus: %s\n" % stack.get("StackStatus"))
             sys.stdout.flush()
             if stack.get("StackStatus") in ["CREATE_COMPLETE", "UPDATE_COMPLETE", "UPDATE_ROLLBACK_COMPLETE"]:
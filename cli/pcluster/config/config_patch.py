@@ -79,6 +79,11 @@ class ConfigPatch(object):
             utils.get_stack_name(self.base_config.cluster_name) if hasattr(self.base_config, "cluster_name") else None
         )
 
+    @property
+    def stack_snapshot(self):
+        """Get the ClusterStackSnapshot of the stack this patch is referred to, if any."""
+        return getattr(self.base_config, "stack_snapshot", None)
+
     @property
     def config_file(self):
         """Get the name of the target configuration file, if any."""
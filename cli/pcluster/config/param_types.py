@@ -9,6 +9,7 @@
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
 import abc
+import functools
 import logging
 import re
 import sys
@@ -18,6 +19,7 @@ from enum import Enum
 from configparser import NoSectionError
 
 from pcluster.config.update_policy import UpdatePolicy
+from pcluster.config.validation import ValidationTask, run_validation_tasks
 from pcluster.config.validators import settings_validator
 from pcluster.utils import get_file_section_name
 
@@ -148,28 +150,45 @@ class Param(ABC):
 
     def validate(self):
         """Call validation functions for the parameter, if there."""
+        run_validation_tasks(self.get_validation_tasks())
+
+    def get_validation_tasks(self):
+        """Return the list of ValidationTask needed to validate the parameter, in the order they must be reported."""
+        tasks = []
         if self.definition.get("required") and self.value is None:
-            sys.exit("Configuration parameter '{0}' must have a value".format(self.key))
+            tasks.append(ValidationTask(self._report_missing_value))
 
         for validation_func in self.definition.get("validators", []):
             if self.value is None:
                 LOGGER.debug("Configuration parameter '%s' has no value", self.key)
             else:
-                errors, warnings = validation_func(self.key, self.value, self.pcluster_config)
-                if errors:
-                    self.pcluster_config.error(
-                        "The configuration parameter '{0}' generated the following errors:\n{1}".format(
-                            self.key, "\n".join(errors)
-                        )
-                    )
-                elif warnings:
-                    self.pcluster_config.warn(
-                        "The configuration parameter '{0}' generated the following warnings:\n{1}".format(
-                            self.key, "\n".join(warnings)
-                        )
+                tasks.append(
+                    ValidationTask(
+                        self._report_validation_result,
+                        functools.partial(validation_func, self.key, self.value, self.pcluster_config),
                     )
-                else:
-                    LOGGER.debug("Configuration parameter '%s' is valid", self.key)
+                )
+        return tasks
+
+    def _report_missing_value(self, _):
+        sys.exit("Configuration parameter '{0}' must have a value".format(self.key))
+
+    def _report_validation_result(self, result):
+        errors, warnings = result
+        if errors:
+            self.pcluster_config.error(
+                "The configuration parameter '{0}' generated the following errors:\n{1}".format(
+                    self.key, "\n".join(errors)
+                )
+            )
+        elif warnings:
+            self.pcluster_config.warn(
+                "The configuration parameter '{0}' generated the following warnings:\n{1}".format(
+                    self.key, "\n".join(warnings)
+                )
+            )
+        else:
+            LOGGER.debug("Configuration parameter '%s' is valid", self.key)
 
     def to_file(self, config_parser, write_defaults=False):
         """Set parameter in the config_parser in the right section."""
@@ -322,9 +341,9 @@ class SettingsParam(Param):
 
         return self
 
-    def validate(self):
+    def get_validation_tasks(self):
         """
-        Validate the Settings Parameter.
+        Return the list of ValidationTask needed to validate the Settings Parameter.
 
         Overrides the default params validation mechanism by adding a default validation based on the number of expected
         sections. The implementation takes into account nested settings params so that the number of resources is
@@ -332,6 +351,9 @@ class SettingsParam(Param):
         no more than 3 compute resources are activated per queue, while the total number can be up to 15 (3 per queue
         section).
         """
+        return [ValidationTask(self._report_resources_number)] + super(SettingsParam, self).get_validation_tasks()
+
+    def _report_resources_number(self, _):
         labels = None if not self.value else self.value.split(",")  # Section labels in the settings param
         max_resources = self.referred_section_definition.get("max_resources", 1)  # Max resources per parent section
 
@@ -342,8 +364,6 @@ class SettingsParam(Param):
                 )
             )
 
-        super(SettingsParam, self).validate()
-
     def _value_eq(self, other):
         """Compare settings labels ignoring positions and extra spaces."""
         value1 = self.value
@@ -509,36 +529,48 @@ class Section(ABC):
 
     def validate(self):
         """Call the validator function of the section and of all the parameters."""
+        run_validation_tasks(self.get_validation_tasks())
+
+    def get_validation_tasks(self):
+        """Return the list of ValidationTask needed to validate the section and its parameters, in report order."""
+        tasks = []
         if self.params:
             section_name = get_file_section_name(self.key, self.label)
-            LOGGER.debug("Validating section '[%s]'...", section_name)
 
             # validate section
             for validation_func in self.definition.get("validators", []):
-                errors, warnings = validation_func(self.key, self.label, self.pcluster_config)
-                if errors:
-                    self.pcluster_config.error(
-                        "The section [{0}] is wrongly configured\n" "{1}".format(section_name, "\n".join(errors))
+                tasks.append(
+                    ValidationTask(
+                        self._report_validation_result,
+                        functools.partial(validation_func, self.key, self.label, self.pcluster_config),
                     )
-                elif warnings:
-                    self.pcluster_config.warn(
-                        "The section [{0}] is wrongly configured\n{1}".format(section_name, "\n".join(warnings))
-                    )
-                else:
-                    LOGGER.debug("Section '[%s]' is valid", section_name)
+                )
 
             # validate items
-            LOGGER.debug("Validating parameters of section '[%s]'...", section_name)
             for param_key, param_definition in self.definition.get("params").items():
                 param_type = param_definition.get("type", self.get_default_param_type())
 
                 param = self.get_param(param_key)
-                if param:
-                    param.validate()
-                else:
+                if not param:
                     # define a default param and validate it
-                    param_type(self.key, self.label, param_key, param_definition, self.pcluster_config).validate()
-            LOGGER.debug("Parameters validation of section '[%s]' completed correctly.", section_name)
+                    param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config)
+                tasks.extend(param.get_validation_tasks())
+            LOGGER.debug("Collected %d validation tasks for section '[%s]'", len(tasks), section_name)
+        return tasks
+
+    def _report_validation_result(self, result):
+        section_name = get_file_section_name(self.key, self.label)
+        errors, warnings = result
+        if errors:
+            self.pcluster_config.error(
+                "The section [{0}] is wrongly configured\n" "{1}".format(section_name, "\n".join(errors))
+            )
+        elif warnings:
+            self.pcluster_config.warn(
+                "The section [{0}] is wrongly configured\n{1}".format(section_name, "\n".join(warnings))
+            )
+        else:
+            LOGGER.debug("Section '[%s]' is valid", section_name)
 
     def to_file(self, config_parser, write_defaults=False):
         """Create the section and add all the parameters in the config_parser."""
@@ -16,31 +16,40 @@ import logging
 import os
 import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 import configparser
 from botocore.exceptions import ClientError
 
+from pcluster import boto3_clients, metadata_cache
 from pcluster.cluster_model import ClusterModel, get_cluster_model, infer_cluster_model
 from pcluster.config.cfn_param_types import ClusterCfnSection
 from pcluster.config.mappings import ALIASES, AWS, GLOBAL
 from pcluster.config.param_types import StorageData
+from pcluster.config.resource_snapshot import ResourceSnapshot
+from pcluster.config.validation import get_validation_workers, run_validation_tasks
+from pcluster.constants import CLUSTER_CONFIG_KEY, PCLUSTER_CONFIG_FILE
 from pcluster.utils import (
+    ClusterStackSnapshot,
     get_cfn_param,
     get_file_section_name,
     get_installed_version,
-    get_stack,
     get_stack_name,
     get_stack_version,
     is_hit_enabled_cluster,
+    prefetch_instance_types_info,
 )
 
 LOGGER = logging.getLogger(__name__)
 
+# Namespace of the metadata cache storing the json configuration of the clusters, by stack and last update time
+CLUSTER_CONFIGS_CACHE_NAMESPACE = "cluster-configs"
+CLUSTER_CONFIGS_CACHE_TTL = 7 * 24 * 60 * 60
+
 
 def default_config_file_path():
     """Return the default path for the ParallelCluster configuration file."""
-    return os.path.expanduser(os.path.join("~", ".parallelcluster", "config"))
+    return os.path.expanduser(PCLUSTER_CONFIG_FILE)
 
 
 class PclusterConfig(object):
@@ -60,6 +69,7 @@ class PclusterConfig(object):
         auto_refresh=True,
         enforce_version=True,
         skip_load_json_config=False,
+        stack_snapshot=None,
     ):
         """
         Initialize object, from file, from a CFN Stack or from the internal mapping.
@@ -79,10 +89,14 @@ class PclusterConfig(object):
         the configuration, like a section being added, removed or renamed.
         :param enforce_version: when True enforces the CLI version to be of the same version as the cluster the user
         is interacting with.
+        :param stack_snapshot: ClusterStackSnapshot of the cluster stack, if already retrieved by the command
         """
         self.__autorefresh = False  # Initialization in progress
         self.fail_on_error = fail_on_error
         self.cfn_stack = None
+        self.stack_snapshot = stack_snapshot
+        # AWS resources referenced by the configuration, shared by the validators
+        self.resource_snapshot = ResourceSnapshot()
         self.__sections = OrderedDict({})
         self.__enforce_version = enforce_version
         self.__skip_load_json_config = skip_load_json_config
@@ -441,6 +455,12 @@ class PclusterConfig(object):
             new_sections[key] = new_sections_map
         self.__sections = new_sections
 
+        # Retrieve the info of the instance types used by all the compute resources with a single call,
+        # so that the refresh of the queue sections doesn't need to call EC2 for each of them
+        prefetch_instance_types_info(
+            [section.get_param_value("instance_type") for section in self.get_sections("compute_resource").values()]
+        )
+
         # Refresh all sections
         for _, sections in self.__sections.items():
             for _, section in sections.items():
@@ -448,7 +468,9 @@ class PclusterConfig(object):
 
     def __init_sections_from_cfn(self, cluster_name):
         try:
-            self.cfn_stack = get_stack(get_stack_name(cluster_name))
+            if not self.stack_snapshot:
+                self.stack_snapshot = ClusterStackSnapshot(get_stack_name(cluster_name))
+            self.cfn_stack = self.stack_snapshot.stack
             if self.__enforce_version and get_stack_version(self.cfn_stack) != get_installed_version():
                 self.error(
                     "The cluster {0} was created with a different version of ParallelCluster: {1}. "
@@ -480,10 +502,21 @@ class PclusterConfig(object):
             )
 
     def validate(self):
-        """Validate the configuration."""
+        """
+        Validate the configuration.
+
+        Validators of all the sections and parameters run concurrently, while their results are reported
+        in the same order of the sequential validation. The AWS resources referenced by the configuration
+        are described upfront, so that validators don't need to describe them again.
+        """
+        self.resource_snapshot = ResourceSnapshot()
+        self.resource_snapshot.prefetch(self)
+
+        tasks = []
         for _, sections in self.__sections.items():
             for _, section in sections.items():
-                section.validate()
+                tasks.extend(section.get_validation_tasks())
+        run_validation_tasks(tasks, max_workers=get_validation_workers())
 
         # test provided configuration
         self.__test_configuration()
@@ -510,7 +543,42 @@ class PclusterConfig(object):
         return json_config
 
     def __retrieve_cluster_config(self, bucket):
-        table = boto3.resource("dynamodb").Table(get_stack_name(self.cluster_name))
+        """
+        Retrieve the json configuration of the cluster, with the version written to DynamoDB.
+
+        The configuration is cached locally by stack and last update time. The cached copy is used as long as its
+        S3 version is the one in DynamoDB, or, when the latest version is used, until the ETag changes. Without a
+        cached copy the latest configuration is downloaded while DynamoDB is read, since it's usually the same version.
+        """
+        cache = metadata_cache.get_cache()
+        cache_key = [
+            self.cfn_stack.get("StackId"),
+            str(self.cfn_stack.get("LastUpdatedTime") or self.cfn_stack.get("CreationTime")),
+        ]
+        cached_object = cache.get(CLUSTER_CONFIGS_CACHE_NAMESPACE, cache_key)
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            config_version = executor.submit(self.__retrieve_cluster_config_version)
+            latest_object = executor.submit(_get_cluster_config_object, bucket) if not cached_object else None
+            config_version = config_version.result()
+            try:
+                config_object = _resolve_cluster_config_object(
+                    bucket, config_version, cached_object, latest_object.result() if latest_object else None
+                )
+            except Exception as e:
+                self.error("Unable to load configuration from bucket '{0}'.\n{1}".format(bucket, e))
+                return None
+        finally:
+            executor.shutdown(wait=True)
+
+        if config_object is not cached_object:
+            cache.set(CLUSTER_CONFIGS_CACHE_NAMESPACE, cache_key, config_object, ttl=CLUSTER_CONFIGS_CACHE_TTL)
+        return json.loads(config_object.get("content"), object_pairs_hook=OrderedDict)
+
+    def __retrieve_cluster_config_version(self):
+        """Return the S3 version of the cluster configuration written to DynamoDB, None to use the latest one."""
+        table = boto3_clients.get_resource("dynamodb").Table(get_stack_name(self.cluster_name))
         config_version = None  # Use latest if not found
         try:
             config_version_item = table.get_item(ConsistentRead=True, Key={"Id": "CLUSTER_CONFIG"})
@@ -518,14 +586,7 @@ class PclusterConfig(object):
                 config_version = config_version_item["Item"].get("Version")
         except Exception as e:
             self.error("Failed when retrieving cluster config version from DynamoDB with error {0}".format(e))
-
-        try:
-            config_version_args = {"VersionId": config_version} if config_version else {}
-            s3_object = boto3.resource("s3").Object(bucket, "configs/cluster-config.json")
-            json_str = s3_object.get(**config_version_args)["Body"].read().decode("utf-8")
-            return json.loads(json_str, object_pairs_hook=OrderedDict)
-        except Exception as e:
-            self.error("Unable to load configuration from bucket '{0}'.\n{1}".format(bucket, e))
+        return config_version
 
     def __test_configuration(self):  # noqa: C901
         """
@@ -573,3 +634,41 @@ class PclusterConfig(object):
         config_metadata_param = self.get_section("cluster").get_param("cluster_config_metadata")
         self.__sections = pcluster_config.__sections
         self.get_section("cluster").set_param("cluster_config_metadata", config_metadata_param)
+
+
+def _get_cluster_config_object(bucket, version_id=None, etag=None):
+    """
+    Return content, VersionId and ETag of the cluster configuration stored in the given bucket.
+
+    :param version_id: version of the configuration, the latest one if None
+    :param etag: ETag of the cached copy, None is returned if the configuration still matches it
+    """
+    kwargs = {"Bucket": bucket, "Key": CLUSTER_CONFIG_KEY}
+    if version_id:
+        kwargs["VersionId"] = version_id
+    if etag:
+        kwargs["IfNoneMatch"] = etag
+    try:
+        response = boto3_clients.get_client("s3").get_object(**kwargs)
+    except ClientError as e:
+        if etag and e.response.get("Error").get("Code") in ("304", "NotModified"):
+            return None
+        raise
+    return {
+        "content": response["Body"].read().decode("utf-8"),
+        "version_id": response.get("VersionId"),
+        "etag": response.get("ETag"),
+    }
+
+
+def _resolve_cluster_config_object(bucket, config_version, cached_object, latest_object):
+    """Return the cluster configuration with the given version, downloading it only if not cached nor the latest."""
+    for config_object in (cached_object, latest_object):
+        if config_version and config_object and config_object.get("version_id") == config_version:
+            return config_object
+    if config_version:
+        return _get_cluster_config_object(bucket, config_version)
+    if latest_object:
+        return latest_object
+    # The version is not available, the cached copy is used if it's still the latest one
+    return _get_cluster_config_object(bucket, etag=cached_object.get("etag")) or cached_object
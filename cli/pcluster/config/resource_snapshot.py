@@ -0,0 +1,172 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import threading
+from collections import namedtuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from pcluster import boto3_clients
+
+LOGGER = logging.getLogger(__name__)
+
+ResourceType = namedtuple("ResourceType", ["service", "operation", "ids_argument", "response_key", "id_key"])
+
+SUBNET = "subnet"
+SECURITY_GROUP = "security-group"
+VOLUME = "volume"
+SNAPSHOT = "snapshot"
+IMAGE = "image"
+FSX_FILE_SYSTEM = "fsx-file-system"
+
+RESOURCE_TYPES = {
+    SUBNET: ResourceType("ec2", "describe_subnets", "SubnetIds", "Subnets", "SubnetId"),
+    SECURITY_GROUP: ResourceType("ec2", "describe_security_groups", "GroupIds", "SecurityGroups", "GroupId"),
+    VOLUME: ResourceType("ec2", "describe_volumes", "VolumeIds", "Volumes", "VolumeId"),
+    SNAPSHOT: ResourceType("ec2", "describe_snapshots", "SnapshotIds", "Snapshots", "SnapshotId"),
+    IMAGE: ResourceType("ec2", "describe_images", "ImageIds", "Images", "ImageId"),
+    FSX_FILE_SYSTEM: ResourceType("fsx", "describe_file_systems", "FileSystemIds", "FileSystems", "FileSystemId"),
+}
+
+# Configuration parameters referencing the resources of each type, as (section_key, param_key)
+REFERENCING_PARAMS = {
+    SUBNET: [("vpc", "master_subnet_id"), ("vpc", "compute_subnet_id")],
+    SECURITY_GROUP: [("vpc", "vpc_security_group_id"), ("vpc", "additional_sg")],
+    VOLUME: [("ebs", "ebs_volume_id")],
+    SNAPSHOT: [("ebs", "ebs_snapshot_id")],
+    IMAGE: [("cluster", "custom_ami")],
+    FSX_FILE_SYSTEM: [("fsx", "fsx_fs_id")],
+}
+EFS_REFERENCING_PARAMS = [("efs", "efs_fs_id")]
+
+
+class ResourceSnapshot(object):
+    """
+    Descriptions of the AWS resources referenced by the configuration, retrieved once per validation.
+
+    prefetch describes all the resources of the same type with a single call, then validators read the descriptions
+    from the snapshot instead of calling the service again. Resources not prefetched are described on first access,
+    with the same request the validators used to do, and the result (or the error) is kept for the following accesses.
+    When a batched call fails (e.g. because one of the ids doesn't exist) nothing is stored, so that each resource
+    is described on its own and every validator still reports the error of its own resource.
+    """
+
+    def __init__(self):
+        """Initialize an empty snapshot."""
+        self._resources = {resource_type: {} for resource_type in RESOURCE_TYPES}
+        self._efs_mount_targets = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        """Return an empty snapshot, copies of the configuration describe the resources again when validated."""
+        return ResourceSnapshot()
+
+    def prefetch(self, pcluster_config):
+        """
+        Describe all the resources referenced by the given configuration, one call per resource type.
+
+        Errors are only logged, since the resources are described again on access.
+        :param pcluster_config: PclusterConfig object
+        """
+        resource_ids = {
+            resource_type: _get_referenced_ids(pcluster_config, referencing_params)
+            for resource_type, referencing_params in REFERENCING_PARAMS.items()
+        }
+
+        # EFS doesn't support describing the mount targets of multiple file systems at once
+        for efs_fs_id in _get_referenced_ids(pcluster_config, EFS_REFERENCING_PARAMS):
+            try:
+                for mount_target in self.get_efs_mount_targets(efs_fs_id):
+                    resource_ids[SUBNET].append(mount_target.get("SubnetId"))
+            except (BotoCoreError, ClientError) as e:
+                LOGGER.debug("Unable to prefetch mount targets of EFS %s: %s", efs_fs_id, e)
+
+        for resource_type, ids in resource_ids.items():
+            ids = sorted(set(resource_id for resource_id in ids if resource_id))
+            if ids:
+                try:
+                    self._describe(resource_type, ids)
+                except (BotoCoreError, ClientError) as e:
+                    LOGGER.debug("Unable to prefetch %s resources %s: %s", resource_type, ids, e)
+
+    def get(self, resource_type, resource_id):
+        """
+        Return the description of the given resource or None if the service returned no description.
+
+        :param resource_type: one of the RESOURCE_TYPES keys, e.g. SUBNET
+        :param resource_id: id of the resource
+        :raise: ClientError if the resource cannot be described
+        """
+        return self.get_many(resource_type, [resource_id])[0]
+
+    def get_many(self, resource_type, resource_ids):
+        """
+        Return the descriptions of the given resources, in the same order, describing the missing ones at once.
+
+        :raise: ClientError if any of the resources cannot be described
+        """
+        with self._lock:
+            cached_resources = self._resources[resource_type]
+            missing_ids = [resource_id for resource_id in resource_ids if resource_id not in cached_resources]
+        if missing_ids:
+            try:
+                self._describe(resource_type, missing_ids)
+            except ClientError as e:
+                if len(missing_ids) != 1:
+                    raise
+                with self._lock:
+                    self._resources[resource_type][missing_ids[0]] = e
+
+        descriptions = []
+        with self._lock:
+            for resource_id in resource_ids:
+                description = self._resources[resource_type].get(resource_id)
+                if isinstance(description, ClientError):
+                    raise description
+                descriptions.append(description)
+        return descriptions
+
+    def get_efs_mount_targets(self, efs_fs_id):
+        """Return the mount targets of the given EFS file system."""
+        with self._lock:
+            mount_targets = self._efs_mount_targets.get(efs_fs_id)
+        if mount_targets is None:
+            mount_targets = (
+                boto3_clients.get_client("efs").describe_mount_targets(FileSystemId=efs_fs_id).get("MountTargets")
+            )
+            with self._lock:
+                self._efs_mount_targets[efs_fs_id] = mount_targets
+        return mount_targets
+
+    def _describe(self, resource_type, resource_ids):
+        resource = RESOURCE_TYPES[resource_type]
+        response = getattr(boto3_clients.get_client(resource.service), resource.operation)(
+            **{resource.ids_argument: resource_ids}
+        )
+        items = response.get(resource.response_key)
+        if len(resource_ids) == 1:
+            descriptions = {resource_ids[0]: items[0] if items else None}
+        else:
+            descriptions = {description.get(resource.id_key): description for description in items}
+        with self._lock:
+            for resource_id in resource_ids:
+                # Resources not returned by the service (e.g. AMIs) are stored as None to not describe them again
+                self._resources[resource_type][resource_id] = descriptions.get(resource_id)
+
+
+def _get_referenced_ids(pcluster_config, referencing_params):
+    ids = []
+    for section_key, param_key in referencing_params:
+        for section in pcluster_config.get_sections(section_key).values():
+            param_value = section.get_param_value(param_key)
+            if param_value and param_value != "NONE":
+                ids.append(param_value)
+    return ids
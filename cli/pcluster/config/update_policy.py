@@ -116,10 +116,10 @@ UpdatePolicy.SUPPORTED = UpdatePolicy(level=0, fail_reason="-", condition_checke
 UpdatePolicy.AWSBATCH_CE_MAX_RESIZE = UpdatePolicy(
     level=1,
     fail_reason=lambda change, patch: "Max vCPUs can not be lower than the current Desired vCPUs ({0})".format(
-        utils.get_batch_ce_capacity(patch.stack_name)
+        utils.get_batch_ce_capacity(patch.stack_name, patch.stack_snapshot)
     ),
     action_needed=UpdatePolicy.ACTIONS_NEEDED["pcluster_stop"],
-    condition_checker=lambda change, patch: utils.get_batch_ce_capacity(patch.stack_name)
+    condition_checker=lambda change, patch: utils.get_batch_ce_capacity(patch.stack_name, patch.stack_snapshot)
     <= patch.target_config.get_section("cluster").get_param_value("max_vcpus"),
 )
 
@@ -138,7 +138,9 @@ UpdatePolicy.COMPUTE_FLEET_STOP = UpdatePolicy(
     level=10,
     fail_reason="All compute nodes must be stopped",
     action_needed=UpdatePolicy.ACTIONS_NEEDED["pcluster_stop"],
-    condition_checker=lambda change, patch: not utils.cluster_has_running_capacity(patch.stack_name),
+    condition_checker=lambda change, patch: not utils.cluster_has_running_capacity(
+        patch.stack_name, patch.stack_snapshot
+    ),
 )
 
 # Update supported only with master node down
@@ -0,0 +1,86 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_VALIDATION_WORKERS = 10
+VALIDATION_WORKERS_ENV = "AWS_PCLUSTER_VALIDATION_WORKERS"
+
+
+class ValidationTask(object):
+    """
+    A single validation step of the configuration.
+
+    The check function performs the actual validation (usually involving AWS calls) and must not print anything,
+    while the report function receives the result of the check and prints errors and warnings, possibly exiting.
+    Keeping the two separate allows to run checks concurrently while reporting results in the configuration order.
+    """
+
+    def __init__(self, report_func, check_func=None):
+        """
+        Initialize the task.
+
+        :param report_func: function receiving the result of check_func
+        :param check_func: function without arguments performing the validation, None if nothing has to be checked
+        """
+        self.check_func = check_func
+        self.report_func = report_func
+
+    def check(self):
+        """Run the check function and return its result."""
+        return self.check_func() if self.check_func else None
+
+    def report(self, result):
+        """Report the result of the check."""
+        self.report_func(result)
+
+
+def get_validation_workers():
+    """Return the number of validation checks to run concurrently."""
+    try:
+        return max(1, int(os.environ.get(VALIDATION_WORKERS_ENV, DEFAULT_VALIDATION_WORKERS)))
+    except ValueError:
+        LOGGER.warning("Invalid value for %s, using %s", VALIDATION_WORKERS_ENV, DEFAULT_VALIDATION_WORKERS)
+        return DEFAULT_VALIDATION_WORKERS
+
+
+def run_validation_tasks(tasks, max_workers=1):
+    """
+    Run the given validation tasks and report their results in order.
+
+    With a single worker every check is immediately followed by its report, so nothing is checked after a failure.
+    Otherwise checks run on a bounded thread pool and are reported in the same order as the tasks, so the output is
+    the same of the sequential execution. Exceptions raised by a check (including SystemExit) are raised again when
+    its result is reported, and the checks not yet started are cancelled as soon as a report fails.
+    :param tasks: list of ValidationTask
+    :param max_workers: maximum number of checks to run concurrently
+    """
+    tasks = list(tasks)
+    checked_tasks = [task for task in tasks if task.check_func]
+    if max_workers <= 1 or len(checked_tasks) <= 1:
+        for task in tasks:
+            task.report(task.check())
+        return
+
+    LOGGER.debug("Running %d validation checks with %d workers", len(checked_tasks), max_workers)
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(checked_tasks)))
+    futures = [executor.submit(task.check) if task.check_func else None for task in tasks]
+    try:
+        for task, future in zip(tasks, futures):
+            task.report(future.result() if future else None)
+    finally:
+        for future in futures:
+            if future:
+                future.cancel()
+        executor.shutdown(wait=True)
@@ -8,29 +8,33 @@
 # or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
+import json
 import logging
 import re
 import urllib.error
 import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
-import boto3
 from botocore.exceptions import ClientError
 
+from pcluster import boto3_clients, metadata_cache
+from pcluster.config.resource_snapshot import FSX_FILE_SYSTEM, IMAGE, SECURITY_GROUP, SNAPSHOT, SUBNET, VOLUME
+from pcluster.config.validation import get_validation_workers
 from pcluster.constants import CIDR_ALL_IPS, FSX_HDD_THROUGHPUT, FSX_SSD_THROUGHPUT
 from pcluster.dcv.utils import get_supported_dcv_os
 from pcluster.utils import (
     ellipsize,
     get_base_additional_iam_policies,
-    get_ebs_snapshot_info,
-    get_efs_mount_target_id,
     get_file_section_name,
+    get_instance_type_offerings,
     get_instance_vcpus,
     get_partition,
     get_region,
     get_supported_architectures_for_instance_type,
     get_supported_compute_instance_types,
-    get_supported_instance_types,
     get_supported_os_for_architecture,
     get_supported_os_for_scheduler,
     is_instance_type_format,
@@ -40,6 +44,10 @@ from pcluster.utils import (
 
 LOGFILE_LOGGER = logging.getLogger("cli_log_file")
 
+# Successful simulations of the ParallelCluster policy are cached, so that the IAM role is not checked at every create
+IAM_ROLE_SIMULATIONS_CACHE_NAMESPACE = "iam-role-simulations"
+IAM_ROLE_SIMULATIONS_CACHE_TTL = 60 * 60
+
 DCV_MESSAGES = {
     "warnings": {
         "access_from_world": "With this configuration you are opening dcv port ({port}) to the world (0.0.0.0/0). "
@@ -88,6 +96,11 @@ def _get_sts_endpoint():
     return "https://sts.{0}.{1}".format(region, "amazonaws.com.cn" if region.startswith("cn-") else "amazonaws.com")
 
 
+def _get_account_id():
+    """Return the id of the AWS account of the current credentials."""
+    return boto3_clients.get_client("sts", endpoint_url=_get_sts_endpoint()).get_caller_identity().get("Account")
+
+
 def _check_sg_rules_for_port(rule, port_to_check):
     """
     Verify if the security group rule accepts connections on the given port.
@@ -117,16 +130,16 @@ def efs_id_validator(param_key, param_value, pcluster_config):
     try:
         # Get master availability zone
         master_avail_zone = pcluster_config.get_master_availability_zone()
-        mount_target_id = get_efs_mount_target_id(efs_fs_id=param_value, avail_zone=master_avail_zone)
+        mount_target_id = _get_efs_mount_target_id(pcluster_config.resource_snapshot, param_value, master_avail_zone)
         # If there is an existing mt in the az, need to check the inbound and outbound rules of the security groups
         if mount_target_id:
             # Get list of security group IDs of the mount target
             sg_ids = (
-                boto3.client("efs")
+                boto3_clients.get_client("efs")
                 .describe_mount_target_security_groups(MountTargetId=mount_target_id)
                 .get("SecurityGroups")
             )
-            if not _check_in_out_access(sg_ids, port=2049):
+            if not _check_in_out_access(pcluster_config.resource_snapshot, sg_ids, port=2049):
                 warnings.append(
                     "There is an existing Mount Target {0} in the Availability Zone {1} for EFS {2}, "
                     "but it does not have a security group that allows inbound and outbound rules to support NFS. "
@@ -140,10 +153,38 @@ def efs_id_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
-def _check_in_out_access(security_groups_ids, port):
+def _get_efs_mount_target_id(resource_snapshot, efs_fs_id, avail_zone):
+    """
+    Search for a Mount Target Id in given availability zone for the given EFS file system id.
+
+    :param resource_snapshot: ResourceSnapshot of the configuration
+    :param efs_fs_id: EFS file system Id
+    :param avail_zone: Availability zone to verify
+    :return: the mount_target_id or None
+    """
+    mount_target_id = None
+    for mount_target in resource_snapshot.get_efs_mount_targets(efs_fs_id):
+        # Check to see if there is an existing mt in the az of the stack
+        try:
+            subnet = resource_snapshot.get(SUBNET, mount_target.get("SubnetId"))
+        except ClientError as e:
+            LOGFILE_LOGGER.debug(
+                "Unable to detect availability zone for subnet {0}.\n{1}".format(
+                    mount_target.get("SubnetId"), e.response.get("Error").get("Message")
+                )
+            )
+            continue
+        if subnet and avail_zone == subnet.get("AvailabilityZone"):
+            mount_target_id = mount_target.get("MountTargetId")
+
+    return mount_target_id
+
+
+def _check_in_out_access(resource_snapshot, security_groups_ids, port):
     """
     Verify given list of security groups to check if they allow in and out access on the given port.
 
+    :param resource_snapshot: ResourceSnapshot of the configuration
     :param security_groups_ids: list of security groups to verify
     :param port: port to verify
     :return true if
@@ -153,7 +194,9 @@ def _check_in_out_access(security_groups_ids, port):
     in_access = False
     out_access = False
 
-    for sec_group in boto3.client("ec2").describe_security_groups(GroupIds=security_groups_ids).get("SecurityGroups"):
+    for sec_group in resource_snapshot.get_many(SECURITY_GROUP, security_groups_ids):
+        if not sec_group:
+            continue
 
         # Check all inbound rules
         for rule in sec_group.get("IpPermissions"):
@@ -241,13 +284,20 @@ def fsx_id_validator(param_key, param_value, pcluster_config):
     warnings = []
 
     try:
-        ec2 = boto3.client("ec2")
+        resource_snapshot = pcluster_config.resource_snapshot
 
         # Check to see if there is any existing mt on the fs
-        file_system = boto3.client("fsx").describe_file_systems(FileSystemIds=[param_value]).get("FileSystems")[0]
+        file_system = resource_snapshot.get(FSX_FILE_SYSTEM, param_value)
+        if not file_system:
+            errors.append("FSx file system {0} does not exist".format(param_value))
+            return errors, warnings
 
         subnet_id = pcluster_config.get_section("vpc").get_param_value("master_subnet_id")
-        vpc_id = ec2.describe_subnets(SubnetIds=[subnet_id]).get("Subnets")[0].get("VpcId")
+        subnet = resource_snapshot.get(SUBNET, subnet_id)
+        if not subnet:
+            errors.append("Subnet {0} does not exist".format(subnet_id))
+            return errors, warnings
+        vpc_id = subnet.get("VpcId")
 
         # Check to see if fs is in the same VPC as the stack
         if file_system.get("VpcId") != vpc_id:
@@ -264,16 +314,18 @@ def fsx_id_validator(param_key, param_value, pcluster_config):
                 "Elastic Network Interfaces attached to it.".format(param_value)
             )
         else:
-            network_interface_responses = ec2.describe_network_interfaces(
-                NetworkInterfaceIds=network_interface_ids
-            ).get("NetworkInterfaces")
+            network_interface_responses = (
+                boto3_clients.get_client("ec2")
+                .describe_network_interfaces(NetworkInterfaceIds=network_interface_ids)
+                .get("NetworkInterfaces")
+            )
 
             fs_access = False
             network_interfaces = [ni for ni in network_interface_responses if ni.get("VpcId") == vpc_id]
             for network_interface in network_interfaces:
                 # Get list of security group IDs
                 sg_ids = [sg.get("GroupId") for sg in network_interface.get("Groups")]
-                if _check_in_out_access(sg_ids, port=988):
+                if _check_in_out_access(resource_snapshot, sg_ids, port=988):
                     fs_access = True
                     break
             if not fs_access:
@@ -400,7 +452,7 @@ def kms_key_validator(param_key, param_value, pcluster_config):
     warnings = []
 
     try:
-        boto3.client("kms").describe_key(KeyId=param_value)
+        boto3_clients.get_client("kms").describe_key(KeyId=param_value)
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
 
@@ -447,7 +499,10 @@ def _validate_efa_sg(pcluster_config, errors):
     vpc_security_group_id = pcluster_config.get_section("vpc").get_param_value("vpc_security_group_id")
     if vpc_security_group_id:
         try:
-            sg = boto3.client("ec2").describe_security_groups(GroupIds=[vpc_security_group_id]).get("SecurityGroups")[0]
+            sg = pcluster_config.resource_snapshot.get(SECURITY_GROUP, vpc_security_group_id)
+            if not sg:
+                errors.append("Security group {0} does not exist".format(vpc_security_group_id))
+                return
             allowed_in = False
             allowed_out = False
 
@@ -498,31 +553,80 @@ def ec2_key_pair_validator(param_key, param_value, pcluster_config):
 def ec2_iam_role_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
+    executor = ThreadPoolExecutor(max_workers=get_validation_workers())
     try:
-        iam = boto3.client("iam")
-        arn = iam.get_role(RoleName=param_value).get("Role").get("Arn")
-        account_id = boto3.client("sts", endpoint_url=_get_sts_endpoint()).get_caller_identity().get("Account")
+        account_id = executor.submit(_get_account_id)
+        arn = boto3_clients.get_client("iam").get_role(RoleName=param_value).get("Role").get("Arn")
 
-        iam_policy = _get_pcluster_user_policy(get_partition(), get_region(), account_id)
+        iam_policy = _get_pcluster_user_policy(get_partition(), get_region(), account_id.result())
 
-        for actions, resource_arn in iam_policy:
-            response = iam.simulate_principal_policy(
-                PolicySourceArn=arn, ActionNames=actions, ResourceArns=[resource_arn]
+        for decision in _get_denied_iam_role_decisions(executor, arn, iam_policy):
+            errors.append(
+                "IAM role error on user provided role {0}: action {1} is {2}.\n"
+                "See https://docs.aws.amazon.com/parallelcluster/latest/ug/iam.html".format(
+                    param_value, decision.get("EvalActionName"), decision.get("EvalDecision")
+                )
             )
-            for decision in response.get("EvaluationResults"):
-                if decision.get("EvalDecision") != "allowed":
-                    errors.append(
-                        "IAM role error on user provided role {0}: action {1} is {2}.\n"
-                        "See https://docs.aws.amazon.com/parallelcluster/latest/ug/iam.html".format(
-                            param_value, decision.get("EvalActionName"), decision.get("EvalDecision")
-                        )
-                    )
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
+    finally:
+        executor.shutdown(wait=True)
 
     return errors, warnings
 
 
+def _get_denied_iam_role_decisions(executor, role_arn, iam_policy):
+    """
+    Simulate the given policy for the IAM role and return the evaluation results of the actions not allowed.
+
+    Actions on the same resource are simulated with a single request and requests are sent concurrently, while
+    results are returned in the same order of the policy. Actions missing from the simulation results are not
+    allowed, with the "not evaluated" decision. Policies entirely allowed are cached for the role.
+    :param executor: executor used to send the requests
+    :param role_arn: ARN of the IAM role
+    :param iam_policy: list of (actions, resource_arn), as returned by _get_pcluster_user_policy
+    """
+    cache = metadata_cache.get_cache()
+    cache_key = {
+        "role_arn": role_arn,
+        "policy_hash": hashlib.sha256(json.dumps(iam_policy, sort_keys=True).encode("utf-8")).hexdigest(),
+    }
+    if cache.get(IAM_ROLE_SIMULATIONS_CACHE_NAMESPACE, cache_key):
+        LOGFILE_LOGGER.debug("IAM role %s already validated", role_arn)
+        return []
+
+    actions_by_resource = OrderedDict()
+    for actions, resource_arn in iam_policy:
+        actions_by_resource.setdefault(resource_arn, []).extend(actions)
+    simulations = OrderedDict(
+        (resource_arn, executor.submit(_simulate_principal_policy, role_arn, actions, resource_arn))
+        for resource_arn, actions in actions_by_resource.items()
+    )
+
+    denied_decisions = []
+    for actions, resource_arn in iam_policy:
+        decisions = simulations[resource_arn].result()
+        for action in actions:
+            decision = decisions.get(action.lower()) or {"EvalActionName": action, "EvalDecision": "not evaluated"}
+            if decision.get("EvalDecision") != "allowed":
+                denied_decisions.append(decision)
+
+    if not denied_decisions:
+        cache.set(IAM_ROLE_SIMULATIONS_CACHE_NAMESPACE, cache_key, True, ttl=IAM_ROLE_SIMULATIONS_CACHE_TTL)
+    return denied_decisions
+
+
+def _simulate_principal_policy(role_arn, actions, resource_arn):
+    """Return the evaluation results of the given actions on the resource for the IAM role, by lowercase action."""
+    iam = boto3_clients.get_client("iam")
+    return {
+        decision.get("EvalActionName").lower(): decision
+        for decision in paginate_boto3(
+            iam.simulate_principal_policy, PolicySourceArn=role_arn, ActionNames=actions, ResourceArns=[resource_arn]
+        )
+    }
+
+
 def ec2_iam_policies_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -530,7 +634,7 @@ def ec2_iam_policies_validator(param_key, param_value, pcluster_config):
         if param_value:
             for iam_policy in param_value:
                 if iam_policy not in get_base_additional_iam_policies():
-                    iam = boto3.client("iam")
+                    iam = boto3_clients.get_client("iam")
                     iam.get_policy(PolicyArn=iam_policy.strip())
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
@@ -589,7 +693,7 @@ def ec2_instance_type_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
 
-    if param_value not in get_supported_instance_types():
+    if param_value not in get_instance_type_offerings():
         errors.append(
             "The instance type '{0}' used for the '{1}' parameter is not supported by AWS ParallelCluster.".format(
                 param_value, param_key
@@ -602,7 +706,7 @@ def ec2_vpc_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        ec2 = boto3.client("ec2")
+        ec2 = boto3_clients.get_client("ec2")
         ec2.describe_vpcs(VpcIds=[param_value])
 
         # Check for DNS support in the VPC
@@ -629,7 +733,7 @@ def ec2_subnet_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        boto3.client("ec2").describe_subnets(SubnetIds=[param_value])
+        pcluster_config.resource_snapshot.get(SUBNET, param_value)
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
 
@@ -640,7 +744,7 @@ def ec2_security_group_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        boto3.client("ec2").describe_security_groups(GroupIds=[param_value])
+        pcluster_config.resource_snapshot.get(SECURITY_GROUP, param_value)
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
 
@@ -653,16 +757,17 @@ def ec2_ami_validator(param_key, param_value, pcluster_config):
 
     # Make sure AMI exists
     try:
-        image_info = boto3.client("ec2").describe_images(ImageIds=[param_value]).get("Images")[0]
-        validate_pcluster_version_based_on_ami_name(image_info.get("Name"))
+        image_info = pcluster_config.resource_snapshot.get(IMAGE, param_value)
+        if image_info:
+            validate_pcluster_version_based_on_ami_name(image_info.get("Name"))
+        else:
+            errors.append("Unable to find AMI {0}. Check value of parameter {1}.".format(param_value, param_key))
     except ClientError as e:
         errors.append(
             "Unable to get information for AMI {0}: {1}. Check value of parameter {2}.".format(
                 param_value, e.response.get("Error").get("Message"), param_key
             )
         )
-    except IndexError:
-        errors.append("Unable to find AMI {0}. Check value of parameter {1}.".format(param_value, param_key))
 
     if not errors:
         # Make sure architecture implied by instance types agrees with that implied by AMI
@@ -687,7 +792,7 @@ def ec2_placement_group_validator(param_key, param_value, pcluster_config):
         pass
     else:
         try:
-            boto3.client("ec2").describe_placement_groups(GroupNames=[param_value])
+            boto3_clients.get_client("ec2").describe_placement_groups(GroupNames=[param_value])
         except ClientError as e:
             errors.append(e.response.get("Error").get("Message"))
 
@@ -727,7 +832,7 @@ def s3_uri_validator(param_key, param_value, pcluster_config):
         if not match or len(match.groups()) < 2:
             raise ValueError("S3 url is invalid.")
         bucket, key = match.group(1), match.group(2)
-        boto3.client("s3").head_object(Bucket=bucket, Key=key)
+        boto3_clients.get_client("s3").head_object(Bucket=bucket, Key=key)
 
     except ClientError:
 
@@ -766,7 +871,7 @@ def s3_bucket_validator(param_key, param_value, pcluster_config):
     if urlparse(param_value).scheme == "s3":
         try:
             bucket = get_bucket_name_from_s3_url(param_value)
-            boto3.client("s3").head_bucket(Bucket=bucket)
+            boto3_clients.get_client("s3").head_bucket(Bucket=bucket)
         except ClientError as client_error:
             if client_error.response.get("Error").get("Code") == "NoSuchBucket":
                 errors.append(
@@ -804,7 +909,9 @@ def fsx_lustre_auto_import_validator(param_key, param_value, pcluster_config):
 
     if param_value is not None and param_value != "NONE":
         try:
-            s3_bucket_region = boto3.client("s3").get_bucket_location(Bucket=bucket).get("LocationConstraint")
+            s3_bucket_region = (
+                boto3_clients.get_client("s3").get_bucket_location(Bucket=bucket).get("LocationConstraint")
+            )
             # Buckets in Region us-east-1 have a LocationConstraint of null
             if s3_bucket_region is None:
                 s3_bucket_region = "us-east-1"
@@ -879,8 +986,10 @@ def ec2_volume_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        test = boto3.client("ec2").describe_volumes(VolumeIds=[param_value]).get("Volumes")[0]
-        if test.get("State") != "available":
+        test = pcluster_config.resource_snapshot.get(VOLUME, param_value)
+        if not test:
+            errors.append("Volume {0} does not exist".format(param_value))
+        elif test.get("State") != "available":
             warnings.append("Volume {0} is in state '{1}' not 'available'".format(param_value, test.get("State")))
     except ClientError as e:
         if e.response.get("Error").get("Message").endswith("parameter volumes is invalid. Expected: 'vol-...'."):
@@ -1266,7 +1375,7 @@ def _get_efa_enabled_instance_types(errors):
 
     try:
         for response in paginate_boto3(
-            boto3.client("ec2").describe_instance_types,
+            boto3_clients.get_client("ec2").describe_instance_types,
             Filters=[{"Name": "network-info.efa-supported", "Values": ["true"]}],
         ):
             instance_types.append(response.get("InstanceType"))
@@ -1283,7 +1392,7 @@ def fsx_lustre_backup_validator(param_key, param_value, pcluster_config):
     warnings = []
 
     try:
-        boto3.client("fsx").describe_backups(BackupIds=[param_value]).get("Backups")[0]
+        boto3_clients.get_client("fsx").describe_backups(BackupIds=[param_value]).get("Backups")[0]
     except ClientError as e:
         errors.append(
             "Failed to retrieve backup with Id '{0}': {1}".format(param_value, e.response.get("Error").get("Message"))
@@ -1327,7 +1436,7 @@ def fsx_ignored_parameters_validator(section_key, section_label, pcluster_config
 
 def _describe_ec2_key_pair(key_pair_name):
     """Return information about the provided ec2 key pair."""
-    return boto3.client("ec2").describe_key_pairs(KeyNames=[key_pair_name])
+    return boto3_clients.get_client("ec2").describe_key_pairs(KeyNames=[key_pair_name])
 
 
 def ebs_volume_type_size_validator(section_key, section_label, pcluster_config):
@@ -1453,7 +1562,7 @@ def ebs_volume_size_snapshot_validator(section_key, section_label, pcluster_conf
     if section.get_param_value("ebs_snapshot_id"):
         try:
             ebs_snapshot_id = section.get_param_value("ebs_snapshot_id")
-            snapshot_response_dict = get_ebs_snapshot_info(ebs_snapshot_id, raise_exceptions=True)
+            snapshot_response_dict = pcluster_config.resource_snapshot.get(SNAPSHOT, ebs_snapshot_id) or {}
             # validate that the input volume size is larger than the volume size of the EBS snapshot
             snapshot_volume_size = snapshot_response_dict.get("VolumeSize")
             volume_size = section.get_param_value("volume_size")
@@ -15,14 +15,13 @@ import logging
 import sys
 from enum import Enum
 
-import boto3
-import pkg_resources
-
+from pcluster import boto3_clients
 from pcluster.configure.subnet_computation import evaluate_cidr, get_subnet_cidr
 from pcluster.configure.utils import handle_client_exception
 from pcluster.networking.vpc_factory import VpcFactory
 from pcluster.utils import (
     get_cli_log_file,
+    get_installed_version,
     get_region,
     get_stack,
     get_stack_output_value,
@@ -163,9 +162,9 @@ def _create_network_stack(configuration, parameters):
     LOGGER.info("Creating CloudFormation stack...")
     LOGGER.info("Do not leave the terminal until the process has finished")
     stack_name = "parallelclusternetworking-{0}{1}".format(configuration.stack_name_prefix, TIMESTAMP)
-    version = pkg_resources.get_distribution("aws-parallelcluster").version
+    version = get_installed_version()
     try:
-        cfn_client = boto3.client("cloudformation")
+        cfn_client = boto3_clients.get_client("cloudformation")
         stack = cfn_client.create_stack(
             StackName=stack_name,
             TemplateURL=get_templates_bucket_path()
@@ -206,18 +205,19 @@ def _validate_cidr(cidr):
 @handle_client_exception
 def get_vpc_subnets(vpc_id):
     """Return a list of the subnets cidr contained in the vpc."""
-    subnets = boto3.client("ec2").describe_subnets(Filters=[{"Name": "vpcId", "Values": [vpc_id]}])["Subnets"]
+    ec2_client = boto3_clients.get_client("ec2")
+    subnets = ec2_client.describe_subnets(Filters=[{"Name": "vpcId", "Values": [vpc_id]}])["Subnets"]
     return [subnet["CidrBlock"] for subnet in subnets]
 
 
 @handle_client_exception
 def _get_vpc_cidr(vpc_id):
-    return boto3.client("ec2").describe_vpcs(VpcIds=[vpc_id])["Vpcs"][0]["CidrBlock"]
+    return boto3_clients.get_client("ec2").describe_vpcs(VpcIds=[vpc_id])["Vpcs"][0]["CidrBlock"]
 
 
 @handle_client_exception
 def _get_internet_gateway_id(vpc_id):
-    response = boto3.client("ec2").describe_internet_gateways(
+    response = boto3_clients.get_client("ec2").describe_internet_gateways(
         Filters=[{"Name": "attachment.vpc-id", "Values": [vpc_id]}]
     )
     return response["InternetGateways"][0]["InternetGatewayId"] if response["InternetGateways"] else ""
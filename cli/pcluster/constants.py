@@ -13,6 +13,9 @@ PCLUSTER_STACK_PREFIX = "parallelcluster-"
 PCLUSTER_NAME_MAX_LENGTH = 60
 PCLUSTER_NAME_REGEX = r"^([a-zA-Z][a-zA-Z0-9-]{0,%d})$"
 PCLUSTER_ISSUES_LINK = "https://github.com/aws/aws-parallelcluster/issues"
+PCLUSTER_CONFIG_FILE = "~/.parallelcluster/config"
+PCLUSTER_CLI_LOG_FILE = "~/.parallelcluster/pcluster-cli.log"
+CLUSTER_CONFIG_KEY = "configs/cluster-config.json"
 CIDR_ALL_IPS = "0.0.0.0/0"
 DEFAULT_ARCHITECTURE = "x86_64"
 SUPPORTED_ARCHITECTURES = ["x86_64", "arm64"]
@@ -31,10 +31,10 @@ from tempfile import mkdtemp, mkstemp
 from urllib.error import URLError
 from urllib.parse import urlparse
 
-import boto3
 from botocore.exceptions import ClientError
 
 import pcluster.utils as utils
+from pcluster import boto3_clients
 from pcluster.commands import evaluate_pcluster_template_url
 from pcluster.config.pcluster_config import PclusterConfig
 
@@ -129,7 +129,9 @@ def _get_post_install_script_dir(post_install_script_url, tmp_dir):
                 urlretrieve(post_install_script_url, filename=tmp_post_install_script_path)
             elif urlparse(post_install_script_url).scheme == "s3":
                 output = urlparse(post_install_script_url)
-                boto3.client("s3").download_file(output.netloc, output.path.lstrip("/"), tmp_post_install_script_path)
+                boto3_clients.get_client("s3").download_file(
+                    output.netloc, output.path.lstrip("/"), tmp_post_install_script_path
+                )
             elif urlparse(post_install_script_url).scheme == "file":
                 copyfile(post_install_script_url.replace("file://", ""), tmp_post_install_script_path)
         else:
@@ -154,7 +156,7 @@ def _get_post_install_script_dir(post_install_script_url, tmp_dir):
 def _dispose_packer_instance(results):
     time.sleep(2)
     try:
-        ec2_client = boto3.client("ec2")
+        ec2_client = boto3_clients.get_client("ec2")
         instance = ec2_client.describe_instance_status(
             InstanceIds=[results["PACKER_INSTANCE_ID"]], IncludeAllInstances=True
         ).get("InstanceStatuses")[0]
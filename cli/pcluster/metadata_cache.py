@@ -0,0 +1,289 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import errno
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# Increase the version every time the format of the cached entries changes, old entries are then discarded
+CACHE_FORMAT_VERSION = 1
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_SIZE = 20 * 1024 * 1024
+CACHE_DIR_ENV = "AWS_PCLUSTER_CACHE_DIR"
+DISABLE_CACHE_ENV = "AWS_PCLUSTER_DISABLE_CACHE"
+# Only the folders named like the versioned roots of the cache are ever removed from the cache folder
+VERSION_DIR_PATTERN = re.compile(r"^v\d+$")
+
+
+def default_cache_dir():
+    """Return the default path of the ParallelCluster metadata cache."""
+    return os.path.expanduser(os.path.join("~", ".parallelcluster", "cache"))
+
+
+class MetadataCache(object):
+    """
+    Persistent cache of AWS metadata that rarely changes, like EC2 instance types and offerings.
+
+    Entries are stored as json files under <cache_dir>/v<format_version>/<region>/<namespace>/, each with its own TTL.
+    Files are written atomically so concurrent CLI processes never read partial entries, and the least recently used
+    entries are evicted when the total size of the cache exceeds max_size.
+    Any failure when accessing the cache is logged and ignored, the data is then retrieved again from the service.
+    """
+
+    def __init__(self, cache_dir=None, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        """
+        Initialize the cache.
+
+        :param cache_dir: root folder of the cache, default is the value of AWS_PCLUSTER_CACHE_DIR or
+        ~/.parallelcluster/cache
+        :param ttl: default time to live in seconds of the entries
+        :param max_size: maximum size in bytes of the cache
+        """
+        self._cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        # When set, cached entries are ignored and replaced with the ones retrieved from the service
+        self.refresh = False
+        self._lock = threading.Lock()
+        # Total size of the entries, computed by the first eviction of the process and then updated at every write
+        self._size = None
+
+    @property
+    def cache_dir(self):
+        """Return the root folder of the cache."""
+        return self._cache_dir or os.environ.get(CACHE_DIR_ENV) or default_cache_dir()
+
+    @property
+    def enabled(self):
+        """Return True if the cache has not been disabled through the environment."""
+        return os.environ.get(DISABLE_CACHE_ENV, "false").lower() not in ("true", "1", "yes")
+
+    def get(self, namespace, key, region=None):
+        """
+        Return the cached value for the given key or None if missing or expired.
+
+        :param namespace: the kind of data, e.g. instance-types
+        :param key: json serializable key of the entry
+        :param region: region of the entry, default is the one set in the environment
+        """
+        if self.refresh or not self.enabled:
+            return None
+
+        path = self._get_entry_path(namespace, key, region)
+        try:
+            with open(path, "r") as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if entry.get("key") != _normalize(key) or time.time() - entry.get("created", 0) > entry.get("ttl", 0):
+            LOGGER.debug("Discarding expired cache entry %s", path)
+            _remove_file(path)
+            return None
+
+        try:
+            # Track the last access, used to evict the least recently used entries
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, namespace, key, value, region=None, ttl=None):
+        """
+        Store the given value in the cache.
+
+        :param namespace: the kind of data, e.g. instance-types
+        :param key: json serializable key of the entry
+        :param value: json serializable value to store
+        :param region: region of the entry, default is the one set in the environment
+        :param ttl: time to live in seconds of the entry, default is the one of the cache
+        """
+        if not self.enabled:
+            return
+
+        path = self._get_entry_path(namespace, key, region)
+        entry = {
+            "key": _normalize(key),
+            "created": time.time(),
+            "ttl": self.ttl if ttl is None else ttl,
+            "value": value,
+        }
+        try:
+            _makedirs(os.path.dirname(path))
+            content = json.dumps(entry)
+            previous_size = _get_file_size(path)
+            _atomic_write(path, content)
+            self._track_write(len(content) - previous_size)
+        except (IOError, OSError, TypeError, ValueError) as e:
+            LOGGER.debug("Unable to write cache entry %s: %s", path, e)
+
+    def get_or_load(self, namespace, key, loader, region=None, ttl=None):
+        """
+        Return the cached value for the given key, calling loader and caching its result when missing.
+
+        :param loader: function to call to retrieve the value when not found in the cache
+        """
+        value = self.get(namespace, key, region)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(namespace, key, value, region, ttl)
+        return value
+
+    def get_files_dir(self, namespace):
+        """
+        Return the folder where the files of the given namespace are stored, creating it if missing.
+
+        Files are managed by the caller and evicted together with the other entries, None is returned when the cache
+        is disabled or the folder cannot be created.
+        """
+        if not self.enabled:
+            return None
+        path = os.path.join(self._get_version_dir(), "files", namespace)
+        try:
+            _makedirs(path)
+            return path
+        except OSError as e:
+            LOGGER.debug("Unable to create cache folder %s: %s", path, e)
+            return None
+
+    def clear(self):
+        """Remove all the entries from the cache, and the cache folder if nothing else is stored in it."""
+        with self._lock:
+            for folder_path in self._list_version_dirs():
+                shutil.rmtree(folder_path, ignore_errors=True)
+            try:
+                os.rmdir(self.cache_dir)
+            except OSError:
+                pass
+            self._size = None
+
+    def _get_entry_path(self, namespace, key, region):
+        region = region or os.environ.get("AWS_DEFAULT_REGION") or "global"
+        digest = hashlib.sha256(json.dumps(_normalize(key), sort_keys=True).encode("utf-8")).hexdigest()
+        return os.path.join(self._get_version_dir(), region, namespace, "{0}.json".format(digest))
+
+    def _get_version_dir(self):
+        return os.path.join(self.cache_dir, "v{0}".format(CACHE_FORMAT_VERSION))
+
+    def _list_version_dirs(self):
+        """Return the paths of the versioned roots of the cache, ignoring anything else stored in the cache folder."""
+        try:
+            folders = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        return [
+            os.path.join(self.cache_dir, folder)
+            for folder in folders
+            if VERSION_DIR_PATTERN.match(folder) and os.path.isdir(os.path.join(self.cache_dir, folder))
+        ]
+
+    def _track_write(self, size_delta):
+        """
+        Add the size of a written entry to the size of the cache, evicting entries when needed.
+
+        The cache folder is scanned only by the first write of the process and when max_size is exceeded, so that
+        writing many entries doesn't walk the whole cache at every write.
+        """
+        with self._lock:
+            if self._size is not None:
+                self._size += size_delta
+                if self._size <= self.max_size:
+                    return
+            self._evict()
+
+    def _evict(self):
+        """Remove entries of old cache formats and the least recently used entries exceeding max_size."""
+        version_dir = self._get_version_dir()
+        for folder_path in self._list_version_dirs():
+            if folder_path != version_dir:
+                LOGGER.debug("Removing cache folder %s of an old format", folder_path)
+                shutil.rmtree(folder_path, ignore_errors=True)
+
+        entries = []
+        total_size = 0
+        for root, _, files in os.walk(version_dir):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            LOGGER.debug("Evicting cache entry %s", path)
+            _remove_file(path)
+            total_size -= size
+        self._size = total_size
+
+
+def _normalize(key):
+    """Return the key as read back from json, e.g. with tuples converted to lists."""
+    return json.loads(json.dumps(key, sort_keys=True))
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def _get_file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _atomic_write(path, content):
+    """Write content to a temporary file in the same folder and move it to the given path."""
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as tmp_file:
+            tmp_file.write(content)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # On Windows rename fails when the destination exists
+            _remove_file(path)
+            os.rename(tmp_path, path)
+    except Exception:
+        _remove_file(tmp_path)
+        raise
+
+
+_CACHE = MetadataCache()
+
+
+def get_cache():
+    """Return the process-wide MetadataCache."""
+    return _CACHE
@@ -76,18 +76,20 @@ class HITClusterModel(ClusterModel):
             latest_alinux_ami_id = self._get_latest_alinux_ami_id()
 
             # Test Master Instance Configuration
-            self._ec2_run_instance(
-                pcluster_config,
-                InstanceType=master_instance_type,
-                MinCount=1,
-                MaxCount=1,
-                ImageId=latest_alinux_ami_id,
-                SubnetId=master_subnet,
-                SecurityGroupIds=security_groups_ids,
-                CpuOptions=master_cpu_options,
-                DryRun=True,
-            )
+            run_instances_args = [
+                dict(
+                    InstanceType=master_instance_type,
+                    MinCount=1,
+                    MaxCount=1,
+                    ImageId=latest_alinux_ami_id,
+                    SubnetId=master_subnet,
+                    SecurityGroupIds=security_groups_ids,
+                    CpuOptions=master_cpu_options,
+                    DryRun=True,
+                )
+            ]
 
+            # Test all the compute resources of all the queues, identical requests are sent only once
             for _, queue_section in pcluster_config.get_sections("queue").items():
                 queue_placement_group = queue_section.get_param_value("placement_group")
                 queue_placement_group = (
@@ -97,31 +99,31 @@ class HITClusterModel(ClusterModel):
                 )
 
                 compute_resource_settings = queue_section.get_param_value("compute_resource_settings")
-
-                # Temporarily limiting dryrun tests to 1 per queue to save boto3 calls.
-                compute_resource_section = pcluster_config.get_section(
-                    "compute_resource", compute_resource_settings.split(",")[0]
-                )
-
-                disable_hyperthreading = compute_resource_section.get_param_value(
-                    "disable_hyperthreading"
-                ) and compute_resource_section.get_param_value("disable_hyperthreading_via_cpu_options")
-                self.__test_compute_resource(
-                    pcluster_config,
-                    compute_resource_section,
-                    disable_hyperthreading=disable_hyperthreading,
-                    ami_id=latest_alinux_ami_id,
-                    subnet=compute_subnet,
-                    security_groups_ids=security_groups_ids,
-                    placement_group=queue_placement_group,
-                )
+                for compute_resource_label in compute_resource_settings.split(","):
+                    compute_resource_section = pcluster_config.get_section(
+                        "compute_resource", compute_resource_label.strip()
+                    )
+                    disable_hyperthreading = compute_resource_section.get_param_value(
+                        "disable_hyperthreading"
+                    ) and compute_resource_section.get_param_value("disable_hyperthreading_via_cpu_options")
+                    run_instances_args.append(
+                        self.__get_compute_resource_run_instances_args(
+                            compute_resource_section,
+                            disable_hyperthreading=disable_hyperthreading,
+                            ami_id=latest_alinux_ami_id,
+                            subnet=compute_subnet,
+                            security_groups_ids=security_groups_ids,
+                            placement_group=queue_placement_group,
+                        )
+                    )
+
+            self._ec2_run_instances(pcluster_config, run_instances_args)
 
         except ClientError:
             pcluster_config.error("Unable to validate configuration parameters.")
 
-    def __test_compute_resource(
+    def __get_compute_resource_run_instances_args(
         self,
-        pcluster_config,
         compute_resource_section,
         disable_hyperthreading=None,
         ami_id=None,
@@ -129,12 +131,11 @@ class HITClusterModel(ClusterModel):
         security_groups_ids=None,
         placement_group=None,
     ):
-        """Test Compute Resource Instance Configuration."""
+        """Return the arguments of the run_instances call testing the Compute Resource Instance Configuration."""
         vcpus = compute_resource_section.get_param_value("vcpus")
         compute_cpu_options = {"CoreCount": vcpus, "ThreadsPerCore": 1} if disable_hyperthreading else {}
 
-        self._ec2_run_instance(
-            pcluster_config,
+        return dict(
             InstanceType=compute_resource_section.get_param_value("instance_type"),
             MinCount=1,
             MaxCount=1,
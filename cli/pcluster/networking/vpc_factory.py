@@ -11,9 +11,10 @@
 import functools
 import sys
 
-import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
+from pcluster import boto3_clients
+
 
 class VpcFactory:
     """This class handles vpc automation related to pcluster."""
@@ -39,8 +40,8 @@ class VpcFactory:
 
         :param aws_region_name: the region in which you want to use the VpcHandler
         """
-        self.__client = boto3.client("ec2", region_name=aws_region_name)
-        self.ec2 = boto3.resource("ec2", region_name=aws_region_name)
+        self.__client = boto3_clients.get_client("ec2", region_name=aws_region_name)
+        self.ec2 = boto3_clients.get_resource("ec2", region_name=aws_region_name)
 
     @_ExceptionHandler.handle_client_exception
     def create(self, cidr_block="10.0.0.0/16"):
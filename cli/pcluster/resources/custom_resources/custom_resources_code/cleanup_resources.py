@@ -9,7 +9,9 @@
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
 import logging
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import boto3
 from botocore.config import Config
@@ -19,9 +21,28 @@ helper = CfnResource(json_logging=False, log_level="INFO", boto_level="ERROR", s
 logger = logging.getLogger(__name__)
 boto3_config = Config(retries={"max_attempts": 60})
 
+# Maximum number of keys of a DeleteObjects call, object versions are listed with pages of the same size
+S3_DELETE_BATCH_SIZE = 1000
+S3_PURGE_MAX_WORKERS = 8
+S3_PURGE_MAX_ATTEMPTS = 5
+# Seconds before the Lambda timeout after which no object version is listed anymore, to report the progress
+S3_PURGE_TIME_MARGIN = 60
+# Limits of a ChangeResourceRecordSets request, and maximum number of record sets of a ListResourceRecordSets page
+ROUTE53_MAX_BATCH_RECORDS = 1000
+ROUTE53_MAX_BATCH_VALUES_LENGTH = 32000
+ROUTE53_LIST_PAGE_SIZE = 300
+# Seconds before the Lambda timeout after which no DNS record is deleted anymore, to report the progress
+DNS_CLEANUP_TIME_MARGIN = 60
+
+
+def _delete_dns_records(event, context):
+    """
+    Delete all DNS entries from the private Route53 hosted zone created within the cluster.
 
-def _delete_dns_records(event):
-    """Delete all DNS entries from the private Route53 hosted zone created within the cluster."""
+    Records are deleted with the largest change batches allowed by Route53, each one while the next is listed.
+    Progress is checkpointed after every batch: when a batch fails (e.g. because one of its records was deleted in the
+    meantime) the deletion continues from the last checkpoint, until the time left to the Lambda timeout is over.
+    """
     hosted_zone_id = event["ResourceProperties"]["ClusterHostedZone"]
     if not hosted_zone_id:
         logger.error("Hosted Zone ID is empty")
@@ -30,60 +51,130 @@ def _delete_dns_records(event):
     try:
         logger.info("Deleting DNS records from %s", hosted_zone_id)
         route53 = boto3.client("route53", config=boto3_config)
-
-        completed_successfully = False
-        while not completed_successfully:
-            completed_successfully = True
-            for changes in _list_resource_record_sets_iterator(hosted_zone_id):
-                if changes:
-                    try:
-                        route53.change_resource_record_sets(
-                            HostedZoneId=hosted_zone_id, ChangeBatch={"Changes": changes}
-                        )
-                    except Exception as e:
-                        logger.error("Failed when deleting DNS records from %s with error %s", hosted_zone_id, e)
-                        completed_successfully = False
-                        continue
-                else:
-                    logger.info("No DNS records to delete from %s.", hosted_zone_id)
-
+        deadline = time.time() + context.get_remaining_time_in_millis() / 1000.0 - DNS_CLEANUP_TIME_MARGIN
+        progress = {"checkpoint": None, "deleted": 0, "completed": False}
+        while True:
+            _delete_dns_record_batches(route53, hosted_zone_id, progress, deadline)
+            if progress["completed"]:
+                break
+            if time.time() >= deadline:
+                raise Exception(
+                    "DNS records not deleted before the Lambda timeout ({0} deleted), "
+                    "retry the deletion to resume it".format(progress["deleted"])
+                )
             logger.info("Sleeping for 5 seconds before retrying DNS records deletion.")
             time.sleep(5)
 
+        if not progress["deleted"]:
+            logger.info("No DNS records to delete from %s.", hosted_zone_id)
         logger.info("DNS records deletion from %s: COMPLETED", hosted_zone_id)
     except Exception as e:
-        logger.error("Failed when listing DNS records from %s with error %s", hosted_zone_id, e)
+        logger.error("Failed when deleting DNS records from %s with error %s", hosted_zone_id, e)
         raise
 
 
-def _list_resource_record_sets_iterator(hosted_zone_id):
-    route53 = boto3.client("route53", config=boto3_config)
-    pagination_config = {"PageSize": 100}
+def _delete_dns_record_batches(route53, hosted_zone_id, progress, deadline):
+    """
+    Delete the A records listed from the checkpoint on, deleting each batch while the next one is listed.
+
+    Route53 applies the changes of a hosted zone one request at a time, so batches are deleted by a single worker.
+    The progress is marked as completed only if all the batches were deleted.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        pending_batch = None
+        for batch in _list_dns_record_batches(route53, hosted_zone_id, progress["checkpoint"]):
+            if pending_batch and not _wait_for_dns_record_batch(hosted_zone_id, pending_batch, progress):
+                return
+            if time.time() >= deadline:
+                return
+            batch["future"] = executor.submit(
+                route53.change_resource_record_sets,
+                HostedZoneId=hosted_zone_id,
+                ChangeBatch={"Changes": batch["changes"]},
+            )
+            pending_batch = batch
+        if pending_batch and not _wait_for_dns_record_batch(hosted_zone_id, pending_batch, progress):
+            return
+        progress["completed"] = True
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _wait_for_dns_record_batch(hosted_zone_id, batch, progress):
+    """Wait for the deletion of the given batch and checkpoint the progress, return False if it failed."""
+    try:
+        batch["future"].result()
+    except Exception as e:
+        logger.error("Failed when deleting DNS records from %s with error %s", hosted_zone_id, e)
+        return False
+    progress["deleted"] += len(batch["changes"])
+    progress["checkpoint"] = batch["next_start"]
+    logger.info("Deleted %d DNS records from %s", progress["deleted"], hosted_zone_id)
+    return True
 
-    paginator = route53.get_paginator("list_resource_record_sets")
-    for page in paginator.paginate(HostedZoneId=hosted_zone_id, PaginationConfig=pagination_config):
-        changes = []
-        for record_set in page.get("ResourceRecordSets", []):
-            if record_set.get("Type") == "A":
-                changes.append({"Action": "DELETE", "ResourceRecordSet": record_set})
-        yield changes
 
+def _list_dns_record_batches(route53, hosted_zone_id, start=None):
+    """
+    Return a generator of the change batches deleting the A records of the hosted zone, within the Route53 limits.
 
-def _delete_s3_bucket(event):
+    Every batch comes with the position of the first record following it, to resume the listing from there.
+    :param start: StartRecordName and StartRecordType of the first record to list, None to list all the records
+    """
+    list_kwargs = {"HostedZoneId": hosted_zone_id, "MaxItems": str(ROUTE53_LIST_PAGE_SIZE)}
+    list_kwargs.update(start or {})
+    changes, records_count, values_length = [], 0, 0
+    while True:
+        response = route53.list_resource_record_sets(**list_kwargs)
+        for record_set in response.get("ResourceRecordSets", []):
+            if record_set.get("Type") != "A":
+                continue
+            resource_records = record_set.get("ResourceRecords", [])
+            record_values_length = sum(len(record.get("Value", "")) for record in resource_records)
+            if changes and (
+                records_count + max(1, len(resource_records)) > ROUTE53_MAX_BATCH_RECORDS
+                or values_length + record_values_length > ROUTE53_MAX_BATCH_VALUES_LENGTH
+            ):
+                next_start = {"StartRecordName": record_set.get("Name"), "StartRecordType": record_set.get("Type")}
+                yield {"changes": changes, "next_start": next_start}
+                changes, records_count, values_length = [], 0, 0
+            changes.append({"Action": "DELETE", "ResourceRecordSet": record_set})
+            records_count += max(1, len(resource_records))
+            values_length += record_values_length
+        if not response.get("IsTruncated"):
+            break
+        list_kwargs["StartRecordName"] = response.get("NextRecordName")
+        list_kwargs["StartRecordType"] = response.get("NextRecordType")
+    if changes:
+        yield {"changes": changes, "next_start": None}
+
+
+def _delete_s3_bucket(event, context):
     """
     Empty and delete the bucket passed as argument.
 
-    It exits gracefully if bucket doesn't exist.
+    It exits gracefully if bucket doesn't exist. The bucket is emptied within the time left to the Lambda timeout,
+    if it's not empty by then the deletion fails: deleting the stack again resumes from the objects left.
     :param bucket_name: bucket to delete
     """
     bucket_name = event["ResourceProperties"]["ResourcesS3Bucket"]
     try:
         if bucket_name != "NONE":
             logger.info("S3 bucket %s deletion: STARTED" % bucket_name)
-            bucket = boto3.resource("s3", config=boto3_config).Bucket(bucket_name)
-            bucket.objects.all().delete()
-            bucket.object_versions.delete()
-            bucket.delete()
+            s3 = boto3.client("s3", config=boto3_config)
+            deadline = time.time() + context.get_remaining_time_in_millis() / 1000.0 - S3_PURGE_TIME_MARGIN
+            progress = _purge_bucket(s3, bucket_name, deadline)
+            logger.info("Deleted %d objects from S3 bucket %s", progress["deleted"], bucket_name)
+            if progress["errors"]:
+                error = progress["errors"][0]
+                raise Exception(
+                    "Failed to delete {0} objects, e.g. {1}: {2}".format(
+                        len(progress["errors"]), error.get("Key"), error.get("Message")
+                    )
+                )
+            if not progress["completed"]:
+                raise Exception("Bucket not emptied before the Lambda timeout, retry the deletion to resume it")
+            s3.delete_bucket(Bucket=bucket_name)
             logger.info("S3 bucket %s deletion: COMPLETED" % bucket_name)
     except boto3.client("s3").exceptions.NoSuchBucket as ex:
         logger.warning("S3 bucket %s not found. Bucket was probably manually deleted." % bucket_name)
@@ -93,7 +184,66 @@ def _delete_s3_bucket(event):
         raise
 
 
-def _terminate_cluster_nodes(event):
+def _purge_bucket(s3, bucket_name, deadline):
+    """
+    Delete all the object versions and delete markers of the bucket, until it's empty or the deadline expires.
+
+    Pages of object versions are listed while the previous ones are deleted by a bounded pool of workers, each page
+    with a single DeleteObjects call.
+    :return: the progress of the purge, with the number of deleted objects and the errors of the ones not deleted
+    """
+    progress = {"completed": False, "deleted": 0, "errors": []}
+    lock = threading.Lock()
+    list_kwargs = {"Bucket": bucket_name, "MaxKeys": S3_DELETE_BATCH_SIZE}
+    executor = ThreadPoolExecutor(max_workers=S3_PURGE_MAX_WORKERS)
+    try:
+        pending_futures = set()
+        while time.time() < deadline:
+            if len(pending_futures) >= S3_PURGE_MAX_WORKERS:
+                done_futures, pending_futures = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    future.result()
+            response = s3.list_object_versions(**list_kwargs)
+            objects = [
+                {"Key": version.get("Key"), "VersionId": version.get("VersionId")}
+                for version in response.get("Versions", []) + response.get("DeleteMarkers", [])
+            ]
+            if objects:
+                pending_futures.add(executor.submit(_delete_objects, s3, bucket_name, objects, progress, lock))
+            if not response.get("IsTruncated"):
+                progress["completed"] = True
+                break
+            list_kwargs["KeyMarker"] = response.get("NextKeyMarker")
+            if response.get("NextVersionIdMarker"):
+                list_kwargs["VersionIdMarker"] = response.get("NextVersionIdMarker")
+            else:
+                list_kwargs.pop("VersionIdMarker", None)
+        for future in pending_futures:
+            future.result()
+    finally:
+        executor.shutdown(wait=True)
+    if not progress["completed"]:
+        logger.info("S3 bucket %s purge stopped at key %s", bucket_name, list_kwargs.get("KeyMarker"))
+    return progress
+
+
+def _delete_objects(s3, bucket_name, objects, progress, lock):
+    """Delete the given object versions, retrying the ones that the call failed to delete."""
+    for attempt in range(S3_PURGE_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(min(2 ** attempt, 10))
+        errors = s3.delete_objects(Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}).get("Errors", [])
+        with lock:
+            progress["deleted"] += len(objects) - len(errors)
+        if not errors:
+            return
+        logger.info("Failed to delete %d objects from S3 bucket %s, retrying", len(errors), bucket_name)
+        objects = [{"Key": error.get("Key"), "VersionId": error.get("VersionId")} for error in errors]
+    with lock:
+        progress["errors"].extend(errors)
+
+
+def _terminate_cluster_nodes(event, _):
     try:
         logger.info("Compute fleet clean-up: STARTED")
         stack_name = event["ResourceProperties"]["StackName"]
@@ -169,10 +319,10 @@ ACTION_HANDLERS = {
 
 
 @helper.delete
-def delete(event, _):
+def delete(event, context):
     action = event["ResourceProperties"]["Action"]
     if action in ACTION_HANDLERS:
-        ACTION_HANDLERS[action](event)
+        ACTION_HANDLERS[action](event, context)
     else:
         raise Exception("Unsupported action %s", action)
 
@@ -0,0 +1,192 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import logging
+import re
+import threading
+import urllib.request
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+
+from botocore.exceptions import ClientError
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, TemplateNotFound
+
+from pcluster import boto3_clients, metadata_cache
+
+LOGGER = logging.getLogger(__name__)
+
+# Namespace of the metadata cache storing the remote templates, revalidated with their ETag at every use
+TEMPLATES_CACHE_NAMESPACE = "templates"
+TEMPLATES_CACHE_TTL = 30 * 24 * 60 * 60
+# Namespace of the metadata cache folder storing the compiled templates
+BYTECODE_CACHE_NAMESPACE = "jinja"
+
+HIT_SUBSTACK = "compute-fleet-hit"
+DASHBOARD_SUBSTACK = "cw-dashboard"
+
+_ENVIRONMENT = None
+_ENVIRONMENT_LOCK = threading.Lock()
+
+
+class _SourceLoader(BaseLoader):
+    """
+    Loader of template sources named after their digest.
+
+    Templates with the same source have the same name, so they are compiled once per process and their bytecode
+    is shared by all the processes through the bytecode cache of the environment.
+    """
+
+    def __init__(self):
+        """Initialize a loader with no sources."""
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def add_source(self, source):
+        """Register the given source and return the name of its template."""
+        name = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._sources[name] = source
+        return name
+
+    def get_source(self, environment, template):
+        """Return the registered source of the given template, see jinja2.BaseLoader."""
+        with self._lock:
+            source = self._sources.get(template)
+        if source is None:
+            raise TemplateNotFound(template)
+        return source, None, lambda: True
+
+
+def get_environment():
+    """Return the process-wide Jinja environment used to render the templates."""
+    global _ENVIRONMENT
+    with _ENVIRONMENT_LOCK:
+        if _ENVIRONMENT is None:
+            bytecode_cache_dir = metadata_cache.get_cache().get_files_dir(BYTECODE_CACHE_NAMESPACE)
+            environment = Environment(
+                loader=_SourceLoader(),
+                bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir) if bytecode_cache_dir else None,
+            )
+            environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
+            environment.filters["bool"] = lambda value: value.lower() == "true"
+            _ENVIRONMENT = environment
+        return _ENVIRONMENT
+
+
+def render_template(template_str, params_dict, tags, config_version=None):
+    """
+    Render a Jinja template and return the rendered output.
+
+    :param template_str: Template file contents as a string
+    :param params_dict: Template parameters dict
+    """
+    try:
+        environment = get_environment()
+        template = environment.get_template(environment.loader.add_source(template_str))
+        return template.render(config=params_dict, config_version=config_version, tags=tags)
+    except Exception as e:
+        LOGGER.error("Error when rendering template: %s", e)
+        raise e
+
+
+def render_substack_templates(
+    json_params, cfn_params, tags, config_version=None, hit_template=None, dashboard_template=None
+):
+    """
+    Render the templates of the substacks generated by the CLI from the same cluster parameters.
+
+    :param json_params: the json_params of the StorageData of the cluster configuration
+    :param cfn_params: the cfn_params of the StorageData of the cluster configuration
+    :param tags: tags of the cluster, in the Key/Value format
+    :param config_version: version of the cluster configuration file uploaded to the cluster bucket
+    :param hit_template: source of the compute fleet template of HIT clusters, not rendered if None
+    :param dashboard_template: source of the CloudWatch dashboard template, not rendered if None
+    :return: the rendered templates by substack
+    """
+    rendered_templates = {}
+    if hit_template is not None:
+        rendered_templates[HIT_SUBSTACK] = render_template(hit_template, json_params, tags, config_version)
+    if dashboard_template is not None:
+        rendered_templates[DASHBOARD_SUBSTACK] = render_template(
+            dashboard_template, {"json_params": json_params, "cfn_params": cfn_params}, {}
+        )
+    return rendered_templates
+
+
+def fetch_template(url, log_errors=True):
+    """
+    Read a template from an HTTP or S3 url.
+
+    Templates are cached on disk together with their ETag and Last-Modified date, and the cached copy is
+    revalidated with a conditional request, so that the template is downloaded again only when it changes.
+    :param log_errors: False to only raise the errors, e.g. when the template is prefetched in background
+    """
+    cache = metadata_cache.get_cache()
+    cached_entry = cache.get(TEMPLATES_CACHE_NAMESPACE, url, region="global") or {}
+    try:
+        if urlparse(url).scheme == "s3":
+            content, etag, last_modified = _get_s3_object(url, cached_entry.get("etag"))
+        else:
+            content, etag, last_modified = _get_http_file(
+                url, cached_entry.get("etag"), cached_entry.get("last_modified")
+            )
+    except Exception as e:
+        if log_errors:
+            LOGGER.error("Failed when reading remote file from url %s: %s", url, e)
+        raise e
+
+    if content is None:
+        LOGGER.debug("Template %s not modified, using the cached copy", url)
+        return cached_entry.get("content")
+    if etag or last_modified:
+        cache.set(
+            TEMPLATES_CACHE_NAMESPACE,
+            url,
+            {"content": content, "etag": etag, "last_modified": last_modified},
+            region="global",
+            ttl=TEMPLATES_CACHE_TTL,
+        )
+    return content
+
+
+def _get_s3_object(url, etag=None):
+    """Return content, ETag and Last-Modified of the given S3 object, with content None if it matches the ETag."""
+    match = re.match(r"s3://(.*?)/(.*)", url)
+    kwargs = {"Bucket": match.group(1), "Key": match.group(2)}
+    if etag:
+        kwargs["IfNoneMatch"] = etag
+    try:
+        response = boto3_clients.get_client("s3").get_object(**kwargs)
+    except ClientError as e:
+        if etag and e.response.get("Error").get("Code") in ("304", "NotModified"):
+            return None, etag, None
+        raise
+    return response["Body"].read().decode("utf-8"), response.get("ETag"), None
+
+
+def _get_http_file(url, etag=None, last_modified=None):
+    """Return content, ETag and Last-Modified of the given file, with content None if it was not modified."""
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    if last_modified:
+        request.add_header("If-Modified-Since", last_modified)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return (
+                response.read().decode("utf-8"),
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+    except HTTPError as e:
+        if e.code == 304 and (etag or last_modified):
+            return None, etag, last_modified
+        raise
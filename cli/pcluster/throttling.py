@@ -0,0 +1,267 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import random
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = frozenset(
+    [
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "ProvisionedThroughputExceededException",
+        "RequestLimitExceeded",
+        "BandwidthLimitExceeded",
+        "RequestThrottled",
+        "SlowDown",
+        "PriorRequestNotComplete",
+        "EC2ThrottledException",
+    ]
+)
+
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 20
+# Requests per second allowed by a token bucket once throttled, the rate is never limited before the first throttle
+DEFAULT_MAX_RATE = 20.0
+DEFAULT_MIN_RATE = 0.5
+# On throttling the rate is multiplied by RATE_DECREASE_FACTOR, then increased by RATE_INCREASE at every success
+RATE_DECREASE_FACTOR = 0.5
+RATE_INCREASE = 0.5
+# Key of the botocore request context counting the throttled attempts of an API call, see pcluster.api_profiler
+THROTTLES_CONTEXT_KEY = "pcluster_throttles"
+
+
+def is_throttling_error(response):
+    """Return True if the given boto3 error response signals that the request has been throttled."""
+    if not response:
+        return False
+    return (
+        response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+        or response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 429
+    )
+
+
+def get_retry_after(response):
+    """Return the seconds to wait before retrying as requested by the service through the Retry-After header."""
+    headers = (response or {}).get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, retry_after=None):
+    """
+    Return the seconds to wait before retrying, using exponential backoff with full jitter.
+
+    Jitter spreads the retries of concurrent callers over time, avoiding synchronized retry storms.
+    :param attempt: number of retries already done, starting from 0
+    :param base_delay: maximum delay of the first retry
+    :param max_delay: cap of the exponential backoff
+    :param retry_after: seconds requested by the service, used as lower bound of the delay
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** min(attempt, 32)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class ThrottlingStats(object):
+    """Counters of the throttled requests and of the time spent waiting because of them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Set all the counters to zero."""
+        with self._lock:
+            self.throttles = 0
+            self.retries = 0
+            self.backoff_time = 0.0
+            self.rate_limit_time = 0.0
+
+    def record_throttle(self, retry_delay=None):
+        """Record a throttled request, retried after the given delay if not None."""
+        with self._lock:
+            self.throttles += 1
+            if retry_delay is not None:
+                self.retries += 1
+                self.backoff_time += retry_delay
+
+    def record_rate_limit_wait(self, wait_time):
+        """Record the time spent waiting for the rate limiter before sending a request."""
+        with self._lock:
+            self.rate_limit_time += wait_time
+
+    def as_dict(self):
+        """Return a copy of the counters."""
+        with self._lock:
+            return {
+                "throttles": self.throttles,
+                "retries": self.retries,
+                "backoff_time": self.backoff_time,
+                "rate_limit_time": self.rate_limit_time,
+            }
+
+
+class TokenBucket(object):
+    """
+    Adaptive client-side rate limiter.
+
+    The bucket doesn't limit the requests until the first throttling error. Then the rate is reduced at every throttle
+    and slowly increased at every successful request, until it reaches max_rate and the limit is removed again.
+    """
+
+    def __init__(self, max_rate=DEFAULT_MAX_RATE, min_rate=DEFAULT_MIN_RATE):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = None
+        self._tokens = 0.0
+        self._last_refill = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, waiting for it if required, and return the seconds waited."""
+        with self._lock:
+            if self.rate is None:
+                return 0.0
+            self._refill()
+            # Tokens can go below zero, so that concurrent callers wait their turn
+            self._tokens -= 1
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    def on_throttle(self):
+        """Reduce the rate after a throttling error."""
+        with self._lock:
+            if self.rate is None:
+                self._tokens = 0.0
+                self._last_refill = time.time()
+            else:
+                self._refill()
+            self.rate = max(self.min_rate, (self.rate or self.max_rate) * RATE_DECREASE_FACTOR)
+
+    def on_success(self):
+        """Increase the rate after a successful request."""
+        with self._lock:
+            if self.rate is not None:
+                self._refill()
+                self.rate += RATE_INCREASE
+                if self.rate >= self.max_rate:
+                    self.rate = None
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+
+class RateLimiter(object):
+    """
+    Throttling handling shared by all the boto3 clients of the process.
+
+    Clients are attached through a hook of the Boto3ClientRegistry. Every request sent to a service in a region
+    takes a token from the bucket of that service and region, and throttled requests are retried with exponential
+    backoff and jitter, honoring the Retry-After header. Other errors are retried by botocore as usual.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = ThrottlingStats()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, service, region):
+        """Return the token bucket of the given service and region."""
+        key = (service, region)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket()
+            return self._buckets[key]
+
+    def reset(self):
+        """Drop all the token buckets and reset the counters."""
+        with self._lock:
+            self._buckets = {}
+        self.stats.reset()
+
+    def attach(self, client, service):
+        """Register the rate limiter on the events of the given client, see Boto3ClientRegistry.register_client_hook."""
+        bucket = self.get_bucket(service, client.meta.region_name)
+        service_id = client.meta.service_model.service_id.hyphenize()
+        client.meta.events.register("before-send.{0}".format(service_id), _bind_handler(self._before_send, bucket))
+        # Registered first, so that throttling errors are not retried by the botocore retry handler
+        client.meta.events.register_first(
+            "needs-retry.{0}".format(service_id), _bind_handler(self._needs_retry, bucket, service)
+        )
+        client.meta.events.register("after-call.{0}".format(service_id), _bind_handler(self._after_call, bucket))
+
+    def _before_send(self, bucket, **kwargs):
+        wait_time = bucket.acquire()
+        if wait_time:
+            self.stats.record_rate_limit_wait(wait_time)
+
+    def _needs_retry(self, bucket, service, response=None, attempts=None, request_dict=None, **kwargs):
+        if not response or not is_throttling_error(response[1]):
+            return None
+
+        bucket.on_throttle()
+        context = (request_dict or {}).get("context")
+        if context is not None:
+            context[THROTTLES_CONTEXT_KEY] = context.get(THROTTLES_CONTEXT_KEY, 0) + 1
+        if attempts >= self.max_attempts:
+            self.stats.record_throttle()
+            LOGGER.debug("Request to %s throttled, giving up after %d attempts", service, attempts)
+            return None
+
+        delay = get_backoff_delay(
+            attempts - 1, self.base_delay, self.max_delay, retry_after=get_retry_after(response[1])
+        )
+        self.stats.record_throttle(delay)
+        LOGGER.debug("Request to %s throttled, retrying in %.2f seconds", service, delay)
+        return delay
+
+    def _after_call(self, bucket, parsed=None, **kwargs):
+        if not is_throttling_error(parsed):
+            bucket.on_success()
+
+
+def _bind_handler(handler, *args):
+    """Bind the given arguments to an event handler, botocore requires handlers to accept **kwargs."""
+
+    def _handler(**kwargs):
+        return handler(*args, **kwargs)
+
+    return _handler
+
+
+_RATE_LIMITER = RateLimiter()
+
+
+def get_rate_limiter():
+    """Return the process-wide RateLimiter."""
+    return _RATE_LIMITER
+
+
+def get_stats():
+    """Return the throttling counters of the process, see ThrottlingStats."""
+    return _RATE_LIMITER.stats.as_dict()
@@ -14,6 +14,7 @@ from future import standard_library  # isort:skip
 standard_library.install_aliases()
 # fmt: on
 
+import fnmatch
 import hashlib
 import json
 import logging
@@ -22,24 +23,50 @@ import random
 import re
 import string
 import sys
+import tempfile
+import threading
 import time
 import urllib.request
 import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
 from io import BytesIO
-from urllib.parse import urlparse
 
-import boto3
-import pkg_resources
-from botocore.exceptions import ClientError, EndpointConnectionError
-from jinja2 import BaseLoader, Environment
+from botocore.exceptions import BotoCoreError, ClientError, EndpointConnectionError
 
+from pcluster import boto3_clients, metadata_cache, throttling
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus, ComputeFleetStatusManager
-from pcluster.constants import PCLUSTER_STACK_PREFIX, SUPPORTED_ARCHITECTURES
+from pcluster.constants import PCLUSTER_CLI_LOG_FILE, PCLUSTER_STACK_PREFIX, SUPPORTED_ARCHITECTURES
+from pcluster.version import get_installed_version
 
 LOGGER = logging.getLogger(__name__)
 
 STACK_TYPE = "AWS::CloudFormation::Stack"
+DESCRIBE_INSTANCE_TYPES_MAX_ITEMS = 100
+# Statuses of the stacks shown by "pcluster list", all but DELETE_COMPLETE
+LISTED_STACK_STATUSES = [
+    "CREATE_IN_PROGRESS",
+    "CREATE_FAILED",
+    "CREATE_COMPLETE",
+    "ROLLBACK_IN_PROGRESS",
+    "ROLLBACK_FAILED",
+    "ROLLBACK_COMPLETE",
+    "DELETE_IN_PROGRESS",
+    "DELETE_FAILED",
+    "UPDATE_IN_PROGRESS",
+    "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_COMPLETE",
+    "UPDATE_ROLLBACK_IN_PROGRESS",
+    "UPDATE_ROLLBACK_FAILED",
+    "UPDATE_ROLLBACK_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_ROLLBACK_COMPLETE",
+    "REVIEW_IN_PROGRESS",
+    "IMPORT_IN_PROGRESS",
+    "IMPORT_COMPLETE",
+    "IMPORT_ROLLBACK_IN_PROGRESS",
+    "IMPORT_ROLLBACK_FAILED",
+    "IMPORT_ROLLBACK_COMPLETE",
+]
 
 
 class NodeType(Enum):
@@ -56,6 +83,41 @@ def get_stack_name(cluster_name):
     return PCLUSTER_STACK_PREFIX + cluster_name
 
 
+def is_cluster_pattern(cluster_name):
+    """Return True if the given cluster name is a shell-style pattern."""
+    return any(char in cluster_name for char in "*?[")
+
+
+def expand_cluster_patterns(cluster_patterns):
+    """
+    Return the names of the clusters matching the given names or shell-style patterns, without duplicates.
+
+    Clusters are listed only if there are patterns, names are returned as they are even if the cluster doesn't exist.
+    """
+    cluster_names = []
+    listed_cluster_names = None
+    for pattern in cluster_patterns:
+        if is_cluster_pattern(pattern):
+            if listed_cluster_names is None:
+                listed_cluster_names = _list_cluster_names()
+            matching_names = fnmatch.filter(listed_cluster_names, pattern)
+        else:
+            matching_names = [pattern]
+        cluster_names.extend(name for name in matching_names if name not in cluster_names)
+    return cluster_names
+
+
+def _list_cluster_names():
+    """Return the names of all the clusters in the region."""
+    cluster_names = []
+    cfn_client = boto3_clients.get_client("cloudformation")
+    for stack_summary in paginate_boto3(cfn_client.list_stacks, StackStatusFilter=LISTED_STACK_STATUSES):
+        stack_name = stack_summary.get("StackName")
+        if stack_summary.get("ParentId") is None and stack_name.startswith(PCLUSTER_STACK_PREFIX):
+            cluster_names.append(stack_name[len(PCLUSTER_STACK_PREFIX) :])  # noqa: E203
+    return sorted(cluster_names)
+
+
 def get_cluster_name(stack_name):
     prefix = "parallelcluster-"
     if stack_name.startswith(prefix):
@@ -67,7 +129,7 @@ def get_cluster_name(stack_name):
 def get_stack_template(stack_name):
     """Get the template used for the given stack."""
     try:
-        template = boto3.client("cloudformation").get_template(StackName=stack_name).get("TemplateBody")
+        template = boto3_clients.get_client("cloudformation").get_template(StackName=stack_name).get("TemplateBody")
     except ClientError as client_err:
         error(
             "Unable to get template for stack {stack_name}.\n{err_msg}".format(
@@ -83,22 +145,26 @@ def get_stack_version(stack):
     return next(iter([tag["Value"] for tag in stack.get("Tags") if tag["Key"] == "Version"]), None)
 
 
-def _wait_for_update(stack_name):
-    """Wait for the given stack to be finished updating."""
+def _wait_for_update(stack_name, event_tailer=None):
+    """Wait for the given stack to be finished updating, printing the new stack events if a tailer is given."""
     while get_stack(stack_name).get("StackStatus") == "UPDATE_IN_PROGRESS":
         time.sleep(5)
+        if event_tailer:
+            print_stack_events(event_tailer.poll())
 
 
 def update_stack_template(stack_name, updated_template, cfn_parameters):
     """Update stack_name's template to that represented by updated_template."""
     try:
-        boto3.client("cloudformation").update_stack(
+        event_tailer = StackEventTailer(stack_name)
+        event_tailer.skip_existing_events()
+        boto3_clients.get_client("cloudformation").update_stack(
             StackName=stack_name,
             TemplateBody=json.dumps(updated_template, indent=2),  # Indent so it looks nice in the console
             Parameters=cfn_parameters,
             Capabilities=["CAPABILITY_IAM"],
         )
-        _wait_for_update(stack_name)
+        _wait_for_update(stack_name, event_tailer)
     except ClientError as client_err:
         if "no updates are to be performed" in client_err.response.get("Error").get("Message").lower():
             return  # If updated_template was the same as the stack's current one, consider the update a success
@@ -151,7 +217,7 @@ def create_s3_bucket(bucket_name, region):
     :param region: aws region
     :raise ClientError if bucket creation fails
     """
-    s3_client = boto3.client("s3")
+    s3_client = boto3_clients.get_client("s3")
     """ :type : pyboto3.s3 """
     if region != "us-east-1":
         s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={"LocationConstraint": region})
@@ -167,7 +233,7 @@ def create_s3_bucket(bucket_name, region):
 
 
 def _configure_s3_bucket(bucket_name):
-    s3_client = boto3.client("s3")
+    s3_client = boto3_clients.get_client("s3")
     s3_client.put_bucket_versioning(Bucket=bucket_name, VersioningConfiguration={"Status": "Enabled"})
     s3_client.put_bucket_encryption(
         Bucket=bucket_name,
@@ -183,6 +249,97 @@ def _configure_s3_bucket(bucket_name):
     s3_client.put_bucket_policy(Bucket=bucket_name, Policy=deny_http_policy)
 
 
+# Maximum number of keys of a DeleteObjects call, object versions are listed with pages of the same size
+S3_DELETE_BATCH_SIZE = 1000
+S3_PURGE_MAX_WORKERS = 8
+S3_PURGE_MAX_ATTEMPTS = 3
+
+
+class BucketPurge(object):
+    """
+    Deletion of all the object versions and delete markers stored in a bucket.
+
+    Pages of object versions are listed while the previous ones are deleted by a bounded pool of workers, each page
+    with a single DeleteObjects call. Keys that the call fails to delete are retried, up to S3_PURGE_MAX_ATTEMPTS times.
+    When a deadline is given no page is listed after it, and the purge can be resumed later from the markers
+    of the next page.
+    """
+
+    def __init__(self, bucket_name, s3_client=None, key_marker=None, version_id_marker=None):
+        """
+        Initialize the purge of the given bucket, without calling S3.
+
+        :param key_marker: KeyMarker of the first page to list, to resume a purge stopped before completion
+        :param version_id_marker: VersionIdMarker of the first page to list
+        """
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client or boto3_clients.get_client("s3")
+        self.key_marker = key_marker
+        self.version_id_marker = version_id_marker
+        self.completed = False
+        self.deleted_count = 0
+        # Errors of the keys not deleted after all the attempts
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def run(self, deadline=None):
+        """
+        List and delete the object versions until the bucket is empty or the deadline expires.
+
+        :param deadline: time (as returned by time.time) after which no page is listed anymore
+        :return: True if all the object versions were deleted, otherwise see errors and the markers to resume from
+        """
+        executor = ThreadPoolExecutor(max_workers=S3_PURGE_MAX_WORKERS)
+        try:
+            pending_futures = set()
+            while not self.completed and (deadline is None or time.time() < deadline):
+                if len(pending_futures) >= S3_PURGE_MAX_WORKERS:
+                    done_futures, pending_futures = wait(pending_futures, return_when=FIRST_COMPLETED)
+                    for future in done_futures:
+                        future.result()
+                objects = self._list_next_page()
+                if objects:
+                    pending_futures.add(executor.submit(self._delete_objects, objects))
+            for future in pending_futures:
+                future.result()
+        finally:
+            executor.shutdown(wait=True)
+        return self.completed and not self.errors
+
+    def _list_next_page(self):
+        """List the next page of object versions and delete markers, and move the markers after it."""
+        kwargs = {"Bucket": self.bucket_name, "MaxKeys": S3_DELETE_BATCH_SIZE}
+        if self.key_marker:
+            kwargs["KeyMarker"] = self.key_marker
+        if self.version_id_marker:
+            kwargs["VersionIdMarker"] = self.version_id_marker
+        response = retry_on_boto3_throttling(self.s3_client.list_object_versions, **kwargs)
+        self.key_marker = response.get("NextKeyMarker")
+        self.version_id_marker = response.get("NextVersionIdMarker")
+        self.completed = not response.get("IsTruncated")
+        return [
+            {"Key": version.get("Key"), "VersionId": version.get("VersionId")}
+            for version in response.get("Versions", []) + response.get("DeleteMarkers", [])
+        ]
+
+    def _delete_objects(self, objects):
+        for attempt in range(S3_PURGE_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(throttling.get_backoff_delay(attempt - 1))
+            response = retry_on_boto3_throttling(
+                self.s3_client.delete_objects, Bucket=self.bucket_name, Delete={"Objects": objects, "Quiet": True}
+            )
+            errors = response.get("Errors", [])
+            with self._lock:
+                self.deleted_count += len(objects) - len(errors)
+            if not errors:
+                return
+            LOGGER.debug("Failed to delete %d objects from bucket %s, retrying", len(errors), self.bucket_name)
+            objects = [{"Key": error.get("Key"), "VersionId": error.get("VersionId")} for error in errors]
+        with self._lock:
+            self.errors.extend(errors)
+
+
 def delete_s3_bucket(bucket_name):
     """
     Delete an S3 bucket together with all stored objects.
@@ -191,11 +348,20 @@ def delete_s3_bucket(bucket_name):
     """
     try:
         LOGGER.info("Deleting bucket %s", bucket_name)
-        bucket = boto3.resource("s3").Bucket(bucket_name)
-        bucket.objects.all().delete()
-        bucket.object_versions.delete()
-        bucket.delete()
-    except boto3.client("s3").exceptions.NoSuchBucket:
+        s3_client = boto3_clients.get_client("s3")
+        bucket_purge = BucketPurge(bucket_name, s3_client)
+        if not bucket_purge.run():
+            error = bucket_purge.errors[0]
+            LOGGER.warning(
+                "Failed to delete %d objects of bucket %s, e.g. %s: %s",
+                len(bucket_purge.errors),
+                bucket_name,
+                error.get("Key"),
+                error.get("Message"),
+            )
+        LOGGER.debug("Deleted %d objects from bucket %s", bucket_purge.deleted_count, bucket_name)
+        s3_client.delete_bucket(Bucket=bucket_name)
+    except boto3_clients.get_client("s3").exceptions.NoSuchBucket:
         pass
     except ClientError as client_err:
         LOGGER.warning(
@@ -205,42 +371,140 @@ def delete_s3_bucket(bucket_name):
         )
 
 
+# Namespace of the metadata cache folder storing the zip archives of the resources artifacts
+ARTIFACTS_CACHE_NAMESPACE = "artifacts"
+# Timestamp of all the files in the zip archives, so that archives of the same files are identical
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _walk_files(path):
+    """Return the (path, relative path) of all the files rooted in path, sorted by relative path."""
+    files = []
+    for root, dirs, file_names in os.walk(path):
+        dirs.sort()
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            files.append((file_path, os.path.relpath(file_path, start=path).replace(os.sep, "/")))
+    return sorted(files, key=lambda file: file[1])
+
+
 def _add_file_to_zip(zip_file, path, arcname):
     """
     Add the file at path under the name arcname to the archive represented by zip_file.
 
+    The file is compressed in chunks, with fixed timestamp and permissions so that the archive only depends on the
+    content of the files.
+
     :param zip_file: zipfile.ZipFile object
     :param path: string; path to file being added
     :param arcname: string; filename to put bytes from path under in created archive
     """
+    zinfo = zipfile.ZipInfo(filename=arcname, date_time=ZIP_DATE_TIME)
+    zinfo.external_attr = 0o644 << 16
+    zinfo.create_system = 3
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
     with open(path, "rb") as input_file:
-        zinfo = zipfile.ZipInfo(filename=arcname)
-        zinfo.external_attr = 0o644 << 16
-        zip_file.writestr(zinfo, input_file.read())
+        if sys.version_info >= (3, 6):
+            with zip_file.open(zinfo, "w") as output_file:
+                for chunk in iter(lambda: input_file.read(_READ_CHUNK_SIZE), b""):
+                    output_file.write(chunk)
+        else:
+            zip_file.writestr(zinfo, input_file.read())
 
 
-def zip_dir(path):
+def zip_dir(path, file_out=None):
     """
     Create a zip archive containing all files and dirs rooted in path.
 
-    The archive is created in memory and a file handler is returned by the function.
+    Archives of the same files are identical, since files are added in a fixed order and with fixed metadata.
     :param path: directory containing the resources to archive.
+    :param file_out: file object where the archive is written, by default the archive is created in memory.
     :return file handler pointing to the compressed archive.
     """
-    file_out = BytesIO()
+    file_out = file_out or BytesIO()
     with zipfile.ZipFile(file_out, "w", zipfile.ZIP_DEFLATED) as ziph:
-        for root, _, files in os.walk(path):
-            for file in files:
-                _add_file_to_zip(
-                    ziph,
-                    os.path.join(root, file),
-                    os.path.relpath(os.path.join(root, file), start=path),
-                )
+        for file_path, arcname in _walk_files(path):
+            _add_file_to_zip(ziph, file_path, arcname)
     file_out.seek(0)
     return file_out
 
 
-def upload_resources_artifacts(bucket_name, root):
+def get_dir_digest(path):
+    """Return the SHA-256 digest of the names and the content of all the files rooted in path."""
+    digest = hashlib.sha256()
+    for file_path, relative_path in _walk_files(path):
+        digest.update(relative_path.encode("utf-8") + b"\0")
+        with open(file_path, "rb") as input_file:
+            for chunk in iter(lambda: input_file.read(_READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_cached_zip_dir(path):
+    """
+    Return the path of a zip archive of the given directory, stored in the metadata cache by content digest.
+
+    The archive is created only when the cache does not contain an archive of the same files yet.
+    None is returned when the cache is not available.
+    """
+    cache_dir = metadata_cache.get_cache().get_files_dir(ARTIFACTS_CACHE_NAMESPACE)
+    if not cache_dir:
+        return None
+
+    zip_path = os.path.join(cache_dir, "{0}.zip".format(get_dir_digest(path)))
+    if os.path.isfile(zip_path):
+        LOGGER.debug("Using cached archive %s for %s", zip_path, path)
+        try:
+            # Track the last access, used by the cache to evict the least recently used files
+            os.utime(zip_path, None)
+        except OSError:
+            pass
+        return zip_path
+
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w+b") as tmp_file:
+            zip_dir(path, tmp_file)
+        # Archives are written to a temporary file first, so that concurrent processes never read partial archives
+        os.rename(tmp_path, zip_path)
+        return zip_path
+    except (IOError, OSError) as e:
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+        if os.path.isfile(zip_path):
+            # Archive stored by a concurrent process in the meantime
+            return zip_path
+        LOGGER.debug("Unable to store the archive of %s in the cache: %s", path, e)
+        return None
+
+
+def _upload_dir_artifact(bucket, path, key, zip_path=None):
+    """Upload a zip archive of the given directory, taken from the cache or compressed to a temporary file."""
+    zip_path = zip_path or get_cached_zip_dir(path)
+    if zip_path:
+        bucket.upload_file(zip_path, key)
+    else:
+        with tempfile.TemporaryFile() as zip_file:
+            bucket.upload_fileobj(zip_dir(path, zip_file), key)
+
+
+def get_cached_resources_artifacts(root):
+    """
+    Store in the cache the zip archives of the dirs contained in root dir, as uploaded by upload_resources_artifacts.
+
+    :param root: root directory containing the resources to archive.
+    :return: the paths of the archives by dir path, None for the dirs whose archive is not cached
+    """
+    return {
+        os.path.join(root, res): get_cached_zip_dir(os.path.join(root, res))
+        for res in os.listdir(root)
+        if os.path.isdir(os.path.join(root, res))
+    }
+
+
+def upload_resources_artifacts(bucket_name, root, zip_paths=None):
     """
     Upload to the specified S3 bucket the content of the directory rooted in root path.
 
@@ -249,11 +513,14 @@ def upload_resources_artifacts(bucket_name, root):
 
     :param bucket_name: name of the S3 bucket where files are uploaded
     :param root: root directory containing the resources to upload.
+    :param zip_paths: archives of the dirs already created by get_cached_resources_artifacts, by dir path
     """
-    bucket = boto3.resource("s3").Bucket(bucket_name)
+    zip_paths = zip_paths or {}
+    bucket = boto3_clients.get_resource("s3").Bucket(bucket_name)
     for res in os.listdir(root):
         if os.path.isdir(os.path.join(root, res)):
-            bucket.upload_fileobj(zip_dir(os.path.join(root, res)), "%s/artifacts.zip" % res)
+            path = os.path.join(root, res)
+            _upload_dir_artifact(bucket, path, "%s/artifacts.zip" % res, zip_paths.get(path))
         elif os.path.isfile(os.path.join(root, res)):
             bucket.upload_file(os.path.join(root, res), res)
 
@@ -275,9 +542,55 @@ def get_instance_vcpus(instance_type):
     return vcpus
 
 
+class InstanceTypeIndex(object):
+    """
+    Set-based lookup of instance types (and instance families), preserving the order returned by the service.
+
+    Membership checks take constant time, so the index can be shared by all the validators and prompts that need to
+    check if an instance type is supported.
+    """
+
+    def __init__(self, instance_types):
+        self._instance_types = tuple(instance_types)
+        self._index = frozenset(self._instance_types)
+
+    def __contains__(self, instance_type):
+        return instance_type in self._index
+
+    def __iter__(self):
+        return iter(self._instance_types)
+
+    def __len__(self):
+        return len(self._instance_types)
+
+
+def get_instance_type_offerings():
+    """
+    Return the InstanceTypeIndex of the instance types available in the given region.
+
+    Offerings are retrieved once per region and then shared for the lifetime of the process.
+    """
+    if not hasattr(get_instance_type_offerings, "cache"):
+        get_instance_type_offerings.cache = {}
+    cache = get_instance_type_offerings.cache
+    region = get_region()
+    if region not in cache:
+        instance_types = metadata_cache.get_cache().get_or_load(
+            "instance-type-offerings", "region", _describe_supported_instance_types
+        )
+        if not instance_types:
+            return InstanceTypeIndex([])
+        cache[region] = InstanceTypeIndex(instance_types)
+    return cache[region]
+
+
 def get_supported_instance_types():
     """Return the list of instance types available in the given region."""
-    ec2_client = boto3.client("ec2")
+    return list(get_instance_type_offerings())
+
+
+def _describe_supported_instance_types():
+    ec2_client = boto3_clients.get_client("ec2")
     try:
         return [
             offering.get("InstanceType") for offering in paginate_boto3(ec2_client.describe_instance_type_offerings)
@@ -303,7 +616,7 @@ def _call_create_compute_environment_with_bad_instance_type():
     For more information on why this would be done, see the docstring for
     _get_supported_instance_types_create_compute_environment_error_message.
     """
-    batch_client = boto3.client("batch")
+    batch_client = boto3_clients.get_client("batch")
     nonexistent_instance_type = "p8.84xlarge"
     batch_client.create_compute_environment(
         computeEnvironmentName="dummy",
@@ -427,10 +740,20 @@ def get_supported_compute_instance_types(scheduler):
     """
     Get supported instance types (and families in awsbatch case).
 
+    The result is computed once per region and scheduler and then shared for the lifetime of the process.
     :param scheduler: the scheduler for which we want to know the supported compute instance types or families
-    :return: the list of supported instance types and families
+    :return: the InstanceTypeIndex of supported instance types and families
     """
-    return get_supported_batch_instance_types() if scheduler == "awsbatch" else get_supported_instance_types()
+    if scheduler != "awsbatch":
+        return get_instance_type_offerings()
+
+    if not hasattr(get_supported_compute_instance_types, "cache"):
+        get_supported_compute_instance_types.cache = {}
+    cache = get_supported_compute_instance_types.cache
+    region = get_region()
+    if region not in cache:
+        cache[region] = InstanceTypeIndex(get_supported_batch_instance_types())
+    return cache[region]
 
 
 def get_supported_az_for_one_instance_type(instance_type):
@@ -466,15 +789,20 @@ def get_supported_az_for_multi_instance_types(instance_types):
     if not hasattr(get_supported_az_for_multi_instance_types, "cache"):
         get_supported_az_for_multi_instance_types.cache = {}
     cache = get_supported_az_for_multi_instance_types.cache
+    disk_cache = metadata_cache.get_cache()
     missing_instance_types = []
     result = {}
     for instance_type in instance_types:
+        if instance_type not in cache:
+            cached_azs = disk_cache.get("instance-type-azs", _get_az_offerings_cache_key(instance_type))
+            if cached_azs is not None:
+                cache[instance_type] = tuple(cached_azs)
         if instance_type in cache:
             result[instance_type] = cache[instance_type]
         else:
             missing_instance_types.append(instance_type)
     if missing_instance_types:
-        ec2_client = boto3.client("ec2")
+        ec2_client = boto3_clients.get_client("ec2")
         paginator = ec2_client.get_paginator("describe_instance_type_offerings")
         page_iterator = paginator.paginate(
             LocationType="availability-zone", Filters=[{"Name": "instance-type", "Values": missing_instance_types}]
@@ -486,10 +814,22 @@ def get_supported_az_for_multi_instance_types(instance_types):
             cache[instance_type] = tuple(
                 offering["Location"] for offering in offerings if offering["InstanceType"] == instance_type
             )
+            disk_cache.set("instance-type-azs", _get_az_offerings_cache_key(instance_type), cache[instance_type])
             result[instance_type] = cache[instance_type]
     return result
 
 
+def _get_az_offerings_cache_key(instance_type):
+    """
+    Return the key used to cache the availability zones offering the given instance type.
+
+    Availability zone names are mapped to different physical zones in each account,
+    so the identity in use is part of the key.
+    """
+    identity = "{0}:{1}".format(os.environ.get("AWS_PROFILE", ""), os.environ.get("AWS_ACCESS_KEY_ID", ""))
+    return {"instance_type": instance_type, "identity": hashlib.sha256(identity.encode("utf-8")).hexdigest()}
+
+
 def get_availability_zone_of_subnet(subnet_id):
     """
     Return the availability zone of the subnet.
@@ -503,7 +843,10 @@ def get_availability_zone_of_subnet(subnet_id):
     if subnet_id not in cache:
         try:
             cache[subnet_id] = (
-                boto3.client("ec2").describe_subnets(SubnetIds=[subnet_id]).get("Subnets")[0].get("AvailabilityZone")
+                boto3_clients.get_client("ec2")
+                .describe_subnets(SubnetIds=[subnet_id])
+                .get("Subnets")[0]
+                .get("AvailabilityZone")
             )
         except ClientError as e:
             LOGGER.debug(
@@ -565,7 +908,7 @@ def get_stack(stack_name, cfn_client=None, raise_on_error=False):
     """
     try:
         if not cfn_client:
-            cfn_client = boto3.client("cloudformation")
+            cfn_client = boto3_clients.get_client("cloudformation")
         return retry_on_boto3_throttling(cfn_client.describe_stacks, StackName=stack_name).get("Stacks")[0]
     except ClientError as e:
         if raise_on_error:
@@ -590,7 +933,7 @@ def stack_exists(stack_name):
 
 def get_stack_resources(stack_name):
     """Get the given stack's resources."""
-    cfn_client = boto3.client("cloudformation")
+    cfn_client = boto3_clients.get_client("cloudformation")
     try:
         return retry_on_boto3_throttling(cfn_client.describe_stack_resources, StackName=stack_name).get(
             "StackResources"
@@ -604,7 +947,7 @@ def get_stack_resources(stack_name):
 
 
 def get_stack_events(stack_name, raise_on_error=False):
-    cfn_client = boto3.client("cloudformation")
+    cfn_client = boto3_clients.get_client("cloudformation")
     try:
         return retry_on_boto3_throttling(cfn_client.describe_stack_events, StackName=stack_name).get("StackEvents")
     except ClientError as client_err:
@@ -617,16 +960,200 @@ def get_stack_events(stack_name, raise_on_error=False):
         )
 
 
-def get_cluster_substacks(cluster_name):
+class StackEventTailer(object):
+    """
+    Incremental reader of the events of a stack and of its nested substacks.
+
+    Every poll only describes the events created since the previous one: the pagination stops as soon as the last
+    seen event of each stack is reached, so the whole event history is never retrieved again. Substacks are followed
+    as soon as an event of their parent stack refers to them.
+    """
+
+    def __init__(self, stack_name, follow_substacks=True):
+        """
+        Initialize the tailer, without calling CloudFormation.
+
+        :param stack_name: name or id of the stack
+        :param follow_substacks: True to return the events of the nested substacks as well
+        """
+        self.follow_substacks = follow_substacks
+        self._stack_ids = [stack_name]
+        self._last_event_ids = {stack_name: None}
+        # Events older than this are never returned, it's used for the substacks with no event seen yet
+        self._since = None
+
+    def skip_existing_events(self):
+        """Mark the events created so far as seen, so that poll only returns the following ones."""
+        stack_id = self._stack_ids[0]
+        events = retry_on_boto3_throttling(
+            boto3_clients.get_client("cloudformation").describe_stack_events, StackName=stack_id
+        ).get("StackEvents")
+        if events:
+            self._last_event_ids[stack_id] = events[0].get("EventId")
+            self._since = events[0].get("Timestamp")
+
+    def poll(self):
+        """Return the events created since the previous poll, from the oldest to the newest."""
+        new_events = []
+        # Substacks found while polling are appended to the list, so their events are returned by this same poll
+        for stack_id in self._stack_ids:
+            events = self._describe_new_events(stack_id)
+            if events:
+                self._last_event_ids[stack_id] = events[0].get("EventId")
+                self._follow_substacks(events)
+                new_events.extend(reversed(events))
+        return sorted(new_events, key=lambda event: event.get("Timestamp"))
+
+    def _describe_new_events(self, stack_id):
+        """Return the events of the given stack not seen yet, from the newest to the oldest."""
+        cfn_client = boto3_clients.get_client("cloudformation")
+        last_event_id = self._last_event_ids[stack_id]
+        kwargs = {"StackName": stack_id}
+        events = []
+        while True:
+            response = retry_on_boto3_throttling(cfn_client.describe_stack_events, **kwargs)
+            for event in response.get("StackEvents", []):
+                if event.get("EventId") == last_event_id or (self._since and event.get("Timestamp") < self._since):
+                    return events
+                events.append(event)
+            if not response.get("NextToken"):
+                return events
+            kwargs["NextToken"] = response.get("NextToken")
+
+    def _follow_substacks(self, events):
+        if not self.follow_substacks:
+            return
+        for event in events:
+            substack_id = event.get("PhysicalResourceId")
+            # Events of the stack itself have the stack type as well, with the stack id as physical id
+            if (
+                event.get("ResourceType") == STACK_TYPE
+                and substack_id
+                and substack_id != event.get("StackId")
+                and substack_id not in self._last_event_ids
+            ):
+                self._stack_ids.append(substack_id)
+                self._last_event_ids[substack_id] = None
+
+
+def print_stack_events(events):
+    """Print the given stack events, one per line."""
+    for event in events:
+        resource_status = "Status: %s - %s" % (event.get("LogicalResourceId"), event.get("ResourceStatus"))
+        if event.get("ResourceStatusReason"):
+            resource_status += " - %s" % event.get("ResourceStatusReason")
+        sys.stdout.write("\r%s\n" % resource_status.ljust(80))
+    sys.stdout.flush()
+
+
+def get_cluster_substacks(cluster_name, stack_snapshot=None):
     """Return stack objects with names that match the given prefix."""
-    resources = get_stack_resources(get_stack_name(cluster_name))
+    stack_snapshot = stack_snapshot or ClusterStackSnapshot(get_stack_name(cluster_name))
     substacks = []
-    for r in resources:
+    for r in stack_snapshot.resources:
         if r.get("ResourceType") == STACK_TYPE and r.get("PhysicalResourceId"):
             substacks.append(get_stack(r.get("PhysicalResourceId")))
     return substacks
 
 
+class ClusterStackSnapshot(object):
+    """
+    Description of a cluster stack, retrieved once per command.
+
+    The stack (with its outputs, parameters and tags) and its resources are described on first access, and the
+    resources of the substacks only when requested, then every following access reads them from the snapshot.
+    Commands changing the stack must call invalidate to describe it again.
+    """
+
+    def __init__(self, stack_name, stack=None):
+        """
+        Initialize the snapshot, without calling CloudFormation.
+
+        :param stack_name: name or id of the cluster stack
+        :param stack: the stack data type if already described, to initialize the snapshot with
+        """
+        self.stack_name = stack_name
+        self._stack = stack
+        self._resources = None
+        self._substack_resources = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        """Return the snapshot itself, copies of the cluster configuration refer to the same stack."""
+        return self
+
+    @property
+    def stack(self):
+        """Return the stack data type, describing the stack on first access."""
+        with self._lock:
+            if self._stack is None:
+                self._stack = get_stack(self.stack_name)
+            return self._stack
+
+    @property
+    def outputs(self):
+        """Return the outputs of the stack."""
+        return self.stack.get("Outputs", [])
+
+    @property
+    def parameters(self):
+        """Return the parameters of the stack."""
+        return self.stack.get("Parameters", [])
+
+    @property
+    def tags(self):
+        """Return the tags of the stack."""
+        return self.stack.get("Tags", [])
+
+    @property
+    def resources(self):
+        """Return the resources of the stack, describing them on first access."""
+        with self._lock:
+            if self._resources is None:
+                self._resources = get_stack_resources(self.stack_name)
+            return self._resources
+
+    def get_output(self, output_key):
+        """Return the value of the given output, or None if the stack doesn't have it."""
+        return get_stack_output_value(self.outputs, output_key)
+
+    def get_param(self, param_key):
+        """Return the value of the given parameter, see get_cfn_param."""
+        return get_cfn_param(self.parameters, param_key)
+
+    def get_resource_id(self, logical_id):
+        """Return the physical id of the given resource of the stack, or None if the stack doesn't have it."""
+        return next(
+            (r.get("PhysicalResourceId") for r in self.resources if r.get("LogicalResourceId") == logical_id), None
+        )
+
+    def get_substack_resources(self, logical_id):
+        """
+        Return the resources of the given substack, describing them on first access.
+
+        :param logical_id: logical id of the substack in the cluster stack, e.g. EBSCfnStack
+        :return: the resources of the substack, or an empty list if the substack doesn't exist
+        """
+        substack_id = self.get_resource_id(logical_id)
+        if not substack_id:
+            return []
+        with self._lock:
+            if substack_id not in self._substack_resources:
+                self._substack_resources[substack_id] = get_stack_resources(substack_id)
+            return self._substack_resources[substack_id]
+
+    def invalidate(self, stack=None):
+        """
+        Discard the descriptions retrieved so far, so that they are described again on next access.
+
+        :param stack: the stack data type if already described, to initialize the snapshot with
+        """
+        with self._lock:
+            self._stack = stack
+            self._resources = None
+            self._substack_resources = {}
+
+
 def verify_stack_creation(stack_name, cfn_client):
     """
     Wait for the stack creation to be completed and notify if the stack creation fails.
@@ -696,21 +1223,24 @@ def get_templates_bucket_path():
     )
 
 
-def get_installed_version():
-    """Get the version of the installed aws-parallelcluster package."""
-    return pkg_resources.get_distribution("aws-parallelcluster").version
-
-
-def check_if_latest_version():
-    """Check if the current package version is the latest one."""
+def get_newer_version_message():
+    """Return the message notifying that a newer version of the package is available, None if there is none."""
     try:
         latest = json.loads(urllib.request.urlopen("https://pypi.python.org/pypi/aws-parallelcluster/json").read())[
             "info"
         ]["version"]
         if get_installed_version() < latest:
-            print("Info: There is a newer version %s of AWS ParallelCluster available." % latest)
+            return "Info: There is a newer version %s of AWS ParallelCluster available." % latest
     except Exception:
         pass
+    return None
+
+
+def check_if_latest_version():
+    """Check if the current package version is the latest one."""
+    message = get_newer_version_message()
+    if message:
+        print(message)
 
 
 def warn(message):
@@ -748,7 +1278,7 @@ def get_efs_mount_target_id(efs_fs_id, avail_zone):
     """
     mount_target_id = None
     if efs_fs_id:
-        mount_targets = boto3.client("efs").describe_mount_targets(FileSystemId=efs_fs_id)
+        mount_targets = boto3_clients.get_client("efs").describe_mount_targets(FileSystemId=efs_fs_id)
 
         for mount_target in mount_targets.get("MountTargets"):
             # Check to see if there is an existing mt in the az of the stack
@@ -773,7 +1303,7 @@ def _describe_cluster_instances_iterator(
     instance_state=("pending", "running", "stopping", "stopped"),
 ):
     try:
-        ec2 = boto3.client("ec2")
+        ec2 = boto3_clients.get_client("ec2")
         filters = [
             {"Name": "tag:Application", "Values": [stack_name]},
             {"Name": "instance-state-name", "Values": list(instance_state)},
@@ -823,7 +1353,7 @@ def _get_master_server_ip(stack_name):
 
 
 def get_master_ip_and_username(cluster_name):
-    cfn = boto3.client("cloudformation")
+    cfn = boto3_clients.get_client("cloudformation")
     try:
         stack_name = get_stack_name(cluster_name)
 
@@ -866,7 +1396,7 @@ def get_master_server_state(stack_name):
 def get_info_for_amis(ami_ids):
     """Get information returned by EC2's describe-images API for the given list of AMIs."""
     try:
-        return boto3.client("ec2").describe_images(ImageIds=ami_ids).get("Images")
+        return boto3_clients.get_client("ec2").describe_images(ImageIds=ami_ids).get("Images")
     except ClientError as e:
         error(e.response.get("Error").get("Message"))
 
@@ -886,9 +1416,19 @@ def validate_pcluster_version_based_on_ami_name(ami_name):
 
 def get_instance_types_info(instance_types, fail_on_error=True):
     """Return InstanceTypes list returned by EC2's DescribeInstanceTypes API."""
+    info_by_type = {}
+    missing_instance_types = []
+    for instance_type in instance_types:
+        instance_type_info = _get_cached_instance_type_info(instance_type)
+        if instance_type_info is None:
+            missing_instance_types.append(instance_type)
+        else:
+            info_by_type[instance_type] = instance_type_info
+
     try:
-        ec2_client = boto3.client("ec2")
-        return ec2_client.describe_instance_types(InstanceTypes=instance_types).get("InstanceTypes")
+        for instance_types_chunk in _chunk_list(missing_instance_types, DESCRIBE_INSTANCE_TYPES_MAX_ITEMS):
+            for instance_type_info in _describe_instance_types(instance_types_chunk):
+                info_by_type[instance_type_info.get("InstanceType")] = instance_type_info
     except ClientError as e:
         error(
             "Error when calling DescribeInstanceTypes for instances {0}: {1}".format(
@@ -896,6 +1436,65 @@ def get_instance_types_info(instance_types, fail_on_error=True):
             ),
             fail_on_error,
         )
+        return None
+
+    return [info_by_type[instance_type] for instance_type in instance_types if instance_type in info_by_type]
+
+
+def prefetch_instance_types_info(instance_types):
+    """
+    Retrieve the info of the given instance types with the minimum number of DescribeInstanceTypes calls.
+
+    Info are kept in memory and in the metadata cache, so that following calls to get_instance_type and
+    get_instance_types_info don't need to call EC2 again. Errors are only logged, since they are raised
+    by get_instance_type when the info of the failing instance type are needed.
+    :param instance_types: the instance types to retrieve, duplicates and empty values are ignored
+    """
+    missing_instance_types = [
+        instance_type
+        for instance_type in sorted(set(instance_type for instance_type in instance_types if instance_type))
+        if _get_cached_instance_type_info(instance_type) is None
+    ]
+    for instance_types_chunk in _chunk_list(missing_instance_types, DESCRIBE_INSTANCE_TYPES_MAX_ITEMS):
+        try:
+            _describe_instance_types(instance_types_chunk)
+        except (BotoCoreError, ClientError) as e:
+            LOGGER.debug("Unable to prefetch info for instance types %s: %s", ", ".join(instance_types_chunk), e)
+
+
+def _get_instance_types_index():
+    """Return the in-memory index of the instance type info retrieved in the current region."""
+    if not hasattr(_get_instance_types_index, "cache"):
+        _get_instance_types_index.cache = {}
+    return _get_instance_types_index.cache.setdefault(get_region(), {})
+
+
+def _get_cached_instance_type_info(instance_type):
+    """Return the info of the given instance type from the in-memory index or the metadata cache, if available."""
+    index = _get_instance_types_index()
+    if instance_type not in index:
+        instance_type_info = metadata_cache.get_cache().get("instance-types", instance_type)
+        if instance_type_info is None:
+            return None
+        index[instance_type] = instance_type_info
+    return index[instance_type]
+
+
+def _describe_instance_types(instance_types):
+    """Call DescribeInstanceTypes for the given instance types and store the results in memory and on disk."""
+    index = _get_instance_types_index()
+    cache = metadata_cache.get_cache()
+    ec2_client = boto3_clients.get_client("ec2")
+    instance_types_info = ec2_client.describe_instance_types(InstanceTypes=instance_types).get("InstanceTypes")
+    for instance_type_info in instance_types_info:
+        index[instance_type_info.get("InstanceType")] = instance_type_info
+        cache.set("instance-types", instance_type_info.get("InstanceType"), instance_type_info)
+    return instance_types_info
+
+
+def _chunk_list(items, chunk_size):
+    """Split the given list in lists of chunk_size items at most."""
+    return [items[index : index + chunk_size] for index in range(0, len(items), chunk_size)]
 
 
 def get_supported_architectures_for_instance_type(instance_type):
@@ -915,40 +1514,41 @@ def get_supported_architectures_for_instance_type(instance_type):
 
 
 def get_cli_log_file():
-    return os.path.expanduser(os.path.join("~", ".parallelcluster", "pcluster-cli.log"))
+    return os.path.expanduser(PCLUSTER_CLI_LOG_FILE)
 
 
-def retry(func, func_args, attempts=1, wait=0):
+def retry(func, func_args, attempts=1, wait=0, max_wait=throttling.DEFAULT_MAX_DELAY):
     """
     Call function and re-execute it if it raises an Exception.
 
+    Delays between attempts grow exponentially and are randomized, so that concurrent callers don't retry together.
     :param func: the function to execute.
     :param func_args: the positional arguments of the function.
     :param attempts: the maximum number of attempts. Default: 1.
-    :param wait: delay between attempts. Default: 0.
+    :param wait: maximum delay before the first retry, doubled at every attempt. Default: 0.
+    :param max_wait: maximum delay between attempts.
     :returns: the result of the function.
     """
-    while attempts:
+    attempt = 0
+    while True:
         try:
             return func(*func_args)
         except Exception as e:
-            attempts -= 1
-            if not attempts:
+            attempt += 1
+            if attempt >= attempts:
                 raise e
 
-            LOGGER.debug("{0}, retrying in {1} seconds..".format(e, wait))
-            time.sleep(wait)
+            delay = throttling.get_backoff_delay(attempt - 1, base_delay=wait, max_delay=max_wait)
+            LOGGER.debug("{0}, retrying in {1:.2f} seconds..".format(e, delay))
+            time.sleep(delay)
 
 
-def get_asg_name(stack_name):
-    outputs = get_stack(stack_name).get("Outputs", [])
-    asg_name = get_stack_output_value(outputs, "ASGName")
+def get_asg_name(stack_name, stack_snapshot=None):
+    stack_snapshot = stack_snapshot or ClusterStackSnapshot(stack_name)
+    asg_name = stack_snapshot.get_output("ASGName")
     if not asg_name:
         # Fallback to old behaviour to preserve backward compatibility
-        resources = get_stack_resources(stack_name)
-        asg_name = next(
-            (r.get("PhysicalResourceId") for r in resources if r.get("LogicalResourceId") == "ComputeFleet"), None
-        )
+        asg_name = stack_snapshot.get_resource_id("ComputeFleet")
         if not asg_name:
             LOGGER.error("Could not retrieve AutoScaling group name. Please check cluster status.")
             sys.exit(1)
@@ -956,29 +1556,28 @@ def get_asg_name(stack_name):
 
 
 def set_asg_limits(asg_name, min, max, desired):
-    asg = boto3.client("autoscaling")
+    asg = boto3_clients.get_client("autoscaling")
     asg.update_auto_scaling_group(
         AutoScalingGroupName=asg_name, MinSize=int(min), MaxSize=int(max), DesiredCapacity=int(desired)
     )
 
 
-def get_batch_ce(stack_name):
+def get_batch_ce(stack_name, stack_snapshot=None):
     """
     Get name of the AWS Batch Compute Environment.
 
     :param stack_name: name of the master stack
-    :param config: config
+    :param stack_snapshot: ClusterStackSnapshot of the master stack, the stack is described if not provided
     :return: ce_name or exit if not found
     """
-    outputs = get_stack(stack_name).get("Outputs")
-    return get_stack_output_value(outputs, "BatchComputeEnvironmentArn")
+    return (stack_snapshot or ClusterStackSnapshot(stack_name)).get_output("BatchComputeEnvironmentArn")
 
 
-def get_batch_ce_capacity(stack_name):
-    client = boto3.client("batch")
+def get_batch_ce_capacity(stack_name, stack_snapshot=None):
+    client = boto3_clients.get_client("batch")
 
     return (
-        client.describe_compute_environments(computeEnvironments=[get_batch_ce(stack_name)])
+        client.describe_compute_environments(computeEnvironments=[get_batch_ce(stack_name, stack_snapshot)])
         .get("computeEnvironments")[0]
         .get("computeResources")
         .get("desiredvCpus")
@@ -986,20 +1585,34 @@ def get_batch_ce_capacity(stack_name):
 
 
 def retry_on_boto3_throttling(func, wait=5, *args, **kwargs):
+    """
+    Call a boto3 function until it is not throttled anymore.
+
+    Throttled calls are already retried by the clients (see pcluster.throttling), this keeps retrying with exponential
+    backoff and jitter when the clients give up, honoring the Retry-After header.
+    :param func: the boto3 function to execute
+    :param wait: maximum delay between attempts
+    """
+    attempt = 0
     while True:
         try:
             return func(*args, **kwargs)
         except ClientError as e:
-            if e.response["Error"]["Code"] != "Throttling":
+            if not throttling.is_throttling_error(e.response):
                 raise
-            LOGGER.debug("Throttling when calling %s function. Will retry in %d seconds.", func.__name__, wait)
-            time.sleep(wait)
+            delay = throttling.get_backoff_delay(
+                attempt, max_delay=wait, retry_after=throttling.get_retry_after(e.response)
+            )
+            throttling.get_rate_limiter().stats.record_throttle(delay)
+            LOGGER.debug("Throttling when calling %s function. Will retry in %.2f seconds.", func.__name__, delay)
+            time.sleep(delay)
+            attempt += 1
 
 
-def get_asg_settings(stack_name):
+def get_asg_settings(stack_name, stack_snapshot=None):
     try:
-        asg_name = get_asg_name(stack_name)
-        asg_client = boto3.client("autoscaling")
+        asg_name = get_asg_name(stack_name, stack_snapshot)
+        asg_client = boto3_clients.get_client("autoscaling")
         return asg_client.describe_auto_scaling_groups(AutoScalingGroupNames=[asg_name]).get("AutoScalingGroups")[0]
     except Exception as e:
         LOGGER.error("Failed when retrieving data for ASG %s with exception %s", asg_name, e)
@@ -1021,23 +1634,26 @@ def get_base_additional_iam_policies():
     return [policy_name_to_arn("CloudWatchAgentServerPolicy"), policy_name_to_arn("AWSBatchFullAccess")]
 
 
-def cluster_has_running_capacity(stack_name):
-    stack = get_stack(stack_name)
-    scheduler = get_cfn_param(stack.get("Parameters", []), "Scheduler")
-    if is_hit_enabled_cluster(stack):
+def cluster_has_running_capacity(stack_name, stack_snapshot=None):
+    stack_snapshot = stack_snapshot or ClusterStackSnapshot(stack_name)
+    scheduler = stack_snapshot.get_param("Scheduler")
+    if is_hit_enabled_cluster(stack_snapshot.stack):
         return ComputeFleetStatusManager(get_cluster_name(stack_name)).get_status() != ComputeFleetStatus.STOPPED
     else:
         return (
-            get_batch_ce_capacity(stack_name) > 0
+            get_batch_ce_capacity(stack_name, stack_snapshot) > 0
             if scheduler == "awsbatch"
-            else get_asg_settings(stack_name).get("DesiredCapacity") > 0
+            else get_asg_settings(stack_name, stack_snapshot).get("DesiredCapacity") > 0
         )
 
 
 def get_instance_type(instance_type):
-    ec2_client = boto3.client("ec2")
+    instance_type_info = _get_cached_instance_type_info(instance_type)
+    if instance_type_info is not None:
+        return instance_type_info
+
     try:
-        return ec2_client.describe_instance_types(InstanceTypes=[instance_type]).get("InstanceTypes")[0]
+        return _describe_instance_types([instance_type])[0]
     except Exception as e:
         LOGGER.error("Failed when retrieving instance type data for instance type %s: %s", instance_type, e)
         raise e
@@ -1085,41 +1701,6 @@ def is_hit_enabled_cluster(cfn_stack):
     return is_hit_enabled_scheduler(scheduler) and version >= "2.9.0"
 
 
-def read_remote_file(url):
-    """Read a remote file from an HTTP or S3 url."""
-    try:
-        if urlparse(url).scheme == "s3":
-            match = re.match(r"s3://(.*?)/(.*)", url)
-            bucket, key = match.group(1), match.group(2)
-            file_contents = boto3.resource("s3").Object(bucket, key).get()["Body"].read().decode("utf-8")
-        else:
-            with urllib.request.urlopen(url) as f:
-                file_contents = f.read().decode("utf-8")
-        return file_contents
-    except Exception as e:
-        LOGGER.error("Failed when reading remote file from url %s: %s", url, e)
-        raise e
-
-
-def render_template(template_str, params_dict, tags, config_version=None):
-    """
-    Render a Jinja template and return the rendered output.
-
-    :param template_str: Template file contents as a string
-    :param params_dict: Template parameters dict
-    """
-    try:
-        environment = Environment(loader=BaseLoader)
-        environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
-        environment.filters["bool"] = lambda value: value.lower() == "true"
-        template = environment.from_string(template_str)
-        output_from_parsed_template = template.render(config=params_dict, config_version=config_version, tags=tags)
-        return output_from_parsed_template
-    except Exception as e:
-        LOGGER.error("Error when rendering template: %s", e)
-        raise e
-
-
 def get_bucket_url(region):
     """Return the ParallelCluster's bucket url for the provided region."""
     s3_suffix = ".cn" if region.startswith("cn") else ""
@@ -1151,7 +1732,7 @@ def get_ebs_snapshot_info(ebs_snapshot_id, raise_exceptions=False):
     }
     """
     try:
-        return boto3.client("ec2").describe_snapshots(SnapshotIds=[ebs_snapshot_id]).get("Snapshots")[0]
+        return boto3_clients.get_client("ec2").describe_snapshots(SnapshotIds=[ebs_snapshot_id]).get("Snapshots")[0]
     except ClientError as e:
         if raise_exceptions:
             raise
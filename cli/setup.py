@@ -37,6 +37,7 @@ if sys.version_info < (3, 4):
 
 if sys.version_info[0] == 2:
     REQUIRES.append("configparser>=3.5.0,<=3.8.1")
+    REQUIRES.append("futures>=3.3.0")
 
 setup(
     name="aws-parallelcluster",
@@ -1,5 +1,6 @@
 import json
 import os
+import time
 
 import pytest
 
@@ -20,7 +21,7 @@ class TestArgs(object):
 def boto3_stubber_path():
     # we need to set the region in the environment because the Boto3ClientFactory requires it.
     os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
-    return "awsbatch.common.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.mark.usefixtures("awsbatchcliconfig_mock")
@@ -446,3 +447,23 @@ class TestOutput(object):
         awsbstat.main(["-c", "cluster"] + args)
 
         assert capsys.readouterr().out == read_text(test_datadir / expected)
+
+
+def test_chunked_describe_jobs(mocker):
+    mocker.patch("awsbatch.awsbstat.DESCRIBE_JOBS_CHUNK_SIZE", 3)
+    job_ids = ["job:{0}".format(index) for index in range(10)]
+
+    def _describe_jobs(jobs):
+        # earlier chunks complete later, the output must keep the order of the job ids anyway
+        time.sleep(0.01 * (len(job_ids) - job_ids.index(jobs[0])))
+        return {"jobs": [{"jobId": job_id} for job_id in jobs]}
+
+    batch_client = mocker.MagicMock()
+    batch_client.describe_jobs.side_effect = _describe_jobs
+    boto3_factory = mocker.MagicMock()
+    boto3_factory.get_client.return_value = batch_client
+
+    command = awsbstat.AWSBstatCommand(mocker.MagicMock(), boto3_factory)
+    jobs = command._AWSBstatCommand__chunked_describe_jobs(job_ids)
+    assert [job["jobId"] for job in jobs] == job_ids
+    assert batch_client.describe_jobs.call_count == 4
@@ -12,6 +12,46 @@ import pytest
 from botocore.stub import Stubber
 from jinja2 import Environment, FileSystemLoader
 
+from pcluster import boto3_clients, metadata_cache, templates, throttling, utils
+from pcluster.config.validation import VALIDATION_WORKERS_ENV
+
+
+@pytest.fixture(autouse=True)
+def clear_boto3_client_registry():
+    """Drop the boto3 clients cached by the process-wide registry, so that they are never shared between tests."""
+    boto3_clients.get_registry().reset()
+    yield
+    boto3_clients.get_registry().reset()
+
+
+@pytest.fixture(autouse=True)
+def isolated_metadata_cache(tmpdir, monkeypatch):
+    """Store the metadata cached on disk in a temporary folder, so that it's never shared between tests."""
+    monkeypatch.setenv(metadata_cache.CACHE_DIR_ENV, str(tmpdir.join("cache")))
+    monkeypatch.setattr(metadata_cache.get_cache(), "refresh", False)
+    # The Jinja environment stores the compiled templates in the cache folder
+    monkeypatch.setattr(templates, "_ENVIRONMENT", None)
+    for func in (
+        utils.get_instance_type_offerings,
+        utils.get_supported_compute_instance_types,
+        utils._get_instance_types_index,
+    ):
+        monkeypatch.delattr(func, "cache", raising=False)
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    """Drop the token buckets of the process-wide rate limiter, so that throttling is never shared between tests."""
+    throttling.get_rate_limiter().reset()
+    yield
+    throttling.get_rate_limiter().reset()
+
+
+@pytest.fixture(autouse=True)
+def sequential_validation(monkeypatch):
+    """Run configuration validators sequentially, since botocore Stubber expects API calls in a precise order."""
+    monkeypatch.setenv(VALIDATION_WORKERS_ENV, "1")
+
 
 @pytest.fixture
 def failed_with_message(capsys):
@@ -76,7 +116,7 @@ def boto3_stubber(mocker, boto3_stubber_path):
     The function makes use of botocore.Stubber to mock the boto3 API calls.
     Multiple boto3 services can be mocked as part of the same test.
 
-    :param boto3_stubber_path is the path of the boto3 import to mock. (e.g. pcluster.config.validators.boto3)
+    :param boto3_stubber_path is the path of the boto3 import to mock. (e.g. pcluster.boto3_clients.boto3)
     """
     __tracebackhide__ = True
     created_stubbers = []
@@ -113,6 +153,8 @@ def boto3_stubber(mocker, boto3_stubber_path):
         # Add stubber to the collection of mocked clients. This allows to mock multiple clients.
         # Mocking twice the same client will replace the previous one.
         mocked_clients[service] = client
+        # Drop clients already cached by the registry so that the mocked one is returned from now on.
+        boto3_clients.get_registry().reset()
         return client
 
     # yield allows to return the value and then continue the execution when the test is over.
@@ -41,6 +41,17 @@ class TestComputeFleetStatusManager:
             ConsistentRead=True, Key={"Id": "COMPUTE_FLEET"}
         )
 
+    @pytest.mark.parametrize("get_item_response", [{}, Exception("Rate exceeded")], ids=["empty_response", "exception"])
+    def test_get_status_raise_on_error(self, compute_fleet_status_manager, caplog, get_item_response):
+        if isinstance(get_item_response, Exception):
+            compute_fleet_status_manager._table.get_item.side_effect = get_item_response
+        else:
+            compute_fleet_status_manager._table.get_item.return_value = get_item_response
+        with pytest.raises(Exception, match="Rate exceeded|COMPUTE_FLEET status not found"):
+            compute_fleet_status_manager.get_status(raise_on_error=True)
+        # errors are left to the caller, without logging them
+        assert_that(caplog.text).is_empty()
+
     @pytest.mark.parametrize(
         "put_item_response, expected_exception",
         [
@@ -1,5 +1,6 @@
 """This module provides unit tests for the functions in the pcluster.delete module."""
 
+import logging
 from collections import namedtuple
 
 import pytest
@@ -11,7 +12,9 @@ from pcluster.cli_commands.delete import (
     _get_unretained_cw_log_group_resource_keys,
     _persist_cloudwatch_log_groups,
     _persist_stack_resources,
+    _terminate_cluster_nodes,
     delete,
+    delete_clusters,
 )
 
 FakePdeleteArgs = namedtuple("FakePdeleteArgs", "cluster_name config_file nowait keep_logs region")
@@ -181,3 +184,130 @@ def test_get_unretained_cw_log_group_resource_keys(template, expected_return):
     """Verify that commands._get_unretained_cw_log_group_resource_keys behaves as expected."""
     observed_return = _get_unretained_cw_log_group_resource_keys(template)
     assert_that(observed_return).is_equal_to(expected_return)
+
+
+def _describe_instances_page(instance_ids):
+    return {"Reservations": [{"Instances": [{"InstanceId": instance_id}]} for instance_id in instance_ids]}
+
+
+@pytest.mark.parametrize(
+    "passes, expected_terminated, expected_warning",
+    [
+        # nodes missed by the first pass are terminated by the second, the third finds none
+        ([[["i-1", "i-2"], ["i-3"]], [["i-4"]], []], ["i-1", "i-2", "i-3", "i-4"], False),
+        ([[["i-1"]], [["i-1"]], [["i-1"]]], ["i-1", "i-1", "i-1"], True),
+        ([[]], [], False),
+    ],
+)
+def test_terminate_cluster_nodes(mocker, caplog, passes, expected_terminated, expected_warning):
+    caplog.set_level(logging.INFO, logger="pcluster")
+    ec2_mock = mocker.patch("pcluster.cli_commands.delete.boto3_clients.get_client").return_value
+    ec2_mock.get_paginator.return_value.paginate.side_effect = [
+        [_describe_instances_page(page) for page in pages] for pages in passes
+    ]
+
+    _terminate_cluster_nodes(FAKE_STACK_NAME)
+
+    ec2_mock.get_paginator.assert_called_with("describe_instances")
+    assert_that(ec2_mock.get_paginator.return_value.paginate.call_count).is_equal_to(len(passes))
+    ec2_mock.get_paginator.return_value.paginate.assert_called_with(
+        Filters=[
+            {"Name": "tag:Application", "Values": [FAKE_STACK_NAME]},
+            {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
+            {"Name": "tag:aws-parallelcluster-node-type", "Values": ["Compute"]},
+        ],
+        PaginationConfig={"PageSize": 1000},
+    )
+    terminated = [
+        instance_id
+        for call in ec2_mock.terminate_instances.call_args_list
+        for instance_id in call[1].get("InstanceIds")
+    ]
+    assert_that(sorted(terminated)).is_equal_to(expected_terminated)
+    if expected_terminated:
+        assert_that(caplog.text).contains(
+            "Requested termination of {0} compute fleet nodes".format(len(expected_terminated))
+        )
+    if expected_warning:
+        assert_that(caplog.text).contains("Compute fleet nodes were still found after 3 checks")
+    else:
+        assert_that(caplog.text).does_not_contain("still found")
+
+
+@pytest.mark.parametrize("nowait", [False, True])
+def test_delete_clusters(mocker, caplog, nowait):
+    caplog.set_level(logging.INFO, logger="pcluster")
+    mocker.patch("pcluster.cli_commands.delete.PclusterConfig.init_aws")
+    mocker.patch("pcluster.cli_commands.delete.time.sleep")
+    mocker.patch(
+        "pcluster.cli_commands.delete.utils.expand_cluster_patterns", return_value=["test-1", "test-2", "deleted"]
+    )
+    cfn_mock = mocker.patch("pcluster.cli_commands.delete.boto3_clients.get_client").return_value
+    terminate_cluster_nodes_mock = mocker.patch("pcluster.cli_commands.delete._terminate_cluster_nodes")
+    event_tailer_mock = mocker.patch("pcluster.cli_commands.delete.utils.StackEventTailer")
+    event_tailer_mock.return_value.poll.return_value = [
+        {"LogicalResourceId": "MasterServer", "ResourceStatus": "DELETE_IN_PROGRESS", "Timestamp": 0}
+    ]
+    stack_statuses = {"id-1": ["DELETE_COMPLETE"], "id-2": ["DELETE_IN_PROGRESS", "DELETE_FAILED"]}
+
+    def _get_stack(stack_name, raise_on_error=False):
+        if stack_name == "parallelcluster-deleted":
+            raise ClientError({"Error": {"Message": "Stack with id {0} does not exist".format(stack_name)}}, "describe")
+        if stack_name.startswith("parallelcluster-"):
+            return {"StackId": "id-" + stack_name[-1]}
+        return {"StackStatus": stack_statuses[stack_name].pop(0)}
+
+    mocker.patch("pcluster.cli_commands.delete.utils.get_stack", side_effect=_get_stack)
+    args = mocker.MagicMock(cluster_name=["test-*", "deleted"], config_file=None, nowait=nowait, keep_logs=False)
+
+    if nowait:
+        delete_clusters(args)
+        event_tailer_mock.assert_not_called()
+        terminate_cluster_nodes_mock.assert_called_once_with("parallelcluster-deleted")
+    else:
+        with pytest.raises(SystemExit) as sysexit:
+            delete_clusters(args)
+        assert_that(sysexit.value.code).is_equal_to(1)
+        assert_that(event_tailer_mock.call_args_list).contains(mocker.call("id-1"), mocker.call("id-2"))
+        assert_that(sorted(call[0][0] for call in terminate_cluster_nodes_mock.call_args_list)).is_equal_to(
+            ["parallelcluster-deleted", "parallelcluster-test-1", "parallelcluster-test-2"]
+        )
+        assert_that(caplog.messages).contains(
+            "test-1   DELETE_COMPLETE",
+            "test-2   DELETE_FAILED",
+            "1 of 3 clusters did not delete successfully. Run 'pcluster delete' again for: test-2",
+        )
+    cfn_mock.delete_stack.assert_has_calls(
+        [mocker.call(StackName="id-1"), mocker.call(StackName="id-2")], any_order=True
+    )
+    assert_that(caplog.text).contains("Cluster deleted has already been deleted.")
+
+
+@pytest.mark.parametrize("stack_exists", [True, False])
+def test_delete_nowait_terminates_like_delete_clusters(mocker, stack_exists):
+    """Verify that with nowait a single cluster and multiple clusters terminate the same compute nodes."""
+    mocker.patch("pcluster.cli_commands.delete.PclusterConfig.init_aws")
+    mocker.patch("pcluster.cli_commands.delete.boto3_clients.get_client")
+    mocker.patch(
+        "pcluster.cli_commands.delete.utils.get_stack",
+        return_value={"StackId": "id", "StackStatus": "DELETE_IN_PROGRESS"},
+    )
+    mocker.patch("pcluster.cli_commands.delete.utils.stack_exists", return_value=stack_exists)
+    mocker.patch("pcluster.cli_commands.delete.utils.warn")
+    if not stack_exists:
+        mocker.patch(
+            "pcluster.cli_commands.delete.utils.get_stack",
+            side_effect=ClientError({"Error": {"Message": "Stack with id test does not exist"}}, "describe"),
+        )
+    terminate_cluster_nodes_mock = mocker.patch("pcluster.cli_commands.delete._terminate_cluster_nodes")
+
+    try:
+        delete(mocker.MagicMock(cluster_name="test", config_file=None, nowait=True, keep_logs=False))
+    except SystemExit as e:
+        assert_that(e.code).is_equal_to(0)
+    single_cluster_calls = terminate_cluster_nodes_mock.call_args_list
+    terminate_cluster_nodes_mock.reset_mock()
+
+    delete_clusters(mocker.MagicMock(cluster_name=["test", "test"], config_file=None, nowait=True, keep_logs=False))
+    assert_that(terminate_cluster_nodes_mock.call_args_list).is_equal_to(single_cluster_calls)
+    assert_that(single_cluster_calls).is_length(0 if stack_exists else 1)
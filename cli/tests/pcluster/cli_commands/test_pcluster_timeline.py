@@ -0,0 +1,120 @@
+"""This module provides unit tests for the functions in the pcluster.timeline module."""
+
+import datetime
+import json
+import logging
+
+from assertpy import assert_that
+
+from pcluster.cli_commands.timeline import get_critical_path, get_resource_intervals, timeline
+
+ROOT_STACK_ID = "arn:aws:cloudformation:us-east-1:111111111111:stack/parallelcluster-cluster/1"
+EBS_STACK_ID = "arn:aws:cloudformation:us-east-1:111111111111:stack/parallelcluster-cluster-EBSCfnStack/2"
+START_TIME = datetime.datetime(2020, 10, 1, 12, 0, 0)
+
+
+def _event(seconds, logical_id, status, resource_type="AWS::EC2::Instance", stack_id=ROOT_STACK_ID, physical_id=None):
+    return {
+        "StackId": stack_id,
+        "LogicalResourceId": logical_id,
+        "PhysicalResourceId": physical_id or "",
+        "ResourceType": resource_type,
+        "ResourceStatus": status,
+        "Timestamp": START_TIME + datetime.timedelta(seconds=seconds),
+    }
+
+
+STACK_EVENTS = [
+    _event(0, "parallelcluster-cluster", "CREATE_IN_PROGRESS", "AWS::CloudFormation::Stack", physical_id=ROOT_STACK_ID),
+    _event(5, "RootRole", "CREATE_IN_PROGRESS", "AWS::IAM::Role"),
+    _event(6, "EBSCfnStack", "CREATE_IN_PROGRESS", "AWS::CloudFormation::Stack"),
+    _event(7, "EBSCfnStack", "CREATE_IN_PROGRESS", "AWS::CloudFormation::Stack", physical_id=EBS_STACK_ID),
+    _event(8, "EBS0", "CREATE_IN_PROGRESS", "AWS::EC2::Volume", stack_id=EBS_STACK_ID),
+    _event(9, "EBS0", "CREATE_IN_PROGRESS", "AWS::EC2::Volume", stack_id=EBS_STACK_ID, physical_id="vol-1"),
+    _event(20, "EBS0", "CREATE_COMPLETE", "AWS::EC2::Volume", stack_id=EBS_STACK_ID, physical_id="vol-1"),
+    _event(25, "EBSCfnStack", "CREATE_COMPLETE", "AWS::CloudFormation::Stack", physical_id=EBS_STACK_ID),
+    _event(30, "RootRole", "CREATE_COMPLETE", "AWS::IAM::Role"),
+    _event(35, "MasterServer", "CREATE_IN_PROGRESS"),
+    _event(40, "DashboardCfnStack", "CREATE_IN_PROGRESS", "AWS::CloudFormation::Stack"),
+    _event(100, "MasterServer", "CREATE_COMPLETE"),
+]
+
+
+def test_get_resource_intervals():
+    intervals = get_resource_intervals(STACK_EVENTS)
+    assert_that([interval.name for interval in intervals]).is_equal_to(
+        ["RootRole", "EBSCfnStack", "EBSCfnStack/EBS0", "MasterServer", "DashboardCfnStack"]
+    )
+    assert_that([interval.duration for interval in intervals]).is_equal_to([25, 19, 12, 65, 60])
+    # resources still in progress end at the last event
+    assert_that(intervals[-1].status).is_equal_to("CREATE_IN_PROGRESS")
+
+    critical_path = get_critical_path(intervals)
+    assert_that([interval.name for interval in critical_path]).is_equal_to(["RootRole", "MasterServer"])
+    assert_that([interval.name for interval in intervals if interval.critical]).is_equal_to(
+        ["RootRole", "MasterServer"]
+    )
+
+
+def test_get_resource_intervals_after_update():
+    events = STACK_EVENTS + [
+        _event(200, "MasterServer", "UPDATE_IN_PROGRESS"),
+        _event(210, "MasterServer", "UPDATE_COMPLETE"),
+        _event(220, "ComputeFleet", "CREATE_IN_PROGRESS", "AWS::AutoScaling::AutoScalingGroup"),
+        _event(250, "ComputeFleet", "CREATE_FAILED", "AWS::AutoScaling::AutoScalingGroup"),
+    ]
+    intervals = get_resource_intervals(events)
+    master_server = next(interval for interval in intervals if interval.name == "MasterServer")
+    assert_that(master_server.duration).is_equal_to(65)
+    assert_that(intervals[-1].status).is_equal_to("CREATE_FAILED")
+    assert_that([interval.name for interval in get_critical_path(intervals)]).is_equal_to(
+        ["RootRole", "MasterServer", "ComputeFleet"]
+    )
+
+
+def test_get_critical_path_while_creating():
+    # resources whose creation just started end at the last event, with zero-length intervals
+    events = STACK_EVENTS + [
+        _event(110, "ComputeFleet", "CREATE_IN_PROGRESS", "AWS::AutoScaling::AutoScalingGroup"),
+        _event(110, "PlacementGroup", "CREATE_IN_PROGRESS", "AWS::EC2::PlacementGroup"),
+    ]
+    intervals = get_resource_intervals(events)
+    assert_that([interval.duration for interval in intervals[-2:]]).is_equal_to([0, 0])
+    assert_that([interval.name for interval in get_critical_path(intervals)]).is_equal_to(
+        ["RootRole", "MasterServer", "ComputeFleet"]
+    )
+
+    # a stack whose only resource is still in progress
+    intervals = get_resource_intervals(STACK_EVENTS[:2])
+    assert_that([interval.name for interval in get_critical_path(intervals)]).is_equal_to(["RootRole"])
+
+
+def _run_timeline(mocker, json_output):
+    mocker.patch("pcluster.cli_commands.timeline.PclusterConfig.init_aws")
+    get_stack_mock = mocker.patch("pcluster.cli_commands.timeline.utils.get_stack", return_value={"StackId": "id"})
+    event_tailer_mock = mocker.patch("pcluster.cli_commands.timeline.utils.StackEventTailer")
+    event_tailer_mock.return_value.poll.return_value = STACK_EVENTS
+    timeline(mocker.MagicMock(cluster_name="cluster", config_file=None, json=json_output))
+    get_stack_mock.assert_called_with("parallelcluster-cluster")
+    event_tailer_mock.assert_called_with("id")
+
+
+def test_timeline(mocker, caplog):
+    caplog.set_level(logging.INFO, logger="pcluster")
+    _run_timeline(mocker, json_output=False)
+    assert_that(caplog.text).contains("Creation timeline of the cluster cluster: 0:01:35")
+    master_server_line = next(message for message in caplog.messages if message.startswith("MasterServer "))
+    assert_that(master_server_line.split()).contains("AWS::EC2::Instance", "0:00:30", "0:01:05", "CREATE_COMPLETE")
+    assert_that(master_server_line).contains("#" * 34)
+    assert_that(caplog.text).contains("0:01:30 spent creating the resources of the critical path")
+
+
+def test_timeline_json(mocker, caplog):
+    caplog.set_level(logging.INFO, logger="pcluster")
+    _run_timeline(mocker, json_output=True)
+    timeline_json = json.loads(caplog.records[-1].getMessage())
+    assert_that(timeline_json).contains_entry({"cluster": "cluster"}, {"duration": 95})
+    assert_that(timeline_json.get("critical_path")).is_equal_to(["RootRole", "MasterServer"])
+    assert_that(timeline_json.get("resources")[2]).contains_entry(
+        {"name": "EBSCfnStack/EBS0"}, {"stack": "EBSCfnStack"}, {"start_offset": 3}, {"critical": False}
+    )
@@ -0,0 +1,269 @@
+"""This module provides unit tests for the functions in the pcluster.watch module."""
+
+from io import StringIO
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus
+from pcluster.cli_commands.watch import (
+    MAX_REFRESH_INTERVAL,
+    MIN_REFRESH_INTERVAL,
+    ClusterState,
+    ClusterWatcher,
+    StatusDashboard,
+)
+from pcluster.utils import LISTED_STACK_STATUSES
+from tests.common import MockedBoto3Request
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.boto3_clients.boto3"
+
+
+@pytest.mark.parametrize(
+    "stack_status, interval, changed, expected_interval",
+    [
+        ("CREATE_COMPLETE", MIN_REFRESH_INTERVAL, False, MIN_REFRESH_INTERVAL * 2),
+        ("CREATE_COMPLETE", MAX_REFRESH_INTERVAL, False, MAX_REFRESH_INTERVAL),
+        ("CREATE_COMPLETE", MAX_REFRESH_INTERVAL, True, MIN_REFRESH_INTERVAL),
+        ("UPDATE_IN_PROGRESS", MAX_REFRESH_INTERVAL, False, MIN_REFRESH_INTERVAL),
+    ],
+)
+def test_cluster_state_schedule_refresh(stack_status, interval, changed, expected_interval):
+    cluster = ClusterState("cluster")
+    cluster.stack_status = stack_status
+    cluster.interval = interval
+    cluster.schedule_refresh(100, changed)
+    assert_that(cluster.interval).is_equal_to(expected_interval)
+    assert_that(cluster.next_refresh).is_equal_to(100 + expected_interval)
+
+
+def _stack(cluster_name, stack_status="CREATE_COMPLETE", is_hit=True):
+    return {
+        "StackName": "parallelcluster-" + cluster_name,
+        "StackStatus": stack_status,
+        "CreationTime": 0,
+        "Outputs": [{"OutputKey": "IsHITCluster", "OutputValue": "true" if is_hit else "false"}],
+    }
+
+
+def _stack_summary(cluster_name, parent_id=None):
+    stack_summary = {
+        "StackName": "parallelcluster-" + cluster_name,
+        "StackStatus": "CREATE_COMPLETE",
+        "CreationTime": 0,
+    }
+    if parent_id:
+        stack_summary["ParentId"] = parent_id
+    return stack_summary
+
+
+def _master_instance(cluster_name, state):
+    return {
+        "InstanceId": "i-{0}".format(cluster_name),
+        "State": {"Name": state},
+        "Tags": [{"Key": "Application", "Value": "parallelcluster-" + cluster_name}],
+    }
+
+
+def _describe_stacks_request(cluster_name, stack=None):
+    return MockedBoto3Request(
+        method="describe_stacks",
+        response=(
+            {"Stacks": [stack]} if stack else "Stack with id parallelcluster-{0} does not exist".format(cluster_name)
+        ),
+        expected_params={"StackName": "parallelcluster-" + cluster_name},
+        generate_error=stack is None,
+    )
+
+
+def _describe_instances_request(stack_names, instances):
+    return MockedBoto3Request(
+        method="describe_instances",
+        response={"Reservations": [{"Instances": instances}]},
+        expected_params={
+            "Filters": [
+                {"Name": "tag:Application", "Values": stack_names},
+                {"Name": "tag:aws-parallelcluster-node-type", "Values": ["Master"]},
+                {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
+            ]
+        },
+    )
+
+
+def test_cluster_watcher(mocker, boto3_stubber, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    # Refresh the clusters sequentially, since the stubber expects calls in order
+    mocker.patch("pcluster.cli_commands.watch.WATCH_MAX_WORKERS", 1)
+    fleet_status_manager_mock = mocker.patch("pcluster.cli_commands.watch.ComputeFleetStatusManager")
+    fleet_status_manager_mock.return_value.get_status.return_value = ComputeFleetStatus.RUNNING
+
+    boto3_stubber(
+        "cloudformation",
+        [
+            MockedBoto3Request(
+                method="list_stacks",
+                response={
+                    "StackSummaries": [
+                        _stack_summary("prod-1"),
+                        _stack_summary("prod-1-EBS", parent_id="parallelcluster-prod-1"),
+                        _stack_summary("prod-2"),
+                        _stack_summary("test-1"),
+                    ]
+                },
+                expected_params={"StackStatusFilter": LISTED_STACK_STATUSES},
+            ),
+            _describe_stacks_request("prod-1", _stack("prod-1")),
+            _describe_stacks_request("prod-2", _stack("prod-2", "UPDATE_IN_PROGRESS", is_hit=False)),
+            _describe_stacks_request("deleted"),
+            # only the clusters in transition are refreshed after MIN_REFRESH_INTERVAL
+            _describe_stacks_request("prod-2", _stack("prod-2", "UPDATE_COMPLETE", is_hit=False)),
+        ],
+    )
+    boto3_stubber(
+        "ec2",
+        [
+            _describe_instances_request(
+                ["parallelcluster-prod-1", "parallelcluster-prod-2", "parallelcluster-deleted"],
+                [_master_instance("prod-1", "running"), _master_instance("prod-2", "running")],
+            ),
+            _describe_instances_request(["parallelcluster-prod-2"], [_master_instance("prod-2", "running")]),
+        ],
+    )
+
+    watcher = ClusterWatcher(["prod-*", "deleted"])
+    assert_that(watcher.refresh(now=0)).is_equal_to({"prod-1", "prod-2", "deleted"})
+    assert_that([cluster.get_row() for cluster in watcher.clusters]).is_equal_to(
+        [
+            ["prod-1", "CREATE_COMPLETE", "running", "RUNNING", ""],
+            ["prod-2", "UPDATE_IN_PROGRESS", "running", "-", ""],
+            ["deleted", "DELETE_COMPLETE", "-", "-", ""],
+        ]
+    )
+    assert_that(watcher.get_next_refresh()).is_equal_to(MIN_REFRESH_INTERVAL)
+
+    assert_that(watcher.refresh(now=MIN_REFRESH_INTERVAL)).is_equal_to({"prod-2"})
+    assert_that(watcher.clusters[1].stack_status).is_equal_to("UPDATE_COMPLETE")
+    fleet_status_manager_mock.assert_called_once_with("prod-1")
+
+
+def test_cluster_watcher_errors(mocker, boto3_stubber, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    mocker.patch("pcluster.cli_commands.watch.WATCH_MAX_WORKERS", 1)
+    mocker.patch("pcluster.cli_commands.watch.utils.expand_cluster_patterns", return_value=["prod-1", "prod-2"])
+    fleet_status_manager_mock = mocker.patch("pcluster.cli_commands.watch.ComputeFleetStatusManager")
+    fleet_status_manager_mock.return_value.get_status.side_effect = [
+        ComputeFleetStatus.RUNNING,
+        Exception("COMPUTE_FLEET status not found in db table"),
+        ComputeFleetStatus.STOPPED,
+    ]
+    boto3_stubber(
+        "cloudformation",
+        [
+            _describe_stacks_request("prod-1", _stack("prod-1")),
+            MockedBoto3Request(
+                method="describe_stacks",
+                response="Rate exceeded",
+                expected_params={"StackName": "parallelcluster-prod-2"},
+                generate_error=True,
+                error_code="Throttling",
+            ),
+            _describe_stacks_request("prod-2", _stack("prod-2", is_hit=False)),
+            _describe_stacks_request("prod-1", _stack("prod-1")),
+            _describe_stacks_request("prod-2", _stack("prod-2", is_hit=False)),
+            _describe_stacks_request("prod-1", _stack("prod-1")),
+            _describe_stacks_request("prod-2", _stack("prod-2", is_hit=False)),
+        ],
+    )
+    stack_names = ["parallelcluster-prod-1", "parallelcluster-prod-2"]
+    master_instances = [_master_instance("prod-1", "running"), _master_instance("prod-2", "running")]
+    boto3_stubber(
+        "ec2",
+        [
+            _describe_instances_request(stack_names, master_instances),
+            MockedBoto3Request(
+                method="describe_instances",
+                response="Service unavailable",
+                expected_params=_describe_instances_request(["parallelcluster-prod-2"], []).expected_params,
+                generate_error=True,
+                error_code="ServiceUnavailable",
+            ),
+            _describe_instances_request(stack_names, master_instances),
+            _describe_instances_request(stack_names, [_master_instance("prod-1", "stopped")] + master_instances[1:]),
+        ],
+    )
+    watcher = ClusterWatcher(["prod-*"])
+
+    # the error of a cluster doesn't stop the refresh of the others, and is shown in its row
+    assert_that(watcher.refresh(now=0)).is_equal_to({"prod-1", "prod-2"})
+    assert_that([cluster.get_row() for cluster in watcher.clusters]).is_equal_to(
+        [
+            ["prod-1", "CREATE_COMPLETE", "running", "RUNNING", ""],
+            ["prod-2", "-", "running", "-", "Rate exceeded"],
+        ]
+    )
+    # clusters whose refresh failed are refreshed again as soon as possible
+    assert_that(watcher.clusters[1].next_refresh).is_equal_to(MIN_REFRESH_INTERVAL)
+
+    # the rows keep the values of the last successful refresh
+    assert_that(watcher.refresh(now=MIN_REFRESH_INTERVAL)).is_equal_to({"prod-2"})
+    assert_that(watcher.clusters[1].get_row()).is_equal_to(
+        ["prod-2", "CREATE_COMPLETE", "running", "-", "Service unavailable"]
+    )
+    assert_that(watcher.refresh(now=MIN_REFRESH_INTERVAL * 2)).is_equal_to({"prod-1", "prod-2"})
+    assert_that([cluster.get_row() for cluster in watcher.clusters]).is_equal_to(
+        [
+            ["prod-1", "CREATE_COMPLETE", "running", "RUNNING", "COMPUTE_FLEET status not found in db table"],
+            ["prod-2", "CREATE_COMPLETE", "running", "-", ""],
+        ]
+    )
+
+    # errors are cleared by the next successful refresh, the cluster changed at the last refresh is refreshed as well
+    assert_that(watcher.refresh(now=MIN_REFRESH_INTERVAL * 3)).is_equal_to({"prod-1"})
+    assert_that(watcher.clusters[0].get_row()).is_equal_to(["prod-1", "CREATE_COMPLETE", "stopped", "STOPPED", ""])
+    fleet_status_manager_mock.return_value.get_status.assert_called_with(raise_on_error=True)
+
+
+def test_status_dashboard(mocker):
+    output = StringIO()
+    mocker.patch.object(output, "isatty", return_value=True)
+    dashboard = StatusDashboard(output)
+
+    dashboard.update([["cluster-1", "CREATE_COMPLETE", "running", "-", ""]], {"cluster-1"})
+    dashboard.update(
+        [["cluster-1", "CREATE_COMPLETE", "stopped", "-", ""], ["cluster-2", "CREATE_COMPLETE", "running", "-", ""]],
+        {"cluster-1", "cluster-2"},
+    )
+    lines = output.getvalue().split("\n")
+    # the header and the first row, then the changed row is rewritten in place and the new one is appended
+    assert_that(lines).is_length(5)
+    assert_that(lines[0]).contains("Cluster", "MasterServer")
+    assert_that(lines[2]).starts_with("\033[1A\r\033[K").contains("cluster-1", "stopped")
+    assert_that(lines[3]).contains("cluster-2")
+
+    # a wider value moves the cursor back to the header to redraw the table
+    output.truncate(0)
+    output.seek(0)
+    dashboard.update(
+        [
+            ["cluster-1", "UPDATE_ROLLBACK_COMPLETE", "stopped", "-", ""],
+            ["cluster-2", "CREATE_COMPLETE", "running", "-", ""],
+        ],
+        {"cluster-1"},
+    )
+    assert_that(output.getvalue()).starts_with("\033[3A").contains("UPDATE_ROLLBACK_COMPLETE")
+
+
+def test_status_dashboard_not_interactive(mocker):
+    output = StringIO()
+    mocker.patch.object(output, "isatty", return_value=False)
+    dashboard = StatusDashboard(output)
+
+    dashboard.update(
+        [["cluster-1", "CREATE_COMPLETE", "running", "-", ""], ["cluster-2", "-", "-", "-", "-"]], {"cluster-2"}
+    )
+    # only the changed rows are printed, without header and terminal control sequences
+    assert_that(output.getvalue().splitlines()).is_length(1)
+    assert_that(output.getvalue().split()).is_equal_to(["cluster-2", "-", "-", "-", "-"])
@@ -13,6 +13,8 @@ import pytest
 from assertpy import assert_that
 
 from pcluster.cluster_model import ClusterModel, infer_cluster_model
+from pcluster.models.hit.hit_cluster_model import HITClusterModel
+from tests.common import MockedBoto3Request
 
 
 @pytest.mark.parametrize(
@@ -67,3 +69,79 @@ def test_cluster_model(config_parser_cluster_dict, cfn_stack, expected_cluster_m
 
     cluster_model = infer_cluster_model(config_parser, "default", cfn_stack)
     assert_that(cluster_model).is_equal_to(expected_cluster_model)
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.boto3_clients.boto3"
+
+
+def _mock_section(mocker, params):
+    section = mocker.MagicMock()
+    section.get_param_value.side_effect = params.get
+    return section
+
+
+@pytest.mark.parametrize("capacity_error", [False, True])
+def test_hit_test_configuration(mocker, boto3_stubber, monkeypatch, capacity_error):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    mocker.patch(
+        "pcluster.models.hit.hit_cluster_model.get_instance_type",
+        return_value={"InstanceType": "c5.xlarge", "VCpuInfo": {"DefaultVCpus": 4}},
+    )
+    mocker.patch("pcluster.models.hit.hit_cluster_model.get_default_threads_per_core", return_value=2)
+    mocker.patch.object(HITClusterModel, "_get_latest_alinux_ami_id", return_value="ami-12345678")
+    sections = {
+        "cluster": _mock_section(mocker, {"scheduler": "slurm", "master_instance_type": "c5.xlarge"}),
+        "vpc": _mock_section(mocker, {"master_subnet_id": "subnet-12345678"}),
+        "cr1": _mock_section(mocker, {"instance_type": "c5.xlarge", "vcpus": 4}),
+        "cr2": _mock_section(mocker, {"instance_type": "c5.2xlarge", "vcpus": 8}),
+        "cr3": _mock_section(mocker, {"instance_type": "c5.xlarge", "vcpus": 4}),
+    }
+    pcluster_config = mocker.MagicMock()
+    pcluster_config.get_section.side_effect = lambda key, label=None: sections.get(label or key)
+    pcluster_config.get_sections.return_value = {
+        "queue1": _mock_section(mocker, {"compute_resource_settings": "cr1, cr2"}),
+        "queue2": _mock_section(mocker, {"compute_resource_settings": "cr3"}),
+    }
+
+    def _run_instances_request(instance_type, error_code="DryRunOperation", placement=True):
+        expected_params = {
+            "InstanceType": instance_type,
+            "MinCount": 1,
+            "MaxCount": 1,
+            "ImageId": "ami-12345678",
+            "SubnetId": "subnet-12345678",
+            "SecurityGroupIds": [],
+            "CpuOptions": {},
+            "DryRun": True,
+        }
+        if placement:
+            expected_params["Placement"] = {}
+        return MockedBoto3Request(
+            method="run_instances",
+            response="Request would have succeeded" if error_code == "DryRunOperation" else "No capacity",
+            expected_params=expected_params,
+            generate_error=True,
+            error_code=error_code,
+        )
+
+    # every compute resource is tested, but the identical requests of cr1 and cr3 are sent once
+    boto3_stubber(
+        "ec2",
+        [
+            _run_instances_request("c5.xlarge", placement=False),
+            _run_instances_request("c5.xlarge"),
+            _run_instances_request(
+                "c5.2xlarge", error_code="InsufficientInstanceCapacity" if capacity_error else "DryRunOperation"
+            ),
+        ],
+    )
+
+    HITClusterModel().test_configuration(pcluster_config)
+    if capacity_error:
+        pcluster_config.error.assert_called_once_with(
+            "There is not enough capacity to fulfill your request.\nNo capacity"
+        )
+    else:
+        pcluster_config.error.assert_not_called()
@@ -21,7 +21,7 @@ from tests.pcluster.config.utils import init_pcluster_config_from_configparser
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.utils.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.mark.parametrize(
@@ -90,7 +90,7 @@ DESCRIBE_INSTANCE_TYPES_RESPONSES = {
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.utils.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.mark.parametrize(
@@ -216,15 +216,24 @@ def _prepare_json_config(queues, test_datadir):
 def _mock_boto3(boto3_stubber, expected_json_params):
     """Mock the boto3 client based on the expected json configuration."""
     expected_json_queue_settings = expected_json_params["cluster"].get("queue_settings", {})
-    mocked_requests = []
+    instance_types = set()
     for _, queue in expected_json_queue_settings.items():
         for _, compute_resource in queue.get("compute_resource_settings", {}).items():
-            instance_type = compute_resource["instance_type"]
-            mocked_requests.append(
-                MockedBoto3Request(
-                    method="describe_instance_types",
-                    response=DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type],
-                    expected_params={"InstanceTypes": [instance_type]},
-                )
+            instance_types.add(compute_resource["instance_type"])
+
+    # Info of all the instance types are retrieved with a single call
+    mocked_requests = []
+    if instance_types:
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="describe_instance_types",
+                response={
+                    "InstanceTypes": [
+                        DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type]["InstanceTypes"][0]
+                        for instance_type in sorted(instance_types)
+                    ]
+                },
+                expected_params={"InstanceTypes": sorted(instance_types)},
             )
+        )
     boto3_stubber("ec2", mocked_requests)
@@ -8,9 +8,12 @@
 # or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
+from io import BytesIO
+
 import configparser
 import pytest
 from assertpy import assert_that
+from botocore.response import StreamingBody
 from pytest import fail
 
 from tests.common import MockedBoto3Request
@@ -19,7 +22,7 @@ from tests.pcluster.config.utils import get_mocked_pcluster_config, init_pcluste
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.cluster_model.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.mark.parametrize(
@@ -103,6 +106,74 @@ def test_load_json_config(mocker, cfn_params_dict, version, expected_json):
     assert_that(pcluster_config._PclusterConfig__load_json_config(cfn_stack)).is_equal_to(expected_json)
 
 
+def _get_config_object_request(version_id=None, etag=None, content=None):
+    expected_params = {"Bucket": "bucket", "Key": "configs/cluster-config.json"}
+    if version_id:
+        expected_params["VersionId"] = version_id
+    if etag:
+        expected_params["IfNoneMatch"] = etag
+    return MockedBoto3Request(
+        method="get_object",
+        response=(
+            {
+                "Body": StreamingBody(BytesIO(content.encode()), len(content)),
+                "VersionId": version_id or "latest",
+                "ETag": '"{0}"'.format(version_id or "latest"),
+            }
+            if content
+            else "Not Modified"
+        ),
+        expected_params=expected_params,
+        generate_error=content is None,
+        error_code=None if content else "304",
+    )
+
+
+@pytest.mark.parametrize(
+    "config_versions, mocked_requests, expected_configs",
+    [
+        (
+            # the latest configuration, downloaded while reading DynamoDB, is the wanted version and is then cached
+            ["latest", "latest"],
+            [_get_config_object_request(content='{"key": "latest"}')],
+            [{"key": "latest"}, {"key": "latest"}],
+        ),
+        (
+            # a version different from the latest one is downloaded, then the cached copy is used
+            ["v1", "v1", "v2"],
+            [
+                _get_config_object_request(content='{"key": "latest"}'),
+                _get_config_object_request("v1", content='{"key": "v1"}'),
+                _get_config_object_request("v2", content='{"key": "v2"}'),
+            ],
+            [{"key": "v1"}, {"key": "v1"}, {"key": "v2"}],
+        ),
+        (
+            # without the version in DynamoDB the cached copy is revalidated with its ETag
+            [None, None, None],
+            [
+                _get_config_object_request(content='{"key": "latest"}'),
+                _get_config_object_request(etag='"latest"'),
+                _get_config_object_request(etag='"latest"', content='{"key": "changed"}'),
+            ],
+            [{"key": "latest"}, {"key": "latest"}, {"key": "changed"}],
+        ),
+    ],
+)
+def test_retrieve_cluster_config(mocker, boto3_stubber, config_versions, mocked_requests, expected_configs):
+    pcluster_config = get_mocked_pcluster_config(mocker)
+    pcluster_config.cluster_name = "cluster"
+    pcluster_config.cfn_stack = {"StackId": "stack-id", "LastUpdatedTime": "2020-10-01T12:00:00Z"}
+    table = mocker.patch("pcluster.config.pcluster_config.boto3_clients.get_resource").return_value.Table.return_value
+    table.get_item.side_effect = [{"Item": {"Version": version}} for version in config_versions]
+    boto3_stubber("s3", mocked_requests)
+
+    for expected_config in expected_configs:
+        json_config = pcluster_config._PclusterConfig__retrieve_cluster_config("bucket")
+        assert_that(json_config).is_equal_to(expected_config)
+    table.get_item.assert_called_with(ConsistentRead=True, Key={"Id": "CLUSTER_CONFIG"})
+
+
 @pytest.mark.parametrize(
     "config_parser_dict, expected_message",
     [
@@ -0,0 +1,140 @@
+"""This module provides unit tests for the pcluster.config.resource_snapshot module."""
+
+import pytest
+from assertpy import assert_that
+from botocore.exceptions import ClientError
+
+from pcluster.config.resource_snapshot import IMAGE, SECURITY_GROUP, SUBNET, ResourceSnapshot
+from tests.common import MockedBoto3Request
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.boto3_clients.boto3"
+
+
+def _mock_pcluster_config(mocker, sections_params):
+    """Return a mocked PclusterConfig with a single section for each key of the given dict."""
+
+    def _get_sections(section_key):
+        params = sections_params.get(section_key)
+        if params is None:
+            return {}
+        section = mocker.MagicMock()
+        section.get_param_value.side_effect = params.get
+        return {"default": section}
+
+    pcluster_config = mocker.MagicMock()
+    pcluster_config.get_sections.side_effect = _get_sections
+    return pcluster_config
+
+
+def test_prefetch(mocker, boto3_stubber, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    pcluster_config = _mock_pcluster_config(
+        mocker,
+        {
+            "vpc": {
+                "master_subnet_id": "subnet-00000002",
+                "compute_subnet_id": "subnet-00000001",
+                "vpc_security_group_id": "sg-1",
+                "additional_sg": "sg-1",
+            },
+            "cluster": {"custom_ami": "ami-1"},
+            "efs": {"efs_fs_id": "fs-12345678"},
+        },
+    )
+    boto3_stubber(
+        "efs",
+        MockedBoto3Request(
+            method="describe_mount_targets",
+            response={
+                "MountTargets": [
+                    {
+                        "MountTargetId": "fsmt-12345678",
+                        "FileSystemId": "fs-12345678",
+                        "SubnetId": "subnet-00000003",
+                        "LifeCycleState": "ok",
+                    }
+                ]
+            },
+            expected_params={"FileSystemId": "fs-12345678"},
+        ),
+    )
+    boto3_stubber(
+        "ec2",
+        [
+            MockedBoto3Request(
+                method="describe_subnets",
+                response={
+                    "Subnets": [
+                        {"SubnetId": subnet_id, "AvailabilityZone": "us-east-1a"}
+                        for subnet_id in ["subnet-00000001", "subnet-00000002", "subnet-00000003"]
+                    ]
+                },
+                expected_params={"SubnetIds": ["subnet-00000001", "subnet-00000002", "subnet-00000003"]},
+            ),
+            MockedBoto3Request(
+                method="describe_security_groups",
+                response={"SecurityGroups": [{"GroupId": "sg-1", "IpPermissions": []}]},
+                expected_params={"GroupIds": ["sg-1"]},
+            ),
+            MockedBoto3Request(
+                method="describe_images", response={"Images": []}, expected_params={"ImageIds": ["ami-1"]}
+            ),
+        ],
+    )
+
+    resource_snapshot = ResourceSnapshot()
+    resource_snapshot.prefetch(pcluster_config)
+
+    # resources are read from the snapshot without calling the service again
+    assert_that(resource_snapshot.get(SUBNET, "subnet-00000003")).is_equal_to(
+        {"SubnetId": "subnet-00000003", "AvailabilityZone": "us-east-1a"}
+    )
+    assert_that(resource_snapshot.get_many(SUBNET, ["subnet-00000002", "subnet-00000001"])).extracting(
+        "SubnetId"
+    ).is_equal_to(["subnet-00000002", "subnet-00000001"])
+    assert_that(resource_snapshot.get(SECURITY_GROUP, "sg-1")).contains_entry({"GroupId": "sg-1"})
+    assert_that(resource_snapshot.get(IMAGE, "ami-1")).is_none()
+    assert_that(resource_snapshot.get_efs_mount_targets("fs-12345678")).is_length(1)
+
+
+def test_failed_prefetch_describes_each_resource(mocker, boto3_stubber, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    pcluster_config = _mock_pcluster_config(
+        mocker, {"vpc": {"vpc_security_group_id": "sg-1", "additional_sg": "sg-wrong"}}
+    )
+    boto3_stubber(
+        "ec2",
+        [
+            MockedBoto3Request(
+                method="describe_security_groups",
+                response="The security group 'sg-wrong' does not exist",
+                expected_params={"GroupIds": ["sg-1", "sg-wrong"]},
+                generate_error=True,
+                error_code="InvalidGroup.NotFound",
+            ),
+            MockedBoto3Request(
+                method="describe_security_groups",
+                response={"SecurityGroups": [{"GroupId": "sg-1"}]},
+                expected_params={"GroupIds": ["sg-1"]},
+            ),
+            MockedBoto3Request(
+                method="describe_security_groups",
+                response="The security group 'sg-wrong' does not exist",
+                expected_params={"GroupIds": ["sg-wrong"]},
+                generate_error=True,
+                error_code="InvalidGroup.NotFound",
+            ),
+        ],
+    )
+
+    resource_snapshot = ResourceSnapshot()
+    resource_snapshot.prefetch(pcluster_config)
+
+    assert_that(resource_snapshot.get(SECURITY_GROUP, "sg-1")).is_equal_to({"GroupId": "sg-1"})
+    # errors are kept as well, so that the resource is described only once
+    for _ in range(2):
+        with pytest.raises(ClientError, match="sg-wrong"):
+            resource_snapshot.get(SECURITY_GROUP, "sg-wrong")
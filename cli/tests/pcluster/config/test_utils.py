@@ -17,7 +17,7 @@ from tests.common import MockedBoto3Request
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.utils.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.mark.parametrize("valid_instance_type, expected_vcpus", [(True, 96), (False, -1)])
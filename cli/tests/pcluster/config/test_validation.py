@@ -0,0 +1,86 @@
+"""This module provides unit tests for the pcluster.config.validation module."""
+
+import threading
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.config.validation import (
+    DEFAULT_VALIDATION_WORKERS,
+    VALIDATION_WORKERS_ENV,
+    ValidationTask,
+    get_validation_workers,
+    run_validation_tasks,
+)
+
+
+def _build_tasks(check_funcs, reports):
+    return [
+        ValidationTask(lambda result, index=index: reports.append((index, result)), check_func)
+        for index, check_func in enumerate(check_funcs)
+    ]
+
+
+def test_concurrent_checks_are_reported_in_order():
+    last_check_started = threading.Event()
+
+    def _first_check():
+        # Only completes if the last check runs concurrently
+        assert_that(last_check_started.wait(timeout=10)).is_true()
+        return "first"
+
+    def _last_check():
+        last_check_started.set()
+        return "last"
+
+    reports = []
+    tasks = _build_tasks([_first_check, None, lambda: "middle", _last_check], reports)
+    run_validation_tasks(tasks, max_workers=4)
+    assert_that(reports).is_equal_to([(0, "first"), (1, None), (2, "middle"), (3, "last")])
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_check_exceptions_are_raised_in_order(max_workers):
+    def _failing_check():
+        raise SystemExit("check failed")
+
+    def _report_error(result):
+        raise SystemExit("report failed")
+
+    reports = []
+    tasks = _build_tasks([lambda: "ok", _failing_check], reports)
+    tasks.insert(1, ValidationTask(_report_error, lambda: "error"))
+    with pytest.raises(SystemExit, match="report failed"):
+        run_validation_tasks(tasks, max_workers=max_workers)
+    assert_that(reports).is_equal_to([(0, "ok")])
+
+    reports = []
+    with pytest.raises(SystemExit, match="check failed"):
+        run_validation_tasks(_build_tasks([lambda: "ok", _failing_check, lambda: "not reported"], reports), max_workers)
+    assert_that(reports).is_equal_to([(0, "ok")])
+
+
+def test_sequential_checks_stop_at_first_failure():
+    checks = []
+
+    def _report_error(result):
+        raise SystemExit(result)
+
+    tasks = [
+        ValidationTask(_report_error, lambda: checks.append("first") or "error"),
+        ValidationTask(lambda result: None, lambda: checks.append("second")),
+    ]
+    with pytest.raises(SystemExit, match="error"):
+        run_validation_tasks(tasks, max_workers=1)
+    assert_that(checks).is_equal_to(["first"])
+
+
+@pytest.mark.parametrize(
+    "env_value, expected_workers", [(None, DEFAULT_VALIDATION_WORKERS), ("4", 4), ("0", 1), ("wrong", 10)]
+)
+def test_get_validation_workers(monkeypatch, env_value, expected_workers):
+    if env_value is None:
+        monkeypatch.delenv(VALIDATION_WORKERS_ENV, raising=False)
+    else:
+        monkeypatch.setenv(VALIDATION_WORKERS_ENV, env_value)
+    assert_that(get_validation_workers()).is_equal_to(expected_workers)
@@ -25,9 +25,11 @@ from pcluster.config.validators import (
     FSX_MESSAGES,
     FSX_SUPPORTED_ARCHITECTURES_OSES,
     LOGFILE_LOGGER,
+    _get_pcluster_user_policy,
     architecture_os_validator,
     compute_resource_validator,
     disable_hyperthreading_architecture_validator,
+    ec2_iam_role_validator,
     fsx_ignored_parameters_validator,
     instances_architecture_compatibility_validator,
     intel_hpc_architecture_validator,
@@ -41,7 +43,7 @@ from tests.pcluster.config.defaults import DefaultDict
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.config.validators.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.mark.parametrize(
@@ -122,6 +124,81 @@ def test_ec2_key_pair_validator(mocker, boto3_stubber):
     utils.assert_param_validator(mocker, config_parser_dict)
 
 
+@pytest.mark.parametrize(
+    "denied_actions, missing_actions, expected_errors",
+    [
+        ([], [], []),
+        (
+            ["dynamodb:DescribeTable", "ec2:AttachVolume"],
+            [],
+            [
+                "IAM role error on user provided role my-role: action ec2:AttachVolume is implicitDeny.",
+                "IAM role error on user provided role my-role: action dynamodb:DescribeTable is implicitDeny.",
+            ],
+        ),
+        # actions missing from the simulation results are not allowed
+        (
+            [],
+            ["ec2:AttachVolume"],
+            ["IAM role error on user provided role my-role: action ec2:AttachVolume is not evaluated."],
+        ),
+    ],
+)
+def test_ec2_iam_role_validator(mocker, boto3_stubber, denied_actions, missing_actions, expected_errors):
+    mocker.patch("pcluster.config.validators.get_partition", return_value="aws")
+    mocker.patch("pcluster.config.validators.get_region", return_value="us-east-1")
+    role_arn = "arn:aws:iam::123456789012:role/my-role"
+    get_role_request = MockedBoto3Request(
+        method="get_role",
+        response={
+            "Role": {
+                "Path": "/",
+                "RoleName": "my-role",
+                "RoleId": "AROAEXAMPLEROLEID12345",
+                "Arn": role_arn,
+                "CreateDate": datetime.datetime(2020, 1, 1),
+            }
+        },
+        expected_params={"RoleName": "my-role"},
+    )
+    get_caller_identity_request = MockedBoto3Request(
+        method="get_caller_identity", response={"Account": "123456789012"}, expected_params={}
+    )
+
+    # actions on the same resource are simulated with a single request
+    actions_by_resource = {}
+    for actions, resource_arn in _get_pcluster_user_policy("aws", "us-east-1", "123456789012"):
+        actions_by_resource.setdefault(resource_arn, []).extend(actions)
+    assert_that(actions_by_resource).is_length(5)
+    simulate_requests = [
+        MockedBoto3Request(
+            method="simulate_principal_policy",
+            response={
+                "EvaluationResults": [
+                    {
+                        "EvalActionName": action,
+                        "EvalResourceName": resource_arn,
+                        "EvalDecision": "implicitDeny" if action in denied_actions else "allowed",
+                    }
+                    for action in actions
+                    if action not in missing_actions
+                ],
+                "IsTruncated": False,
+            },
+            expected_params={"PolicySourceArn": role_arn, "ActionNames": actions, "ResourceArns": [resource_arn]},
+        )
+        for resource_arn, actions in actions_by_resource.items()
+    ]
+    # only a role allowed to perform all the actions is not simulated again when validated twice
+    iam_requests = [get_role_request] + simulate_requests
+    boto3_stubber("sts", [get_caller_identity_request] * 2)
+    boto3_stubber("iam", iam_requests + ([get_role_request] if not expected_errors else iam_requests))
+
+    for _ in range(2):
+        errors, _ = ec2_iam_role_validator("ec2_iam_role", "my-role", None)
+        assert_that([error.split("\n")[0] for error in errors]).is_equal_to(expected_errors)
+
+
 @pytest.mark.parametrize(
     "image_architecture, bad_ami_message, bad_architecture_message",
     [
@@ -243,6 +320,21 @@ def test_ec2_volume_validator(mocker, boto3_stubber):
     utils.assert_param_validator(mocker, config_parser_dict)
 
 
+def test_ec2_volume_validator_missing_volume(mocker, boto3_stubber):
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_volumes", response={"Volumes": []}, expected_params={"VolumeIds": ["vol-12345678"]}
+        )
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    config_parser_dict = {
+        "cluster default": {"ebs_settings": "default"},
+        "ebs default": {"shared_dir": "test", "ebs_volume_id": "vol-12345678"},
+    }
+    utils.assert_param_validator(mocker, config_parser_dict, "Volume vol-12345678 does not exist")
+
+
 @pytest.mark.parametrize(
     "region, base_os, scheduler, expected_message",
     [
@@ -1165,13 +1257,14 @@ def test_fsx_id_validator(mocker, boto3_stubber, fsx_vpc, ip_permissions, networ
             }
         ]
     }
+    # the subnet is described once for both the subnet and the fsx validators
     ec2_mocked_requests = [
         MockedBoto3Request(
             method="describe_subnets",
             response=describe_subnets_response,
             expected_params={"SubnetIds": ["subnet-12345678"]},
         )
-    ] * 2
+    ]
 
     if network_interfaces:
         network_interfaces_in_response = []
@@ -1266,6 +1359,36 @@ def test_fsx_id_validator(mocker, boto3_stubber, fsx_vpc, ip_permissions, networ
     utils.assert_param_validator(mocker, config_parser_dict, expected_message)
 
 
+def test_fsx_id_validator_missing_file_system(mocker, boto3_stubber):
+    boto3_stubber(
+        "fsx",
+        [
+            MockedBoto3Request(
+                method="describe_file_systems",
+                response={"FileSystems": []},
+                expected_params={"FileSystemIds": ["fs-0ff8da96d57f3b4e3"]},
+            )
+        ],
+    )
+    boto3_stubber(
+        "ec2",
+        [
+            MockedBoto3Request(
+                method="describe_subnets",
+                response={"Subnets": [{"SubnetId": "subnet-12345678", "VpcId": "vpc-06e4ab6c6cEXAMPLE"}]},
+                expected_params={"SubnetIds": ["subnet-12345678"]},
+            )
+        ],
+    )
+
+    config_parser_dict = {
+        "cluster default": {"fsx_settings": "default", "vpc_settings": "default"},
+        "vpc default": {"master_subnet_id": "subnet-12345678"},
+        "fsx default": {"fsx_fs_id": "fs-0ff8da96d57f3b4e3"},
+    }
+    utils.assert_param_validator(mocker, config_parser_dict, "FSx file system fs-0ff8da96d57f3b4e3 does not exist")
+
+
 @pytest.mark.parametrize(
     "section_dict, expected_message",
     [
@@ -1462,12 +1585,7 @@ def test_efa_validator_with_vpc_security_group(
             response={"InstanceTypes": [{"InstanceType": "t2.large"}]},
             expected_params={"Filters": [{"Name": "network-info.efa-supported", "Values": ["true"]}]},
         ),
-        MockedBoto3Request(
-            method="describe_security_groups",
-            response=describe_security_groups_response,
-            expected_params={"GroupIds": ["sg-12345678"]},
-        ),  # it is called two times, for vpc_security_group_id validation and to validate efa
-    ]
+    ]  # the security group is described once for vpc_security_group_id validation and to validate efa
 
     boto3_stubber("ec2", mocked_requests)
 
@@ -1567,7 +1685,7 @@ def test_dcv_enabled_validator(
 
     architectures = ["x86_64"] if instance_type.startswith("t2") else ["arm64"]
     extra_patches = {
-        "pcluster.config.validators.get_supported_instance_types": ["t2.nano", "t2.micro", "t2.medium", "m6g.xlarge"],
+        "pcluster.config.validators.get_instance_type_offerings": ["t2.nano", "t2.micro", "t2.medium", "m6g.xlarge"],
         "pcluster.config.validators.get_supported_architectures_for_instance_type": architectures,
         "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type": architectures,
         "pcluster.config.validators.get_supported_os_for_architecture": [base_os],
@@ -2495,9 +2613,9 @@ def test_ebs_volume_size_snapshot_validator(
     }
     mocker.patch("pcluster.config.cfn_param_types.get_ebs_snapshot_info", return_value=describe_snapshots_response)
     if raise_error_when_getting_snapshot_info:
-        mocker.patch("pcluster.config.validators.get_ebs_snapshot_info", side_effect=Exception(expected_error))
+        mocker.patch("pcluster.config.resource_snapshot.ResourceSnapshot.get", side_effect=Exception(expected_error))
     else:
-        mocker.patch("pcluster.config.validators.get_ebs_snapshot_info", return_value=describe_snapshots_response)
+        mocker.patch("pcluster.config.resource_snapshot.ResourceSnapshot.get", return_value=describe_snapshots_response)
     mocker.patch(
         "pcluster.config.validators.get_partition", return_value="aws-cn" if partition == "aws-cn" else "aws-us-gov"
     )
@@ -22,6 +22,7 @@ from pcluster.cluster_model import ClusterModel
 from pcluster.config.cfn_param_types import CfnParam
 from pcluster.config.param_types import StorageData
 from pcluster.config.pcluster_config import PclusterConfig
+from pcluster.config.resource_snapshot import ResourceSnapshot
 from tests.pcluster.config.defaults import CFN_HIT_CONFIG_NUM_OF_PARAMS, CFN_SIT_CONFIG_NUM_OF_PARAMS, DefaultDict
 
 # List of parameters ignored by default when comparing sections
@@ -105,7 +106,7 @@ def get_mock_pcluster_config_patches(scheduler, extra_patches=None):
     master_instances = ["t2.micro", "t2.large", "c4.xlarge"]
     compute_instances = ["t2.micro", "t2.large", "t2", "optimal"] if scheduler == "awsbatch" else master_instances
     patches = {
-        "pcluster.config.validators.get_supported_instance_types": master_instances,
+        "pcluster.config.validators.get_instance_type_offerings": master_instances,
         "pcluster.config.validators.get_supported_compute_instance_types": compute_instances,
         "pcluster.config.validators.get_supported_architectures_for_instance_type": architectures,
         "pcluster.config.cfn_param_types.get_availability_zone_of_subnet": "mocked_avail_zone",
@@ -123,9 +124,12 @@ def mock_pcluster_config(mocker, scheduler=None, extra_patches=None, patch_funcs
     for function, return_value in mock_patches.items():
         mocker.patch(function, return_value=return_value)
     mocker.patch.object(PclusterConfig, "_PclusterConfig__test_configuration")
+    # Validators describe each resource on its own, as expected by the stubbed calls of the tests
+    mocker.patch.object(ResourceSnapshot, "prefetch")
 
 
 def mock_get_instance_type(mocker, instance_type="t2.micro"):
+    mocker.patch("pcluster.config.pcluster_config.prefetch_instance_types_info")
     mocker.patch(
         "pcluster.utils.get_instance_type",
         return_value={
@@ -350,6 +354,7 @@ def assert_section_params(mocker, pcluster_config_reader, settings_label, expect
     mocker.patch(
         "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type", return_value=["x86_64"]
     )
+    mocker.patch("pcluster.config.pcluster_config.prefetch_instance_types_info")
     mocker.patch(
         "pcluster.utils.get_instance_type",
         return_value={
@@ -24,7 +24,7 @@ PUBLIC_CONFIGURATION = NetworkConfiguration.PUBLIC.value.config_type
 @pytest.fixture()
 def boto3_stubber_path():
     """Specify that boto3_mocker should stub calls to boto3 for the pcluster.configure.eesyconfig module."""
-    return "pcluster.configure.easyconfig.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 @pytest.fixture()
@@ -299,7 +299,6 @@ def _mock_create_network_configuration(mocker, public_subnet_id, private_subnet_
 
 def _mock_parallel_cluster_config(mocker):
     supported_instance_types = ["t2.nano", "t2.micro", "t2.large", "c5.xlarge", "g3.8xlarge", "m6g.xlarge"]
-    mocker.patch("pcluster.configure.easyconfig.get_supported_instance_types", return_value=supported_instance_types)
     mocker.patch(
         "pcluster.configure.easyconfig.get_supported_compute_instance_types", return_value=supported_instance_types
     )
@@ -823,10 +822,10 @@ def test_invalid_key_exception(mocker, key):
 
 
 def test_valid_key(mocker, instance_type_offerings_stub):
+    # Instance type offerings are retrieved only once per region
+    instance_type_offerings_stub()
     for i in range(1, 7):
-        instance_type_offerings_stub()
         assert_that(general_wrapper_for_prompt_testing(mocker, key="key" + str(i))).is_true()
-        instance_type_offerings_stub()
         assert_that(general_wrapper_for_prompt_testing(mocker, key=str(i))).is_true()
 
 
@@ -0,0 +1,347 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module provides unit tests for the cleanup_resources custom resource."""
+
+import importlib
+import os
+import sys
+
+import pytest
+from assertpy import assert_that
+
+import pcluster.resources.custom_resources.custom_resources_code as custom_resources_code
+
+HOSTED_ZONE_ID = "Z0123456789"
+
+
+@pytest.fixture()
+def cleanup_resources(mocker, monkeypatch):
+    """Import the cleanup_resources Lambda code the way the Lambda runtime does, with a stubbed crhelper."""
+    monkeypatch.setitem(sys.modules, "crhelper", mocker.MagicMock())
+    monkeypatch.delitem(sys.modules, "cleanup_resources", raising=False)
+    monkeypatch.syspath_prepend(os.path.dirname(custom_resources_code.__file__))
+    module = importlib.import_module("cleanup_resources")
+    yield module
+    sys.modules.pop("cleanup_resources", None)
+
+
+@pytest.fixture()
+def clock(cleanup_resources, mocker):
+    """Replace the clock of the Lambda code with a fake one, that only moves forward when sleeping."""
+    now = [1000.0]
+
+    def _sleep(seconds):
+        now[0] += seconds
+
+    mocker.patch.object(cleanup_resources.time, "time", side_effect=lambda: now[0])
+    mocker.patch.object(cleanup_resources.time, "sleep", side_effect=_sleep)
+    return now
+
+
+def _lambda_context(mocker, remaining_seconds):
+    context = mocker.MagicMock()
+    context.get_remaining_time_in_millis.return_value = remaining_seconds * 1000
+    return context
+
+
+def _a_record(index, values_count=1, value_length=10):
+    return {
+        "Name": "node-{0:05d}.cluster.".format(index),
+        "Type": "A",
+        "TTL": 300,
+        "ResourceRecords": [{"Value": "1" * value_length}] * values_count,
+    }
+
+
+def _mock_route53(mocker, record_sets):
+    """Return a Route53 client listing the given record sets, paginated like ListResourceRecordSets."""
+    route53 = mocker.MagicMock()
+
+    def _list_resource_record_sets(**kwargs):
+        start = 0
+        if "StartRecordName" in kwargs:
+            start = next(
+                index
+                for index, record_set in enumerate(record_sets)
+                if (record_set["Name"], record_set["Type"]) == (kwargs["StartRecordName"], kwargs["StartRecordType"])
+            )
+        page = record_sets[start : start + int(kwargs["MaxItems"])]  # noqa: E203
+        response = {"ResourceRecordSets": page, "IsTruncated": start + len(page) < len(record_sets)}
+        if response["IsTruncated"]:
+            next_record_set = record_sets[start + len(page)]
+            response.update(NextRecordName=next_record_set["Name"], NextRecordType=next_record_set["Type"])
+        return response
+
+    route53.list_resource_record_sets.side_effect = _list_resource_record_sets
+    return route53
+
+
+def _deleted_names(route53, call_index):
+    change_batch = route53.change_resource_record_sets.call_args_list[call_index][1]["ChangeBatch"]
+    return [change["ResourceRecordSet"]["Name"] for change in change_batch["Changes"]]
+
+
+@pytest.mark.parametrize(
+    "records_count, values_count, value_length, expected_batch_sizes",
+    [
+        # limit of 1000 records per batch, also across pages of record sets
+        (1000, 1, 10, [1000]),
+        (1001, 1, 10, [1000, 1]),
+        (2500, 1, 10, [1000, 1000, 500]),
+        # a record set with multiple values counts as multiple records
+        (600, 2, 10, [500, 100]),
+        # limit of 32000 characters of record values per batch
+        (10, 1, 10000, [3, 3, 3, 1]),
+        (20, 2, 4000, [4, 4, 4, 4, 4]),
+    ],
+)
+def test_list_dns_record_batches(
+    cleanup_resources, mocker, records_count, values_count, value_length, expected_batch_sizes
+):
+    a_records = [_a_record(index, values_count, value_length) for index in range(records_count)]
+    other_records = [
+        {"Name": "cluster.", "Type": "NS", "ResourceRecords": [{"Value": "ns-1.awsdns-1.org."}]},
+        {
+            "Name": "cluster.",
+            "Type": "SOA",
+            "ResourceRecords": [{"Value": "ns-1.awsdns-1.org. 1 7200 900 1209600 86400"}],
+        },
+    ]
+    route53 = _mock_route53(mocker, other_records + a_records)
+
+    batches = list(cleanup_resources._list_dns_record_batches(route53, HOSTED_ZONE_ID))
+
+    assert_that([len(batch["changes"]) for batch in batches]).is_equal_to(expected_batch_sizes)
+    deleted_record_sets = [change["ResourceRecordSet"] for batch in batches for change in batch["changes"]]
+    assert_that(deleted_record_sets).is_equal_to(a_records)
+    for batch in batches:
+        assert_that({change["Action"] for change in batch["changes"]}).is_equal_to({"DELETE"})
+        assert_that(
+            sum(len(change["ResourceRecordSet"]["ResourceRecords"]) for change in batch["changes"])
+        ).is_less_than_or_equal_to(cleanup_resources.ROUTE53_MAX_BATCH_RECORDS)
+        assert_that(
+            sum(
+                len(record["Value"])
+                for change in batch["changes"]
+                for record in change["ResourceRecordSet"]["ResourceRecords"]
+            )
+        ).is_less_than_or_equal_to(cleanup_resources.ROUTE53_MAX_BATCH_VALUES_LENGTH)
+
+    # every batch points to the first record of the following one
+    for batch, next_batch in zip(batches, batches[1:]):
+        first_record_set = next_batch["changes"][0]["ResourceRecordSet"]
+        assert_that(batch["next_start"]).is_equal_to(
+            {"StartRecordName": first_record_set["Name"], "StartRecordType": "A"}
+        )
+    assert_that(batches[-1]["next_start"]).is_none()
+    for call in route53.list_resource_record_sets.call_args_list:
+        assert_that(call[1]["MaxItems"]).is_equal_to(str(cleanup_resources.ROUTE53_LIST_PAGE_SIZE))
+
+
+def test_list_dns_record_batches_from_start(cleanup_resources, mocker):
+    route53 = _mock_route53(mocker, [_a_record(index) for index in range(1500)])
+    start = {"StartRecordName": _a_record(1200)["Name"], "StartRecordType": "A"}
+
+    batches = list(cleanup_resources._list_dns_record_batches(route53, HOSTED_ZONE_ID, start))
+
+    assert_that(batches).is_length(1)
+    assert_that([change["ResourceRecordSet"] for change in batches[0]["changes"]]).is_equal_to(
+        [_a_record(index) for index in range(1200, 1500)]
+    )
+    route53.list_resource_record_sets.assert_any_call(
+        HostedZoneId=HOSTED_ZONE_ID, MaxItems=str(cleanup_resources.ROUTE53_LIST_PAGE_SIZE), **start
+    )
+
+
+def test_delete_dns_record_batches_failure(cleanup_resources, mocker):
+    route53 = _mock_route53(mocker, [_a_record(index) for index in range(2500)])
+    route53.change_resource_record_sets.side_effect = [{}, Exception("record set not found"), {}]
+    progress = {"checkpoint": None, "deleted": 0, "completed": False}
+
+    cleanup_resources._delete_dns_record_batches(route53, HOSTED_ZONE_ID, progress, deadline=float("inf"))
+
+    # the progress stops at the first record of the failed batch, the following batches are not deleted
+    assert_that(progress).is_equal_to(
+        {
+            "checkpoint": {"StartRecordName": _a_record(1000)["Name"], "StartRecordType": "A"},
+            "deleted": 1000,
+            "completed": False,
+        }
+    )
+    assert_that(route53.change_resource_record_sets.call_count).is_equal_to(2)
+
+
+def test_delete_dns_records_resumes_from_checkpoint(cleanup_resources, clock, mocker):
+    record_sets = [_a_record(index) for index in range(2500)]
+    route53 = _mock_route53(mocker, record_sets)
+    route53.change_resource_record_sets.side_effect = [{}, Exception("record set not found"), {}, {}]
+    mocker.patch.object(cleanup_resources.boto3, "client", return_value=route53)
+    event = {"ResourceProperties": {"ClusterHostedZone": HOSTED_ZONE_ID}}
+
+    cleanup_resources._delete_dns_records(event, _lambda_context(mocker, remaining_seconds=900))
+
+    # the failed batch is deleted again after 5 seconds, listing the records from the checkpoint
+    cleanup_resources.time.sleep.assert_called_once_with(5)
+    assert_that(route53.change_resource_record_sets.call_count).is_equal_to(4)
+    assert_that(_deleted_names(route53, 1)).is_equal_to(_deleted_names(route53, 2))
+    assert_that(_deleted_names(route53, 0) + _deleted_names(route53, 2) + _deleted_names(route53, 3)).is_equal_to(
+        [record_set["Name"] for record_set in record_sets]
+    )
+    route53.list_resource_record_sets.assert_any_call(
+        HostedZoneId=HOSTED_ZONE_ID,
+        MaxItems=str(cleanup_resources.ROUTE53_LIST_PAGE_SIZE),
+        StartRecordName=record_sets[1000]["Name"],
+        StartRecordType="A",
+    )
+
+
+def test_delete_dns_records_deadline(cleanup_resources, clock, mocker):
+    route53 = _mock_route53(mocker, [_a_record(index) for index in range(1500)])
+    route53.change_resource_record_sets.side_effect = [{}] + [Exception("throttled")] * 10
+    mocker.patch.object(cleanup_resources.boto3, "client", return_value=route53)
+    event = {"ResourceProperties": {"ClusterHostedZone": HOSTED_ZONE_ID}}
+    # the deletion stops 10 seconds after start, i.e. after two retries
+    context = _lambda_context(mocker, remaining_seconds=cleanup_resources.DNS_CLEANUP_TIME_MARGIN + 10)
+
+    with pytest.raises(Exception, match=r"DNS records not deleted before the Lambda timeout \(1000 deleted\)"):
+        cleanup_resources._delete_dns_records(event, context)
+
+    assert_that(cleanup_resources.time.sleep.call_count).is_equal_to(2)
+    # no batch is deleted once the deadline expired
+    assert_that(route53.change_resource_record_sets.call_count).is_equal_to(3)
+
+
+def _mock_s3(mocker, keys):
+    """Return a S3 client listing a version of each of the given keys, paginated like ListObjectVersions."""
+    s3 = mocker.MagicMock()
+    s3.exceptions.NoSuchBucket = type("NoSuchBucket", (Exception,), {})
+
+    def _list_object_versions(**kwargs):
+        start = keys.index(kwargs["KeyMarker"]) + 1 if "KeyMarker" in kwargs else 0
+        page = keys[start : start + kwargs["MaxKeys"]]  # noqa: E203
+        response = {
+            "Versions": [{"Key": key, "VersionId": "v1"} for key in page],
+            "IsTruncated": start + len(page) < len(keys),
+        }
+        if response["IsTruncated"]:
+            response.update(NextKeyMarker=page[-1], NextVersionIdMarker="v1")
+        return response
+
+    s3.list_object_versions.side_effect = _list_object_versions
+    s3.delete_objects.return_value = {}
+    return s3
+
+
+def _keys(count):
+    return ["key-{0:05d}".format(index) for index in range(count)]
+
+
+def _deleted_keys(s3):
+    return [obj["Key"] for call in s3.delete_objects.call_args_list for obj in call[1]["Delete"]["Objects"]]
+
+
+@pytest.fixture()
+def s3_event():
+    return {"ResourceProperties": {"ResourcesS3Bucket": "bucket"}}
+
+
+def test_purge_bucket(cleanup_resources, clock, mocker):
+    s3 = _mock_s3(mocker, _keys(2500))
+
+    progress = cleanup_resources._purge_bucket(s3, "bucket", deadline=clock[0] + 10)
+
+    assert_that(progress).is_equal_to({"completed": True, "deleted": 2500, "errors": []})
+    assert_that(s3.delete_objects.call_count).is_equal_to(3)
+    assert_that(sorted(_deleted_keys(s3))).is_equal_to(_keys(2500))
+
+
+def test_purge_bucket_deadline(cleanup_resources, clock, mocker):
+    s3 = _mock_s3(mocker, _keys(3500))
+    list_object_versions = s3.list_object_versions.side_effect
+
+    def _slow_list_object_versions(**kwargs):
+        clock[0] += 4
+        return list_object_versions(**kwargs)
+
+    s3.list_object_versions.side_effect = _slow_list_object_versions
+
+    progress = cleanup_resources._purge_bucket(s3, "bucket", deadline=clock[0] + 5)
+
+    # the listing stops at the deadline, the pages already listed are deleted anyway
+    assert_that(progress).is_equal_to({"completed": False, "deleted": 2000, "errors": []})
+    assert_that(s3.list_object_versions.call_count).is_equal_to(2)
+    assert_that(sorted(_deleted_keys(s3))).is_equal_to(_keys(2000))
+
+
+@pytest.mark.parametrize(
+    "failed_keys_per_attempt, expected_deleted, expected_errors",
+    [
+        ([["key-00001", "key-00003"], ["key-00003"]], 5, []),
+        ([["key-00001", "key-00003"]] + [["key-00003"]] * 4, 4, ["key-00003"]),
+    ],
+)
+def test_delete_objects_retries(
+    cleanup_resources, clock, mocker, failed_keys_per_attempt, expected_deleted, expected_errors
+):
+    s3 = mocker.MagicMock()
+    s3.delete_objects.side_effect = [
+        {"Errors": [{"Key": key, "VersionId": "v1", "Code": "InternalError"} for key in failed_keys]}
+        for failed_keys in failed_keys_per_attempt
+    ] + [{}]
+    objects = [{"Key": key, "VersionId": "v1"} for key in _keys(5)]
+    progress = {"completed": False, "deleted": 0, "errors": []}
+
+    cleanup_resources._delete_objects(s3, "bucket", objects, progress, mocker.MagicMock())
+
+    # only the objects failed to delete are retried, up to the maximum number of attempts
+    attempts = min(len(failed_keys_per_attempt) + 1, cleanup_resources.S3_PURGE_MAX_ATTEMPTS)
+    assert_that(s3.delete_objects.call_count).is_equal_to(attempts)
+    for call, failed_keys in zip(s3.delete_objects.call_args_list[1:], failed_keys_per_attempt):
+        assert_that([obj["Key"] for obj in call[1]["Delete"]["Objects"]]).is_equal_to(failed_keys)
+    assert_that(cleanup_resources.time.sleep.call_count).is_equal_to(attempts - 1)
+    assert_that(progress["deleted"]).is_equal_to(expected_deleted)
+    assert_that([error["Key"] for error in progress["errors"]]).is_equal_to(expected_errors)
+
+
+def test_delete_s3_bucket(cleanup_resources, clock, mocker, s3_event):
+    s3 = _mock_s3(mocker, _keys(1500))
+    mocker.patch.object(cleanup_resources.boto3, "client", return_value=s3)
+
+    cleanup_resources._delete_s3_bucket(s3_event, _lambda_context(mocker, remaining_seconds=900))
+
+    assert_that(sorted(_deleted_keys(s3))).is_equal_to(_keys(1500))
+    s3.delete_bucket.assert_called_once_with(Bucket="bucket")
+
+
+def test_delete_s3_bucket_purge_incomplete(cleanup_resources, clock, mocker, s3_event):
+    s3 = _mock_s3(mocker, _keys(1500))
+    mocker.patch.object(cleanup_resources.boto3, "client", return_value=s3)
+    # the deadline is already expired
+    context = _lambda_context(mocker, remaining_seconds=cleanup_resources.S3_PURGE_TIME_MARGIN)
+
+    with pytest.raises(Exception, match="Bucket not emptied before the Lambda timeout"):
+        cleanup_resources._delete_s3_bucket(s3_event, context)
+
+    s3.delete_bucket.assert_not_called()
+
+
+def test_delete_s3_bucket_purge_errors(cleanup_resources, clock, mocker, s3_event):
+    s3 = _mock_s3(mocker, _keys(10))
+    s3.delete_objects.return_value = {
+        "Errors": [{"Key": "key-00002", "VersionId": "v1", "Code": "AccessDenied", "Message": "Access Denied"}]
+    }
+    mocker.patch.object(cleanup_resources.boto3, "client", return_value=s3)
+
+    with pytest.raises(Exception, match="Failed to delete 1 objects, e.g. key-00002: Access Denied"):
+        cleanup_resources._delete_s3_bucket(s3_event, _lambda_context(mocker, remaining_seconds=900))
+
+    assert_that(s3.delete_objects.call_count).is_equal_to(cleanup_resources.S3_PURGE_MAX_ATTEMPTS)
+    s3.delete_bucket.assert_not_called()
@@ -0,0 +1,101 @@
+"""This module provides unit tests for the pcluster.api_profiler module."""
+
+import json
+import logging
+
+import pytest
+from assertpy import assert_that
+from botocore.hooks import HierarchicalEmitter
+
+from pcluster import boto3_clients
+from pcluster.api_profiler import ApiProfiler
+from pcluster.throttling import THROTTLES_CONTEXT_KEY
+
+
+@pytest.fixture()
+def mocked_client(mocker):
+    """Return a mocked EC2 client with its own event emitter."""
+    client = mocker.MagicMock()
+    client.meta.region_name = "eu-west-1"
+    client.meta.service_model.service_id.hyphenize.return_value = "ec2"
+    client.meta.events = HierarchicalEmitter()
+    return client
+
+
+def _emit_api_call(mocker, client, operation, body, status_code=200, retries=0, throttles=0, error=None):
+    context = {}
+    model = mocker.MagicMock()
+    model.name = operation
+    client.meta.events.emit(
+        "before-call.ec2.{0}".format(operation), model=model, params={"body": body}, context=context
+    )
+    if throttles:
+        context[THROTTLES_CONTEXT_KEY] = throttles
+    if error:
+        client.meta.events.emit("after-call-error.ec2.{0}".format(operation), exception=error, context=context)
+        return
+    http_response = mocker.MagicMock(status_code=status_code, headers={"content-length": "2048"})
+    parsed = {"ResponseMetadata": {"RetryAttempts": retries}}
+    if status_code >= 300:
+        parsed["Error"] = {"Code": "InvalidParameterValue"}
+    client.meta.events.emit(
+        "after-call.ec2.{0}".format(operation), http_response=http_response, parsed=parsed, model=model, context=context
+    )
+
+
+def test_api_profiler(mocker, mocked_client, tmpdir, caplog):
+    time_mock = mocker.patch("pcluster.api_profiler.time")
+    time_mock.time.side_effect = [0, 10, 11, 20, 22, 23, 25, 30]
+    api_profiler = ApiProfiler()
+    api_profiler.start()
+    api_profiler.attach(mocked_client, "ec2")
+
+    _emit_api_call(mocker, mocked_client, "DescribeSubnets", {"Action": "DescribeSubnets", "SubnetId.1": "subnet-1"})
+    _emit_api_call(mocker, mocked_client, "DescribeSubnets", b"", status_code=400, retries=4, throttles=2)
+    _emit_api_call(mocker, mocked_client, "DescribeImages", b"body", error=Exception("connection error"))
+    # requests answered by other before-call handlers (e.g. stubbed) are not sent, so they are not recorded
+    mocked_client.meta.events.emit("after-call.ec2.DescribeVpcs", http_response=None, parsed={}, context={})
+    api_profiler.stop()
+
+    assert_that(api_profiler.calls).is_length(3)
+    assert_that(api_profiler.calls[0]).contains_entry(
+        {"service": "ec2"},
+        {"operation": "DescribeSubnets"},
+        {"region": "eu-west-1"},
+        {"duration": 1},
+        {"request_bytes": len("Action=DescribeSubnets&SubnetId.1=subnet-1")},
+        {"response_bytes": 2048},
+        {"error": None},
+    )
+    assert_that(api_profiler.calls[1]).contains_entry(
+        {"retries": 4}, {"throttles": 2}, {"error": "InvalidParameterValue"}
+    )
+    assert_that(api_profiler.calls[2]).contains_entry(
+        {"operation": "DescribeImages"}, {"request_bytes": 4}, {"response_bytes": 0}, {"error": "Exception"}
+    )
+
+    summary = api_profiler.get_summary()
+    assert_that(summary).extracting("operation").is_equal_to(["DescribeSubnets", "DescribeImages"])
+    assert_that(summary[0]).contains_entry({"calls": 2}, {"errors": 1}, {"retries": 4}, {"total_time": 3})
+
+    caplog.set_level(logging.INFO, logger="pcluster")
+    api_profiler.print_summary("create")
+    assert_that(caplog.text).contains("AWS API calls of 'pcluster create': 3 calls, 5.00 seconds spent in API calls")
+    assert_that(caplog.text).contains("DescribeSubnets")
+
+    trace_file = str(tmpdir.join("trace.json"))
+    api_profiler.write_trace(trace_file, "create")
+    with open(trace_file) as trace_fd:
+        trace = json.load(trace_fd)
+    assert_that(trace).contains_entry({"command": "create"}, {"duration": 30})
+    assert_that(trace.get("calls")).is_length(3)
+
+
+def test_api_profiler_hook(mocker):
+    register_hook_mock = mocker.patch.object(boto3_clients.get_registry(), "register_client_hook")
+    unregister_hook_mock = mocker.patch.object(boto3_clients.get_registry(), "unregister_client_hook")
+    api_profiler = ApiProfiler()
+    api_profiler.start()
+    register_hook_mock.assert_called_with(api_profiler.attach)
+    api_profiler.stop()
+    unregister_hook_mock.assert_called_with(api_profiler.attach)
@@ -0,0 +1,99 @@
+"""This module provides unit tests for the pcluster.boto3_clients module."""
+
+import threading
+
+import pytest
+from assertpy import assert_that
+from botocore.config import Config
+
+from pcluster.boto3_clients import DEFAULT_MAX_POOL_CONNECTIONS, MAX_POOL_CONNECTIONS_ENV, Boto3ClientRegistry
+
+
+@pytest.fixture()
+def registry(monkeypatch):
+    """Return a new registry with credentials and region set in the environment."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "fake_id")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "fake_secret")
+    monkeypatch.delenv("AWS_SESSION_TOKEN", raising=False)
+    monkeypatch.delenv(MAX_POOL_CONNECTIONS_ENV, raising=False)
+    return Boto3ClientRegistry()
+
+
+def test_get_client_is_cached(registry):
+    client = registry.get_client("ec2")
+    assert_that(registry.get_client("ec2")).is_same_as(client)
+    assert_that(registry.get_client("ec2", region_name="us-east-1")).is_same_as(client)
+    assert_that(client.meta.region_name).is_equal_to("us-east-1")
+    assert_that(client.meta.config.max_pool_connections).is_equal_to(DEFAULT_MAX_POOL_CONNECTIONS)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"region_name": "eu-west-1"},
+        {"aws_access_key_id": "other_id", "aws_secret_access_key": "other_secret"},
+        {"config": Config(retries={"max_attempts": 10})},
+        {"endpoint_url": "https://ec2.us-east-1.amazonaws.com"},
+    ],
+)
+def test_get_client_is_not_shared(registry, kwargs):
+    client = registry.get_client("ec2")
+    other_client = registry.get_client("ec2", **kwargs)
+    assert_that(other_client).is_not_same_as(client)
+    assert_that(registry.get_client("ec2", **kwargs)).is_same_as(other_client)
+    assert_that(registry.get_client("s3")).is_not_same_as(client)
+
+
+def test_get_client_credentials_from_environment(registry, monkeypatch):
+    client = registry.get_client("ec2")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "other_id")
+    assert_that(registry.get_client("ec2")).is_not_same_as(client)
+
+
+def test_configure(registry, monkeypatch):
+    monkeypatch.setenv(MAX_POOL_CONNECTIONS_ENV, "5")
+    client = registry.get_client("ec2")
+    assert_that(client.meta.config.max_pool_connections).is_equal_to(5)
+
+    registry.configure(max_pool_connections=30, retries={"max_attempts": 7})
+    configured_client = registry.get_client("ec2")
+    assert_that(configured_client).is_not_same_as(client)
+    assert_that(configured_client.meta.config.max_pool_connections).is_equal_to(30)
+    assert_that(configured_client.meta.config.retries).contains_entry({"total_max_attempts": 8})
+
+    # options set by the caller take precedence over the registry configuration
+    caller_client = registry.get_client("ec2", config=Config(max_pool_connections=2))
+    assert_that(caller_client.meta.config.max_pool_connections).is_equal_to(2)
+
+
+def test_client_hooks(registry):
+    hooked_services = []
+
+    def _hook(client, service):
+        hooked_services.append(service)
+
+    client = registry.get_client("ec2")
+    registry.register_client_hook(_hook)
+    assert_that(registry.get_client("ec2")).is_not_same_as(client)
+    registry.get_client("ec2")
+    registry.get_resource("s3")
+    assert_that(hooked_services).is_equal_to(["ec2", "s3"])
+
+    registry.unregister_client_hook(_hook)
+    registry.get_client("ec2")
+    assert_that(hooked_services).is_length(2)
+
+
+def test_get_resource_is_cached_per_thread(registry):
+    resource = registry.get_resource("ec2")
+    assert_that(registry.get_resource("ec2")).is_same_as(resource)
+
+    thread_resources = []
+    thread = threading.Thread(target=lambda: thread_resources.append(registry.get_resource("ec2")))
+    thread.start()
+    thread.join()
+    assert_that(thread_resources[0]).is_not_same_as(resource)
+
+    registry.reset()
+    assert_that(registry.get_resource("ec2")).is_not_same_as(resource)
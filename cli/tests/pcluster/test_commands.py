@@ -10,6 +10,10 @@
 # limitations under the License.
 
 """This module provides unit tests for the functions in the pcluster.commands module."""
+
+import logging
+import threading
+
 import pkg_resources
 import pytest
 from assertpy import assert_that
@@ -17,9 +21,12 @@ from botocore.exceptions import ClientError
 
 import pcluster.utils as utils
 from pcluster.cli_commands import update
+from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus
 from pcluster.cluster_model import ClusterModel
-from pcluster.commands import _create_bucket_with_resources, _validate_cluster_name
+from pcluster.commands import _create_bucket_with_artifacts, _validate_cluster_name, create, list_stacks
 from pcluster.constants import PCLUSTER_NAME_MAX_LENGTH
+from pcluster.utils import LISTED_STACK_STATUSES
+from tests.common import MockedBoto3Request
 
 
 def _mock_pcluster_config(mocker, scheduler, region):
@@ -34,45 +41,36 @@ def _mock_pcluster_config(mocker, scheduler, region):
 
 
 @pytest.mark.parametrize(
-    "scheduler, expected_dirs, expect_upload_hit_resources, expected_bucket_name",
+    "scheduler, expected_dirs, expected_bucket_name",
     [
-        ("slurm", ["resources/custom_resources"], True, "bucket"),
-        ("awsbatch", ["resources/custom_resources", "resources/batch"], False, "bucket"),
-        ("sge", [], False, None),
+        ("slurm", ["resources/custom_resources"], "bucket"),
+        ("awsbatch", ["resources/custom_resources", "resources/batch"], "bucket"),
     ],
 )
-def test_create_bucket_with_resources_success(
-    mocker, scheduler, expected_dirs, expect_upload_hit_resources, expected_bucket_name
-):
-    """Verify that create_bucket_with_batch_resources behaves as expected."""
+def test_create_bucket_with_artifacts_success(mocker, scheduler, expected_dirs, expected_bucket_name):
+    """Verify that create_bucket_with_artifacts behaves as expected."""
     region = "us-east-1"
 
     mocker.patch("pcluster.utils.generate_random_bucket_name", return_value=expected_bucket_name)
-    mocker.patch("pcluster.utils.create_s3_bucket")
+    create_s3_bucket_mock = mocker.patch("pcluster.utils.create_s3_bucket")
     upload_resources_artifacts_mock = mocker.patch("pcluster.utils.upload_resources_artifacts")
     delete_s3_bucket_mock = mocker.patch("pcluster.utils.delete_s3_bucket")
-    upload_hit_resources_mock = mocker.patch("pcluster.commands.upload_hit_resources")
-    upload_dashboard_resource = mocker.patch("pcluster.commands.upload_dashboard_resource")
-    pcluster_config_mock = _mock_pcluster_config(mocker, scheduler, region)
 
-    storage_data = pcluster_config_mock.to_storage()
-
-    bucket_name = _create_bucket_with_resources(pcluster_config_mock, storage_data, {})
+    bucket_name = _create_bucket_with_artifacts(region, scheduler)
 
+    create_s3_bucket_mock.assert_called_with(expected_bucket_name, region)
     delete_s3_bucket_mock.assert_not_called()
     upload_resources_artifacts_mock.assert_has_calls(
-        [mocker.call(bucket_name, root=pkg_resources.resource_filename(utils.__name__, dir)) for dir in expected_dirs]
-    )
-    if expect_upload_hit_resources:
-        upload_hit_resources_mock.assert_called_with(bucket_name, pcluster_config_mock, storage_data.json_params, {})
-    upload_dashboard_resource.assert_called_with(
-        bucket_name, pcluster_config_mock, storage_data.json_params, storage_data.cfn_params
+        [
+            mocker.call(bucket_name, root=pkg_resources.resource_filename(utils.__name__, dir), zip_paths={})
+            for dir in expected_dirs
+        ]
     )
     assert_that(bucket_name).is_equal_to(expected_bucket_name)
 
 
-def test_create_bucket_with_resources_creation_failure(mocker, caplog):
-    """Verify that create_bucket_with_batch_resources behaves as expected in case of bucket creation failure."""
+def test_create_bucket_with_artifacts_creation_failure(mocker, caplog):
+    """Verify that create_bucket_with_artifacts behaves as expected in case of bucket creation failure."""
     region = "eu-west-1"
     bucket_name = "parallelcluster-123"
     error = "BucketAlreadyExists"
@@ -83,17 +81,14 @@ def test_create_bucket_with_resources_creation_failure(mocker, caplog):
     mocker.patch("pcluster.utils.upload_resources_artifacts")
     delete_s3_bucket_mock = mocker.patch("pcluster.utils.delete_s3_bucket")
 
-    pcluster_config_mock = _mock_pcluster_config(mocker, "slurm", region)
-    storage_data = pcluster_config_mock.to_storage()
-
     with pytest.raises(ClientError, match=error):
-        _create_bucket_with_resources(pcluster_config_mock, storage_data, {})
+        _create_bucket_with_artifacts(region, "slurm")
     delete_s3_bucket_mock.assert_not_called()
     assert_that(caplog.text).contains("Unable to create S3 bucket")
 
 
-def test_create_bucket_with_resources_upload_failure(mocker, caplog):
-    """Verify that create_bucket_with_batch_resources behaves as expected in case of upload failure."""
+def test_create_bucket_with_artifacts_upload_failure(mocker, caplog):
+    """Verify that create_bucket_with_artifacts behaves as expected in case of upload failure."""
     region = "eu-west-1"
     bucket_name = "parallelcluster-123"
     error = "ExpiredToken"
@@ -104,18 +99,15 @@ def test_create_bucket_with_resources_upload_failure(mocker, caplog):
     mocker.patch("pcluster.utils.upload_resources_artifacts", side_effect=client_error)
     delete_s3_bucket_mock = mocker.patch("pcluster.utils.delete_s3_bucket")
 
-    pcluster_config_mock = _mock_pcluster_config(mocker, "slurm", region)
-    storage_data = pcluster_config_mock.to_storage()
-
     with pytest.raises(ClientError, match=error):
-        _create_bucket_with_resources(pcluster_config_mock, storage_data, {})
+        _create_bucket_with_artifacts(region, "slurm")
     # if resource upload fails we delete the bucket
     delete_s3_bucket_mock.assert_called_with(bucket_name)
     assert_that(caplog.text).contains("Unable to upload cluster resources to the S3 bucket")
 
 
-def test_create_bucket_with_resources_deletion_failure(mocker, caplog):
-    """Verify that create_bucket_with_batch_resources behaves as expected in case of deletion failure."""
+def test_create_bucket_with_artifacts_deletion_failure(mocker, caplog):
+    """Verify that create_bucket_with_artifacts behaves as expected in case of deletion failure."""
     region = "eu-west-1"
     bucket_name = "parallelcluster-123"
     error = "AccessDenied"
@@ -127,16 +119,99 @@ def test_create_bucket_with_resources_deletion_failure(mocker, caplog):
     mocker.patch("pcluster.utils.upload_resources_artifacts", side_effect=client_error)
     delete_s3_bucket_mock = mocker.patch("pcluster.utils.delete_s3_bucket", side_effect=client_error)
 
-    pcluster_config_mock = _mock_pcluster_config(mocker, "slurm", region)
-    storage_data = pcluster_config_mock.to_storage()
-
     # force upload failure to trigger a bucket deletion and then check the behaviour when the deletion fails
     with pytest.raises(ClientError, match=error):
-        _create_bucket_with_resources(pcluster_config_mock, storage_data, {})
+        _create_bucket_with_artifacts(region, "slurm")
     delete_s3_bucket_mock.assert_called_with(bucket_name)
     assert_that(caplog.text).contains("Unable to upload cluster resources to the S3 bucket")
 
 
+@pytest.mark.parametrize(
+    "failing_stage, error, expected_exit_code",
+    [
+        (None, None, None),
+        ("validate", SystemExit("Invalid configuration"), "Invalid configuration"),
+        ("to_storage", ValueError("Invalid storage data"), 1),
+        ("tags", KeyboardInterrupt(), 0),
+    ],
+)
+def test_create_pipeline(mocker, failing_stage, error, expected_exit_code):
+    """Verify that the bucket is created only for valid configurations and deleted if the stack is not created."""
+    pcluster_config = mocker.patch("pcluster.commands.PclusterConfig").return_value
+    pcluster_config.region = "us-east-1"
+    config_params = {"scheduler": "slurm", "update_check": False}
+    pcluster_config.get_section.return_value.get_param_value.side_effect = config_params.get
+    storage_data = pcluster_config.to_storage.return_value
+    storage_data.cfn_params = {"Scheduler": "slurm"}
+    bucket_created = threading.Event()
+
+    def _fail_after_bucket_creation(*_, **__):
+        # the failure happens once the bucket exists, which must then be deleted
+        bucket_created.wait(timeout=5)
+        raise error
+
+    if failing_stage == "validate":
+        pcluster_config.validate.side_effect = error
+    elif failing_stage == "to_storage":
+        pcluster_config.to_storage.side_effect = _fail_after_bucket_creation
+    mocker.patch(
+        "pcluster.commands._evaluate_tags",
+        side_effect=_fail_after_bucket_creation if failing_stage == "tags" else None,
+    )
+    mocker.patch("pcluster.commands.HitConverter")
+    # artifacts are packaged while the configuration is validated, and uploaded once the bucket exists
+    packaged_artifacts = {"custom_resources_code": "archive.zip"}
+    mocker.patch("pcluster.commands.utils.get_cached_resources_artifacts", return_value=packaged_artifacts)
+    create_bucket_mock = mocker.patch(
+        "pcluster.commands._create_bucket_with_artifacts",
+        side_effect=lambda region, scheduler, artifacts: (
+            artifacts.result() == packaged_artifacts and bucket_created.set() or "bucket"
+        ),
+    )
+    mocker.patch("pcluster.templates.fetch_template", side_effect=lambda url, **_: url.split("/")[-1][:2])
+    delete_s3_bucket_mock = mocker.patch("pcluster.commands.utils.delete_s3_bucket")
+    upload_substack_templates_mock = mocker.patch("pcluster.commands.upload_substack_templates")
+    cfn_client = mocker.patch("pcluster.commands.boto3_clients.get_client").return_value
+    mocker.patch("pcluster.commands.utils.get_stack", return_value={"StackStatus": "CREATE_IN_PROGRESS"})
+    args = mocker.MagicMock(
+        cluster_name="cluster", tags=None, template_url="https://template", extra_parameters=None, nowait=True
+    )
+
+    if failing_stage:
+        with pytest.raises(SystemExit) as exit_info:
+            create(args)
+        assert_that(exit_info.value.code).is_equal_to(expected_exit_code)
+        cfn_client.create_stack.assert_not_called()
+        if failing_stage == "validate":
+            # no bucket is created for invalid configurations
+            create_bucket_mock.assert_not_called()
+            delete_s3_bucket_mock.assert_not_called()
+        else:
+            delete_s3_bucket_mock.assert_called_once_with("bucket")
+    else:
+        create(args)
+        delete_s3_bucket_mock.assert_not_called()
+        version = utils.get_installed_version()
+        bucket_url = utils.get_bucket_url("us-east-1")
+        upload_substack_templates_mock.assert_called_with(
+            "bucket",
+            pcluster_config,
+            storage_data,
+            mocker.ANY,
+            True,
+            {
+                "{0}/templates/compute-fleet-hit-substack-{1}.cfn.yaml".format(bucket_url, version): "co",
+                "{0}/templates/cw-dashboard-substack-{1}.cfn.yaml".format(bucket_url, version): "cw",
+            },
+            # the dashboard template is rendered while the bucket is created
+            {"cw-dashboard": "cw"},
+        )
+        assert_that(bucket_created.is_set()).is_true()
+        assert_that(cfn_client.create_stack.call_args[1]["Parameters"]).contains(
+            {"ParameterKey": "ResourcesS3Bucket", "ParameterValue": "bucket"}
+        )
+
+
 @pytest.mark.parametrize(
     "base_cluster_model, target_cluster_model, expected_result, expected_message",
     [
@@ -188,3 +263,81 @@ def test_validate_cluster_name(cluster_name, should_trigger_error, caplog):
         _validate_cluster_name(cluster_name)
         for record in caplog.records:
             assert record.levelname != "CRITICAL"
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.boto3_clients.boto3"
+
+
+def _generate_stack_summary(stack_name, parent_id=None):
+    stack_summary = {
+        "StackId": "arn:aws:cloudformation:us-east-1:111111111111:stack/{0}/1".format(stack_name),
+        "StackName": stack_name,
+        "StackStatus": "CREATE_COMPLETE",
+        "CreationTime": 0,
+    }
+    if parent_id:
+        stack_summary["ParentId"] = parent_id
+    return stack_summary
+
+
+@pytest.mark.parametrize("details", [False, True])
+def test_list_stacks(mocker, boto3_stubber, caplog, monkeypatch, details):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    # Describe the stacks sequentially, since the stubber expects calls in order
+    mocker.patch("pcluster.commands.LIST_CLUSTERS_MAX_WORKERS", 1)
+    hit_cluster = _generate_stack_summary("parallelcluster-hit")
+    sit_cluster = _generate_stack_summary("parallelcluster-sit")
+    substack = _generate_stack_summary("parallelcluster-hit-EBS", parent_id=hit_cluster["StackId"])
+    other_stack = _generate_stack_summary("other-stack")
+
+    hit_stack = dict(hit_cluster, Tags=[{"Key": "Version", "Value": "2.10.0"}])
+    hit_stack["Outputs"] = [{"OutputKey": "IsHITCluster", "OutputValue": "true"}]
+    boto3_stubber(
+        "cloudformation",
+        [
+            MockedBoto3Request(
+                method="list_stacks",
+                response={"StackSummaries": [hit_cluster, substack, other_stack, sit_cluster]},
+                expected_params={"StackStatusFilter": LISTED_STACK_STATUSES},
+            ),
+            MockedBoto3Request(
+                method="describe_stacks",
+                response={"Stacks": [hit_stack]},
+                expected_params={"StackName": hit_cluster["StackId"]},
+            ),
+            # clusters deleted after being listed are still shown, without version
+            MockedBoto3Request(
+                method="describe_stacks",
+                response="Stack with id parallelcluster-sit does not exist",
+                expected_params={"StackName": sit_cluster["StackId"]},
+                generate_error=True,
+            ),
+        ],
+    )
+    fleet_status_manager_mock = mocker.patch("pcluster.commands.ComputeFleetStatusManager")
+    fleet_status_manager_mock.return_value.get_status.return_value = ComputeFleetStatus.RUNNING
+    describe_instances_mock = mocker.patch(
+        "pcluster.commands.utils.describe_cluster_instances",
+        side_effect=lambda stack_name, node_type: (
+            [{"State": {"Name": "running"}}] if node_type == utils.NodeType.master else [{}, {}]
+        ),
+    )
+
+    caplog.set_level(logging.INFO, logger="pcluster")
+    list_stacks(mocker.MagicMock(config_file=None, color=False, details=details))
+
+    lines = [line.split() for line in caplog.text.splitlines() if line.strip()]
+    if details:
+        assert_that(lines[1]).contains("hit", "CREATE_COMPLETE", "2.10.0", "RUNNING", "running", "2")
+        assert_that(lines[2]).contains("sit", "CREATE_COMPLETE", "-", "running", "2")
+        fleet_status_manager_mock.assert_called_once_with("hit")
+        assert_that(describe_instances_mock.call_count).is_equal_to(4)
+    else:
+        assert_that(caplog.text).does_not_contain("other-stack").does_not_contain("EBS")
+        assert_that(lines).is_length(2)
+        assert_that(lines[0]).contains("hit", "CREATE_COMPLETE", "2.10.0")
+        assert_that(lines[1]).is_equal_to(["sit", "CREATE_COMPLETE"])
+        describe_instances_mock.assert_not_called()
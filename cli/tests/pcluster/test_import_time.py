@@ -0,0 +1,83 @@
+"""This module checks the modules imported, and the time spent importing them, by the CLI entry points."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from assertpy import assert_that
+
+# Modules loaded only by the commands requiring them
+HEAVY_MODULES = [
+    "boto3",
+    "jinja2",
+    "pkg_resources",
+    "tabulate",
+    "yaml",
+    "pcluster.config.mappings",
+    "pcluster.commands",
+]
+
+# Multiplier of the import time budgets, to run the benchmark on slower hosts
+IMPORT_TIME_BUDGET_ENV = "AWS_PCLUSTER_IMPORT_TIME_BUDGET_FACTOR"
+
+
+def _run_with_import_times(code, *args):
+    """
+    Run the given code in a new interpreter and return the cumulative import time of each module and the run time.
+
+    :return: the import times by module and the time spent running the interpreter, in ms
+    """
+    start_time = time.time()
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", code] + list(args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    )
+    _, stderr = process.communicate()
+    run_time = (time.time() - start_time) * 1000
+    assert_that(process.returncode).is_equal_to(0)
+
+    import_times = {}
+    # Lines have the format "import time: <self us> | <cumulative us> | <indented module name>"
+    for line in stderr.decode().splitlines():
+        fields = line.split("|")
+        if line.startswith("import time:") and len(fields) == 3 and fields[1].strip().isdigit():
+            import_times[fields[2].strip()] = int(fields[1]) / 1000.0
+    return import_times, run_time
+
+
+def _get_budget(budget):
+    return budget * float(os.environ.get(IMPORT_TIME_BUDGET_ENV, 1))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime requires Python 3.7")
+@pytest.mark.parametrize(
+    "entry_point, heavy_modules, budget",
+    [
+        ("pcluster.cli", HEAVY_MODULES, 250),
+        ("awsbatch.awsbstat", ["jinja2", "pkg_resources", "pcluster.config.mappings", "pcluster.utils"], 1000),
+        # the commands not rendering templates don't load jinja2
+        ("pcluster.commands", ["jinja2", "pcluster.templates"], 2000),
+        # deleting clusters doesn't load the modules of the other commands
+        ("pcluster.cli_commands.delete", ["jinja2", "pcluster.commands", "pcluster.cli_commands.watch"], 2000),
+    ],
+)
+def test_entry_point_import_time(entry_point, heavy_modules, budget):
+    """Verify that heavy modules are not imported at startup and that the import time is within the budget (ms)."""
+    import_times, _ = _run_with_import_times("import {0}".format(entry_point))
+    assert_that(import_times).does_not_contain_key(*heavy_modules)
+    assert_that(import_times.get(entry_point)).is_less_than(_get_budget(budget))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime requires Python 3.7")
+@pytest.mark.parametrize("command", [["version"], ["--help"]])
+def test_command_run_time(command):
+    """Verify that commands not calling AWS run without importing heavy modules and within the budget (ms)."""
+    import_times, run_time = _run_with_import_times(
+        "import sys; from pcluster.cli import main; sys.argv[0] = 'pcluster'; main()", *command
+    )
+    assert_that(import_times).does_not_contain_key(*HEAVY_MODULES + ["pcluster.utils", "botocore.session"])
+    assert_that(run_time).is_less_than(_get_budget(500))
@@ -0,0 +1,124 @@
+"""This module provides unit tests for the pcluster.metadata_cache module."""
+
+import os
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.metadata_cache import CACHE_FORMAT_VERSION, DISABLE_CACHE_ENV, MetadataCache
+
+
+@pytest.fixture()
+def cache(tmpdir, monkeypatch):
+    """Return a cache stored in a temporary folder, for the us-east-1 region."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.delenv(DISABLE_CACHE_ENV, raising=False)
+    return MetadataCache(cache_dir=str(tmpdir.join("cache")))
+
+
+def _list_entries(cache):
+    return [os.path.join(root, file_name) for root, _, files in os.walk(cache.cache_dir) for file_name in files]
+
+
+def test_get_and_set(cache):
+    assert_that(cache.get("instance-types", "t2.micro")).is_none()
+    cache.set("instance-types", "t2.micro", {"InstanceType": "t2.micro"})
+    assert_that(cache.get("instance-types", "t2.micro")).is_equal_to({"InstanceType": "t2.micro"})
+
+    # entries are scoped by namespace and region
+    assert_that(cache.get("instance-type-azs", "t2.micro")).is_none()
+    assert_that(cache.get("instance-types", "t2.micro", region="eu-west-1")).is_none()
+
+    entries = _list_entries(cache)
+    assert_that(entries).is_length(1)
+    assert_that(entries[0]).contains(
+        os.path.join("v{0}".format(CACHE_FORMAT_VERSION), "us-east-1", "instance-types")
+    ).ends_with(".json")
+
+
+def test_ttl(cache, mocker):
+    time_mock = mocker.patch("pcluster.metadata_cache.time.time", return_value=1000)
+    cache.set("instance-types", "t2.micro", {"InstanceType": "t2.micro"}, ttl=60)
+    cache.set("instance-types", "c5.xlarge", {"InstanceType": "c5.xlarge"})
+
+    time_mock.return_value = 1061
+    assert_that(cache.get("instance-types", "t2.micro")).is_none()
+    assert_that(cache.get("instance-types", "c5.xlarge")).is_not_none()
+    # expired entries are removed
+    assert_that(_list_entries(cache)).is_length(1)
+
+
+def test_get_or_load(cache, mocker):
+    loader = mocker.MagicMock(return_value=["t2.micro", "c5.xlarge"])
+    assert_that(cache.get_or_load("instance-type-offerings", "region", loader)).is_equal_to(["t2.micro", "c5.xlarge"])
+    assert_that(cache.get_or_load("instance-type-offerings", "region", loader)).is_equal_to(["t2.micro", "c5.xlarge"])
+    loader.assert_called_once()
+
+    cache.refresh = True
+    cache.get_or_load("instance-type-offerings", "region", loader)
+    assert_that(loader.call_count).is_equal_to(2)
+
+
+def test_disabled(cache, monkeypatch):
+    monkeypatch.setenv(DISABLE_CACHE_ENV, "true")
+    cache.set("instance-types", "t2.micro", {"InstanceType": "t2.micro"})
+    assert_that(cache.get("instance-types", "t2.micro")).is_none()
+    assert_that(os.path.exists(cache.cache_dir)).is_false()
+
+
+def test_eviction(cache):
+    cache.set("instance-types", "t2.micro", {"InstanceType": "t2.micro"})
+    entry_size = os.path.getsize(_list_entries(cache)[0])
+    cache.max_size = entry_size * 2 + 20
+
+    for index, instance_type in enumerate(["t2.micro", "t2.small", "t2.large"]):
+        cache.set("instance-types", instance_type, {"InstanceType": instance_type})
+        entry_path = cache._get_entry_path("instance-types", instance_type, None)
+        os.utime(entry_path, (index, index))
+    cache.set("instance-types", "t2.xlarge", {"InstanceType": "t2.xlarge"})
+
+    # the least recently used entries are evicted
+    assert_that(_list_entries(cache)).is_length(2)
+    assert_that(cache.get("instance-types", "t2.micro")).is_none()
+    assert_that(cache.get("instance-types", "t2.small")).is_none()
+    assert_that(cache.get("instance-types", "t2.xlarge")).is_not_none()
+
+
+def test_old_format_and_corrupted_entries(cache):
+    old_version_dir = os.path.join(cache.cache_dir, "v0", "us-east-1", "instance-types")
+    os.makedirs(old_version_dir)
+    cache.set("instance-types", "t2.micro", {"InstanceType": "t2.micro"})
+    assert_that(os.path.exists(os.path.join(cache.cache_dir, "v0"))).is_false()
+
+    with open(cache._get_entry_path("instance-types", "t2.micro", None), "w") as entry_file:
+        entry_file.write("{not json")
+    assert_that(cache.get("instance-types", "t2.micro")).is_none()
+
+    cache.clear()
+    assert_that(os.path.exists(cache.cache_dir)).is_false()
+
+
+def test_shared_cache_dir(cache):
+    # the cache folder may be shared with other data, that is never removed
+    os.makedirs(os.path.join(cache.cache_dir, "important_project"))
+    os.makedirs(os.path.join(cache.cache_dir, "v0"))
+    cache.set("instance-types", "t2.micro", {"InstanceType": "t2.micro"})
+    assert_that(sorted(os.listdir(cache.cache_dir))).is_equal_to(
+        ["important_project", "v{0}".format(CACHE_FORMAT_VERSION)]
+    )
+
+    cache.clear()
+    assert_that(os.listdir(cache.cache_dir)).is_equal_to(["important_project"])
+
+
+def test_eviction_scans_cache_once(cache, mocker):
+    walk_spy = mocker.spy(os, "walk")
+    for index in range(10):
+        cache.set("instance-types", "type-{0}".format(index), {"InstanceType": index})
+    assert_that(walk_spy.call_count).is_equal_to(1)
+
+    # the cache is scanned again only when the written entries exceed max_size
+    cache.max_size = 0
+    cache.set("instance-types", "type-10", {"InstanceType": 10})
+    assert_that(walk_spy.call_count).is_equal_to(2)
+    assert_that(_list_entries(cache)).is_empty()
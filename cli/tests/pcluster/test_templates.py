@@ -0,0 +1,96 @@
+"""This module provides unit tests for the pcluster.templates module."""
+
+import hashlib
+import os
+from io import BytesIO
+from urllib.error import HTTPError
+
+import pytest
+from assertpy import assert_that
+from botocore.response import StreamingBody
+from jinja2 import Environment
+
+from pcluster import templates
+from tests.common import MockedBoto3Request
+
+TEMPLATE = "Queue: {{ config.cluster.queue }} - Enabled: {{ config.cluster.enabled | bool }} - Tags: {{ tags }}"
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.boto3_clients.boto3"
+
+
+def test_render_template(mocker, tmpdir):
+    params = {"cluster": {"queue": "compute", "enabled": "true"}}
+    assert_that(templates.render_template(TEMPLATE, params, ["tag"])).is_equal_to(
+        "Queue: compute - Enabled: True - Tags: ['tag']"
+    )
+    bytecode_cache_dir = os.path.join(str(tmpdir.join("cache")), "v1", "files", templates.BYTECODE_CACHE_NAMESPACE)
+    assert_that(os.listdir(bytecode_cache_dir)).is_length(1)
+
+    # templates compiled by other processes are loaded from the bytecode cache
+    mocker.patch.object(templates, "_ENVIRONMENT", None)
+    compile_spy = mocker.spy(Environment, "compile")
+    assert_that(templates.render_template(TEMPLATE, params, [])).contains("Queue: compute")
+    compile_spy.assert_not_called()
+
+
+def test_render_substack_templates():
+    json_params = {"cluster": {"queue": "compute", "enabled": "false"}}
+    rendered_templates = templates.render_substack_templates(
+        json_params,
+        {"Scheduler": "slurm"},
+        [{"Key": "Name", "Value": "cluster"}],
+        config_version="1",
+        hit_template="{{ config.cluster.queue | sha1 }} {{ config_version }} {{ tags[0].Value }}",
+        dashboard_template="{{ config.json_params.cluster.queue }} {{ config.cfn_params.Scheduler }} {{ tags }}",
+    )
+    assert_that(rendered_templates).is_equal_to(
+        {
+            templates.HIT_SUBSTACK: "{0} 1 cluster".format(hashlib.sha1(b"compute").hexdigest()),
+            templates.DASHBOARD_SUBSTACK: "compute slurm {}",
+        }
+    )
+    assert_that(templates.render_substack_templates(json_params, {}, [], dashboard_template="x")).is_length(1)
+
+
+def test_fetch_template_http(mocker):
+    response = mocker.MagicMock(headers={"ETag": '"etag"', "Last-Modified": "Thu, 01 Oct 2020 00:00:00 GMT"})
+    response.__enter__.return_value.read.return_value = b"template"
+    response.__enter__.return_value.headers = response.headers
+    urlopen_mock = mocker.patch(
+        "pcluster.templates.urllib.request.urlopen",
+        side_effect=[response, HTTPError("https://template", 304, "Not Modified", {}, None)],
+    )
+
+    assert_that(templates.fetch_template("https://template")).is_equal_to("template")
+    assert_that(urlopen_mock.call_args[0][0].get_header("If-none-match")).is_none()
+
+    # the cached template is revalidated with a conditional request
+    assert_that(templates.fetch_template("https://template")).is_equal_to("template")
+    request = urlopen_mock.call_args[0][0]
+    assert_that(request.get_header("If-none-match")).is_equal_to('"etag"')
+    assert_that(request.get_header("If-modified-since")).is_equal_to("Thu, 01 Oct 2020 00:00:00 GMT")
+
+
+def test_fetch_template_s3(boto3_stubber):
+    boto3_stubber(
+        "s3",
+        [
+            MockedBoto3Request(
+                method="get_object",
+                response={"Body": StreamingBody(BytesIO(b"template"), len(b"template")), "ETag": '"etag"'},
+                expected_params={"Bucket": "bucket", "Key": "templates/template.yaml"},
+            ),
+            MockedBoto3Request(
+                method="get_object",
+                response="Not Modified",
+                expected_params={"Bucket": "bucket", "Key": "templates/template.yaml", "IfNoneMatch": '"etag"'},
+                generate_error=True,
+                error_code="304",
+            ),
+        ],
+    )
+    for _ in range(2):
+        assert_that(templates.fetch_template("s3://bucket/templates/template.yaml")).is_equal_to("template")
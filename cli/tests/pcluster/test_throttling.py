@@ -0,0 +1,160 @@
+"""This module provides unit tests for the pcluster.throttling module."""
+
+import pytest
+from assertpy import assert_that
+from botocore.hooks import HierarchicalEmitter
+
+import pcluster.utils as utils
+from pcluster.throttling import (
+    DEFAULT_MAX_RATE,
+    DEFAULT_MIN_RATE,
+    RateLimiter,
+    TokenBucket,
+    get_backoff_delay,
+    get_retry_after,
+    is_throttling_error,
+)
+
+
+def _error_response(code=None, status_code=400, retry_after=None):
+    response = {"ResponseMetadata": {"HTTPStatusCode": status_code, "HTTPHeaders": {}}}
+    if code:
+        response["Error"] = {"Code": code, "Message": "error"}
+    if retry_after is not None:
+        response["ResponseMetadata"]["HTTPHeaders"]["retry-after"] = retry_after
+    return response
+
+
+@pytest.mark.parametrize(
+    "response, expected_result",
+    [
+        (_error_response("Throttling"), True),
+        (_error_response("RequestLimitExceeded"), True),
+        (_error_response(status_code=429), True),
+        (_error_response("InvalidParameterValue"), False),
+        ({"ResponseMetadata": {"HTTPStatusCode": 200}}, False),
+        (None, False),
+    ],
+)
+def test_is_throttling_error(response, expected_result):
+    assert_that(is_throttling_error(response)).is_equal_to(expected_result)
+
+
+@pytest.mark.parametrize(
+    "retry_after, expected_result", [(None, None), ("3", 3.0), ("-1", 0.0), ("Wed, 21 Oct 2015 07:28:00 GMT", None)]
+)
+def test_get_retry_after(retry_after, expected_result):
+    assert_that(get_retry_after(_error_response("Throttling", retry_after=retry_after))).is_equal_to(expected_result)
+
+
+@pytest.mark.parametrize(
+    "attempt, retry_after, expected_upper_bound, expected_delay",
+    [(0, None, 0.5, 0.5), (3, None, 4, 4), (10, None, 20, 20), (0, 7, 0.5, 7), (5, 1, 16, 16)],
+)
+def test_get_backoff_delay(mocker, attempt, retry_after, expected_upper_bound, expected_delay):
+    uniform_mock = mocker.patch("pcluster.throttling.random.uniform", side_effect=lambda low, high: high)
+    assert_that(get_backoff_delay(attempt, retry_after=retry_after)).is_equal_to(expected_delay)
+    uniform_mock.assert_called_with(0, expected_upper_bound)
+
+
+def test_token_bucket(mocker):
+    now = [100.0]
+    mocker.patch("pcluster.throttling.time.time", side_effect=lambda: now[0])
+    sleep_mock = mocker.patch("pcluster.throttling.time.sleep")
+    bucket = TokenBucket(max_rate=4, min_rate=1)
+
+    # requests are not limited before the first throttle
+    for _ in range(10):
+        assert_that(bucket.acquire()).is_equal_to(0)
+    assert_that(bucket.rate).is_none()
+
+    bucket.on_throttle()
+    assert_that(bucket.rate).is_equal_to(2)
+    # no tokens available after a throttle, so concurrent callers wait their turn
+    assert_that(bucket.acquire()).is_equal_to(0.5)
+    assert_that(bucket.acquire()).is_equal_to(1)
+    sleep_mock.assert_called_with(1)
+
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert_that(bucket.rate).is_equal_to(1)
+
+    # the rate is increased at every success, until the limit is removed
+    now[0] += 10
+    for expected_rate in [1.5, 2, 2.5, 3, 3.5, None]:
+        bucket.on_success()
+        assert_that(bucket.rate).is_equal_to(expected_rate)
+    assert_that(bucket.acquire()).is_equal_to(0)
+
+
+def test_token_bucket_defaults():
+    bucket = TokenBucket()
+    assert_that(bucket.max_rate).is_equal_to(DEFAULT_MAX_RATE)
+    bucket.on_throttle()
+    for _ in range(10):
+        bucket.on_throttle()
+    assert_that(bucket.rate).is_equal_to(DEFAULT_MIN_RATE)
+
+
+@pytest.fixture()
+def ec2_client(mocker):
+    """Return a mocked EC2 client with its own event emitter, so that botocore retry handlers are not involved."""
+    client = mocker.MagicMock()
+    client.meta.region_name = "eu-west-1"
+    client.meta.service_model.service_id.hyphenize.return_value = "ec2"
+    client.meta.events = HierarchicalEmitter()
+    return client
+
+
+def _emit_needs_retry(client, response, attempts):
+    return client.meta.events.emit_until_response(
+        "needs-retry.ec2.DescribeInstances", response=(None, response), attempts=attempts, caught_exception=None
+    )[1]
+
+
+def test_rate_limiter(mocker, ec2_client):
+    mocker.patch("pcluster.throttling.random.uniform", side_effect=lambda low, high: high)
+    rate_limiter = RateLimiter(max_attempts=3, base_delay=1, max_delay=10)
+    rate_limiter.attach(ec2_client, "ec2")
+    bucket = rate_limiter.get_bucket("ec2", "eu-west-1")
+    assert_that(rate_limiter.get_bucket("ec2", "us-east-1")).is_not_same_as(bucket)
+
+    # throttled requests are retried with exponential backoff, honoring Retry-After
+    assert_that(_emit_needs_retry(ec2_client, _error_response("Throttling"), attempts=1)).is_equal_to(1)
+    assert_that(_emit_needs_retry(ec2_client, _error_response(status_code=429, retry_after="5"), 2)).is_equal_to(5)
+    assert_that(bucket.rate).is_equal_to(DEFAULT_MAX_RATE / 4)
+    # and left to the caller after max_attempts
+    assert_that(_emit_needs_retry(ec2_client, _error_response("Throttling"), attempts=3)).is_none()
+    assert_that(rate_limiter.stats.as_dict()).is_equal_to(
+        {"throttles": 3, "retries": 2, "backoff_time": 6, "rate_limit_time": 0.0}
+    )
+
+    # other errors are handled by the botocore retry handler
+    assert_that(_emit_needs_retry(ec2_client, _error_response("InvalidParameterValue"), attempts=1)).is_none()
+
+    ec2_client.meta.events.emit("after-call.ec2.DescribeInstances", parsed={})
+    assert_that(bucket.rate).is_equal_to(DEFAULT_MAX_RATE / 8 + 0.5)
+
+    rate_limiter.reset()
+    assert_that(rate_limiter.get_bucket("ec2", "eu-west-1").rate).is_none()
+    assert_that(rate_limiter.stats.as_dict()).contains_entry({"throttles": 0})
+
+
+@pytest.mark.parametrize("attempts, failures, expected_delays", [(1, 0, []), (4, 3, [1, 2, 4]), (3, 3, [1, 2])])
+def test_retry(mocker, attempts, failures, expected_delays):
+    mocker.patch("pcluster.throttling.random.uniform", side_effect=lambda low, high: high)
+    sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    calls = []
+
+    def _func(value):
+        calls.append(value)
+        if len(calls) <= failures:
+            raise Exception("failure {0}".format(len(calls)))
+        return value
+
+    if failures < attempts:
+        assert_that(utils.retry(_func, ["result"], attempts=attempts, wait=1)).is_equal_to("result")
+    else:
+        with pytest.raises(Exception, match="failure {0}".format(attempts)):
+            utils.retry(_func, ["result"], attempts=attempts, wait=1)
+    assert_that(sleep_mock.call_args_list).is_equal_to([mocker.call(delay) for delay in expected_delays])
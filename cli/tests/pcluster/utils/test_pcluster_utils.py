@@ -2,6 +2,9 @@
 
 import json
 import logging
+import os
+import zipfile
+from io import BytesIO
 from itertools import product
 from re import escape
 
@@ -10,6 +13,7 @@ from assertpy import assert_that
 from botocore.exceptions import ClientError, EndpointConnectionError
 
 import pcluster.utils as utils
+from pcluster import metadata_cache
 from pcluster.utils import get_bucket_url
 from tests.common import MockedBoto3Request
 
@@ -21,7 +25,7 @@ STACK_TYPE = "AWS::CloudFormation::Stack"
 @pytest.fixture()
 def boto3_stubber_path():
     """Specify that boto3_mocker should stub calls to boto3 for the pcluster.utils module."""
-    return "pcluster.utils.boto3"
+    return "pcluster.boto3_clients.boto3"
 
 
 def test_get_stack_name():
@@ -106,6 +110,12 @@ def test_update_stack_template(mocker, boto3_stubber, error_message):
     }
     response = error_message or {"StackId": "stack ID"}
     mocked_requests = [
+        # existing events are skipped before updating the stack
+        MockedBoto3Request(
+            method="describe_stack_events",
+            response={"StackEvents": [_generate_stack_event()]},
+            expected_params={"StackName": FAKE_STACK_NAME},
+        ),
         MockedBoto3Request(
             method="update_stack",
             response=response,
@@ -118,7 +128,7 @@ def test_update_stack_template(mocker, boto3_stubber, error_message):
     if error_message is None or "no updates are to be performed" in error_message.lower():
         utils.update_stack_template(FAKE_STACK_NAME, template_body, cfn_params)
         if error_message is None or "no updates are to be performed" not in error_message.lower():
-            utils._wait_for_update.assert_called_with(FAKE_STACK_NAME)
+            utils._wait_for_update.assert_called_with(FAKE_STACK_NAME, mocker.ANY)
         else:
             assert_that(utils._wait_for_update.called).is_false()
     else:
@@ -224,8 +234,14 @@ def test_get_stack_resources(boto3_stubber, resources, error_message):
         assert_that(sysexit.value.code).is_not_equal_to(0)
 
 
+def _mock_backoff_jitter(mocker):
+    """Make the backoff delays deterministic, by always returning the maximum delay."""
+    mocker.patch("pcluster.throttling.random.uniform", side_effect=lambda low, high: high)
+
+
 def test_retry_on_boto3_throttling(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    _mock_backoff_jitter(mocker)
     mocked_requests = [
         MockedBoto3Request(
             method="describe_stack_resources",
@@ -247,11 +263,13 @@ def test_retry_on_boto3_throttling(boto3_stubber, mocker):
     ]
     client = boto3_stubber("cloudformation", mocked_requests)
     utils.retry_on_boto3_throttling(client.describe_stack_resources, StackName=FAKE_STACK_NAME)
-    sleep_mock.assert_called_with(5)
+    # exponential backoff with jitter, capped to 5 seconds
+    sleep_mock.assert_has_calls([mocker.call(0.5), mocker.call(1.0)])
 
 
 def test_get_stack_resources_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    _mock_backoff_jitter(mocker)
     mocked_requests = [
         MockedBoto3Request(
             method="describe_stack_resources",
@@ -266,11 +284,12 @@ def test_get_stack_resources_retry(boto3_stubber, mocker):
     ]
     boto3_stubber("cloudformation", mocked_requests)
     utils.get_stack_resources(FAKE_STACK_NAME)
-    sleep_mock.assert_called_with(5)
+    sleep_mock.assert_called_with(0.5)
 
 
 def test_get_stack_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    _mock_backoff_jitter(mocker)
     expected_stack = {"StackName": FAKE_STACK_NAME, "CreationTime": 0, "StackStatus": "CREATED"}
     mocked_requests = [
         MockedBoto3Request(
@@ -289,11 +308,143 @@ def test_get_stack_retry(boto3_stubber, mocker):
     boto3_stubber("cloudformation", mocked_requests)
     stack = utils.get_stack(FAKE_STACK_NAME)
     assert_that(stack).is_equal_to(expected_stack)
-    sleep_mock.assert_called_with(5)
+    sleep_mock.assert_called_with(0.5)
+
+
+def _stack_resource(logical_id, physical_id, resource_type):
+    return {
+        "LogicalResourceId": logical_id,
+        "PhysicalResourceId": physical_id,
+        "ResourceType": resource_type,
+        "Timestamp": "2020-10-01T12:00:00Z",
+        "ResourceStatus": "CREATE_COMPLETE",
+    }
+
+
+def test_cluster_stack_snapshot(boto3_stubber, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    stack = {
+        "StackName": FAKE_STACK_NAME,
+        "CreationTime": 0,
+        "StackStatus": "CREATE_COMPLETE",
+        "Outputs": [{"OutputKey": "BatchComputeEnvironmentArn", "OutputValue": "ce-arn"}],
+        "Parameters": [{"ParameterKey": "Scheduler", "ParameterValue": "slurm"}],
+    }
+    ebs_stack_id = "arn:aws:cloudformation:us-east-1:111111111111:stack/parallelcluster-cluster-EBSCfnStack/1"
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_stacks", response={"Stacks": [stack]}, expected_params={"StackName": FAKE_STACK_NAME}
+        ),
+        MockedBoto3Request(
+            method="describe_stack_resources",
+            response={
+                "StackResources": [
+                    _stack_resource("ComputeFleet", "asg-name", "AWS::AutoScaling::AutoScalingGroup"),
+                    _stack_resource("EBSCfnStack", ebs_stack_id, STACK_TYPE),
+                ]
+            },
+            expected_params={"StackName": FAKE_STACK_NAME},
+        ),
+        MockedBoto3Request(
+            method="describe_stack_resources",
+            response={"StackResources": [_stack_resource("EBS0", "vol-1", "AWS::EC2::Volume")]},
+            expected_params={"StackName": ebs_stack_id},
+        ),
+        # the stack is described again only after being invalidated
+        MockedBoto3Request(
+            method="describe_stacks",
+            response={"Stacks": [dict(stack, StackStatus="UPDATE_IN_PROGRESS")]},
+            expected_params={"StackName": FAKE_STACK_NAME},
+        ),
+    ]
+    boto3_stubber("cloudformation", mocked_requests)
+
+    stack_snapshot = utils.ClusterStackSnapshot(FAKE_STACK_NAME)
+    assert_that(stack_snapshot.get_param("Scheduler")).is_equal_to("slurm")
+    assert_that(utils.get_batch_ce(FAKE_STACK_NAME, stack_snapshot)).is_equal_to("ce-arn")
+    # the ASG name is not in the outputs, it's read from the resources of the stack
+    assert_that(utils.get_asg_name(FAKE_STACK_NAME, stack_snapshot)).is_equal_to("asg-name")
+    assert_that(stack_snapshot.get_resource_id("ComputeFleet")).is_equal_to("asg-name")
+    for _ in range(2):
+        assert_that(stack_snapshot.get_substack_resources("EBSCfnStack")).is_length(1)
+    assert_that(stack_snapshot.get_substack_resources("EFSCfnStack")).is_empty()
+    assert_that(stack_snapshot.stack.get("StackStatus")).is_equal_to("CREATE_COMPLETE")
+
+    stack_snapshot.invalidate()
+    assert_that(stack_snapshot.stack.get("StackStatus")).is_equal_to("UPDATE_IN_PROGRESS")
+
+
+def _list_object_versions_page(keys, next_key_marker=None):
+    page = {
+        "Versions": [{"Key": key, "VersionId": "v1"} for key in keys],
+        "DeleteMarkers": [{"Key": key, "VersionId": "v2"} for key in keys],
+        "IsTruncated": next_key_marker is not None,
+    }
+    if next_key_marker:
+        page.update({"NextKeyMarker": next_key_marker, "NextVersionIdMarker": "v2"})
+    return page
+
+
+def test_delete_s3_bucket(mocker):
+    mocker.patch("pcluster.utils.time.sleep")
+    s3_client = mocker.patch("pcluster.utils.boto3_clients.get_client").return_value
+    s3_client.list_object_versions.side_effect = [
+        _list_object_versions_page(["a", "b"], next_key_marker="b"),
+        _list_object_versions_page(["c"]),
+    ]
+    # the first attempt to delete the second page partially fails
+    delete_responses = {
+        "a": [{}],
+        "c": [{"Errors": [{"Key": "c", "VersionId": "v1", "Code": "InternalError"}]}, {}],
+    }
+    s3_client.delete_objects.side_effect = lambda Bucket, Delete: delete_responses[Delete["Objects"][0]["Key"]].pop(0)
+
+    utils.delete_s3_bucket("bucket")
+
+    s3_client.list_object_versions.assert_has_calls(
+        [
+            mocker.call(Bucket="bucket", MaxKeys=1000),
+            mocker.call(Bucket="bucket", MaxKeys=1000, KeyMarker="b", VersionIdMarker="v2"),
+        ]
+    )
+    s3_client.delete_objects.assert_any_call(
+        Bucket="bucket",
+        Delete={
+            "Objects": [
+                {"Key": "a", "VersionId": "v1"},
+                {"Key": "b", "VersionId": "v1"},
+                {"Key": "a", "VersionId": "v2"},
+                {"Key": "b", "VersionId": "v2"},
+            ],
+            "Quiet": True,
+        },
+    )
+    s3_client.delete_objects.assert_called_with(
+        Bucket="bucket", Delete={"Objects": [{"Key": "c", "VersionId": "v1"}], "Quiet": True}
+    )
+    assert_that(s3_client.delete_objects.call_count).is_equal_to(3)
+    s3_client.delete_bucket.assert_called_with(Bucket="bucket")
+
+
+def test_bucket_purge_deadline(mocker):
+    s3_client = mocker.MagicMock()
+    s3_client.list_object_versions.return_value = _list_object_versions_page(["a"], next_key_marker="a")
+    s3_client.delete_objects.return_value = {}
+    mocker.patch("pcluster.utils.time").time.side_effect = [0, 0, 100]
+
+    bucket_purge = utils.BucketPurge("bucket", s3_client)
+    assert_that(bucket_purge.run(deadline=10)).is_false()
+    # the purge stops after the pages listed before the deadline, and it can be resumed from the next one
+    assert_that(s3_client.list_object_versions.call_count).is_equal_to(2)
+    assert_that(bucket_purge.deleted_count).is_equal_to(4)
+    assert_that(bucket_purge.completed).is_false()
+    assert_that(bucket_purge.key_marker).is_equal_to("a")
+    assert_that(bucket_purge.version_id_marker).is_equal_to("v2")
 
 
 def test_verify_stack_creation_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    _mock_backoff_jitter(mocker)
     mocker.patch(
         "pcluster.utils.get_stack",
         side_effect=[{"StackStatus": "CREATE_IN_PROGRESS"}, {"StackStatus": "CREATE_FAILED"}],
@@ -314,11 +465,13 @@ def test_verify_stack_creation_retry(boto3_stubber, mocker):
     ]
     client = boto3_stubber("cloudformation", mocked_requests * 2)
     assert_that(utils.verify_stack_creation(FAKE_STACK_NAME, client)).is_false()
-    sleep_mock.assert_called_with(5)
+    # throttled calls are retried with backoff, while the stack status is polled every 5 seconds
+    sleep_mock.assert_has_calls([mocker.call(0.5), mocker.call(5), mocker.call(0.5)])
 
 
 def test_get_stack_events_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    _mock_backoff_jitter(mocker)
     expected_events = [_generate_stack_event()]
     mocked_requests = [
         MockedBoto3Request(
@@ -336,7 +489,7 @@ def test_get_stack_events_retry(boto3_stubber, mocker):
     ]
     boto3_stubber("cloudformation", mocked_requests)
     assert_that(utils.get_stack_events(FAKE_STACK_NAME)).is_equal_to(expected_events)
-    sleep_mock.assert_called_with(5)
+    sleep_mock.assert_called_with(0.5)
 
 
 def _generate_stack_event():
@@ -350,6 +503,85 @@ def _generate_stack_event():
     }
 
 
+def _generate_tailed_stack_event(event_id, timestamp, stack_id=FAKE_STACK_NAME, substack_id=None):
+    event = {
+        "LogicalResourceId": "resource-{0}".format(event_id),
+        "ResourceStatus": "CREATE_COMPLETE",
+        "StackId": stack_id,
+        "EventId": event_id,
+        "StackName": stack_id,
+        "Timestamp": timestamp,
+    }
+    if substack_id:
+        event.update({"ResourceType": utils.STACK_TYPE, "PhysicalResourceId": substack_id})
+    return event
+
+
+def test_stack_event_tailer(boto3_stubber, capsys):
+    substack_id = "arn:aws:cloudformation:us-east-1:111111111111:stack/substack/1"
+    root_events = [
+        _generate_tailed_stack_event("root-5", 4, substack_id=substack_id),
+        _generate_tailed_stack_event("root-4", 3),
+        _generate_tailed_stack_event("root-3", 2),
+        _generate_tailed_stack_event("root-2", 2),
+        _generate_tailed_stack_event("root-1", 1),
+    ]
+    substack_events = [
+        _generate_tailed_stack_event("sub-3", 6, stack_id=substack_id),
+        _generate_tailed_stack_event("sub-2", 5, stack_id=substack_id),
+        _generate_tailed_stack_event("sub-1", 4, stack_id=substack_id),
+        # older than the events already existing when the tailer started
+        _generate_tailed_stack_event("sub-0", 1, stack_id=substack_id),
+    ]
+    boto3_stubber(
+        "cloudformation",
+        [
+            # skip existing events
+            MockedBoto3Request(
+                method="describe_stack_events",
+                response={"StackEvents": root_events[3:]},
+                expected_params={"StackName": FAKE_STACK_NAME},
+            ),
+            # first poll, pages are read until the last seen event
+            MockedBoto3Request(
+                method="describe_stack_events",
+                response={"StackEvents": root_events[:2], "NextToken": "token"},
+                expected_params={"StackName": FAKE_STACK_NAME},
+            ),
+            MockedBoto3Request(
+                method="describe_stack_events",
+                response={"StackEvents": root_events[2:]},
+                expected_params={"StackName": FAKE_STACK_NAME, "NextToken": "token"},
+            ),
+            MockedBoto3Request(
+                method="describe_stack_events",
+                response={"StackEvents": substack_events[1:]},
+                expected_params={"StackName": substack_id},
+            ),
+            # second poll
+            MockedBoto3Request(
+                method="describe_stack_events",
+                response={"StackEvents": root_events, "NextToken": "token"},
+                expected_params={"StackName": FAKE_STACK_NAME},
+            ),
+            MockedBoto3Request(
+                method="describe_stack_events",
+                response={"StackEvents": substack_events},
+                expected_params={"StackName": substack_id},
+            ),
+        ],
+    )
+
+    event_tailer = utils.StackEventTailer(FAKE_STACK_NAME)
+    event_tailer.skip_existing_events()
+    events = event_tailer.poll()
+    assert_that(events).extracting("EventId").is_equal_to(["root-3", "root-4", "root-5", "sub-1", "sub-2"])
+    assert_that(event_tailer.poll()).extracting("EventId").is_equal_to(["sub-3"])
+
+    utils.print_stack_events(events[:1])
+    assert_that(capsys.readouterr().out).is_equal_to("\r%s\n" % "Status: resource-root-3 - CREATE_COMPLETE".ljust(80))
+
+
 @pytest.mark.parametrize(
     "bucket_prefix", ["test", "test-", "prefix-63-characters-long--------------------------------to-cut"]
 )
@@ -440,6 +672,80 @@ def test_create_s3_bucket(region, create_error_message, configure_error_message,
         delete_s3_bucket_mock.assert_not_called()
 
 
+def _create_resources_dir(tmpdir):
+    resources_dir = tmpdir.mkdir("resources").mkdir("custom_resources_code")
+    resources_dir.join("handler.py").write("def handler(event, context):\n    pass\n")
+    resources_dir.mkdir("lib").join("module.py").write("VALUE = 1\n")
+    return resources_dir
+
+
+def test_zip_dir(tmpdir):
+    resources_dir = _create_resources_dir(tmpdir)
+    archive = utils.zip_dir(str(resources_dir)).read()
+    with zipfile.ZipFile(BytesIO(archive)) as zip_file:
+        assert_that(zip_file.namelist()).is_equal_to(["handler.py", "lib/module.py"])
+        assert_that(zip_file.read("lib/module.py")).is_equal_to(b"VALUE = 1\n")
+        assert_that(zip_file.getinfo("handler.py").compress_type).is_equal_to(zipfile.ZIP_DEFLATED)
+
+    # archives only depend on the content of the files
+    os.utime(str(resources_dir.join("handler.py")), (0, 0))
+    assert_that(utils.zip_dir(str(resources_dir)).read()).is_equal_to(archive)
+    resources_dir.join("handler.py").write("def handler(event, context):\n    return\n")
+    assert_that(utils.zip_dir(str(resources_dir)).read()).is_not_equal_to(archive)
+
+
+def test_get_cached_zip_dir(mocker, tmpdir):
+    resources_dir = _create_resources_dir(tmpdir)
+    zip_dir_spy = mocker.spy(utils, "zip_dir")
+
+    zip_path = utils.get_cached_zip_dir(str(resources_dir))
+    assert_that(os.path.basename(zip_path)).is_equal_to("{0}.zip".format(utils.get_dir_digest(str(resources_dir))))
+    with open(zip_path, "rb") as zip_file:
+        assert_that(zip_file.read()).is_equal_to(utils.zip_dir(str(resources_dir)).read())
+
+    # the archive of the same files is taken from the cache
+    zip_dir_spy.reset_mock()
+    assert_that(utils.get_cached_zip_dir(str(resources_dir))).is_equal_to(zip_path)
+    zip_dir_spy.assert_not_called()
+
+    resources_dir.join("lib", "module.py").write("VALUE = 2\n")
+    assert_that(utils.get_cached_zip_dir(str(resources_dir))).is_not_equal_to(zip_path)
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_upload_resources_artifacts(mocker, tmpdir, monkeypatch, cache_enabled):
+    if not cache_enabled:
+        monkeypatch.setenv(metadata_cache.DISABLE_CACHE_ENV, "true")
+    resources_dir = _create_resources_dir(tmpdir)
+    tmpdir.join("resources", "config.json").write("{}")
+    bucket_mock = mocker.patch("pcluster.utils.boto3_clients.get_resource").return_value.Bucket.return_value
+
+    utils.upload_resources_artifacts("bucket", str(tmpdir.join("resources")))
+
+    bucket_mock.upload_file.assert_any_call(str(tmpdir.join("resources", "config.json")), "config.json")
+    if cache_enabled:
+        bucket_mock.upload_file.assert_any_call(
+            utils.get_cached_zip_dir(str(resources_dir)), "custom_resources_code/artifacts.zip"
+        )
+        bucket_mock.upload_fileobj.assert_not_called()
+    else:
+        bucket_mock.upload_fileobj.assert_called_with(mocker.ANY, "custom_resources_code/artifacts.zip")
+
+
+def test_upload_packaged_resources_artifacts(mocker, tmpdir):
+    resources_dir = _create_resources_dir(tmpdir)
+    bucket_mock = mocker.patch("pcluster.utils.boto3_clients.get_resource").return_value.Bucket.return_value
+
+    zip_paths = utils.get_cached_resources_artifacts(str(tmpdir.join("resources")))
+    assert_that(zip_paths).is_equal_to({str(resources_dir): utils.get_cached_zip_dir(str(resources_dir))})
+
+    # archives created in advance are uploaded without hashing the resources again
+    get_cached_zip_dir_spy = mocker.spy(utils, "get_cached_zip_dir")
+    utils.upload_resources_artifacts("bucket", str(tmpdir.join("resources")), zip_paths)
+    get_cached_zip_dir_spy.assert_not_called()
+    bucket_mock.upload_file.assert_called_with(zip_paths[str(resources_dir)], "custom_resources_code/artifacts.zip")
+
+
 @pytest.mark.parametrize(
     "architecture, supported_oses",
     [
@@ -538,6 +844,68 @@ def test_get_instance_types_info(boto3_stubber, capsys, instance_types, error_me
         assert_that(instance_types_info).is_equal_to(response_dict.get("InstanceTypes"))
 
 
+def test_get_instance_types_info_cache(boto3_stubber, monkeypatch):
+    """Verify that get_instance_types_info only describes the instance types not found in the metadata cache."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": "t2.micro"}, {"InstanceType": "c5.xlarge"}]},
+            expected_params={"InstanceTypes": ["t2.micro", "c5.xlarge"]},
+        ),
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": "m6g.xlarge"}]},
+            expected_params={"InstanceTypes": ["m6g.xlarge"]},
+        ),
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": "t2.micro"}]},
+            expected_params={"InstanceTypes": ["t2.micro"]},
+        ),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+    utils.get_instance_types_info(["t2.micro", "c5.xlarge"])
+    assert_that(utils.get_instance_types_info(["m6g.xlarge", "t2.micro"])).is_equal_to(
+        [{"InstanceType": "m6g.xlarge"}, {"InstanceType": "t2.micro"}]
+    )
+    assert_that(utils.get_instance_type("c5.xlarge")).is_equal_to({"InstanceType": "c5.xlarge"})
+
+    # A new process reads the info from the metadata cache, unless a refresh is requested
+    utils._get_instance_types_index.cache = {}
+    assert_that(utils.get_instance_type("m6g.xlarge")).is_equal_to({"InstanceType": "m6g.xlarge"})
+    metadata_cache.get_cache().refresh = True
+    assert_that(utils.get_instance_type("t2.micro")).is_equal_to({"InstanceType": "t2.micro"})
+
+
+def test_prefetch_instance_types_info(boto3_stubber, monkeypatch):
+    """Verify that prefetch_instance_types_info describes all the missing instance types in chunks."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    instance_types = ["type{0:03d}.large".format(index) for index in range(150)]
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": "type000.large"}]},
+            expected_params={"InstanceTypes": ["type000.large"]},
+        ),
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": instance_type} for instance_type in instance_types[1:101]]},
+            expected_params={"InstanceTypes": instance_types[1:101]},
+        ),
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response="Invalid instance type",
+            expected_params={"InstanceTypes": instance_types[101:]},
+            generate_error=True,
+        ),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+    utils.get_instance_type("type000.large")
+    utils.prefetch_instance_types_info(list(reversed(instance_types)) + [None, "type001.large"])
+    assert_that(utils.get_instance_types_info(instance_types[:101])).is_length(101)
+
+
 @pytest.mark.parametrize(
     "instance_type, supported_architectures, error_message",
     [
@@ -702,14 +1070,16 @@ def test_validate_pcluster_version_based_on_ami_name(mocker, ami_name, error_exp
 @pytest.mark.parametrize("scheduler", ["slurm", "sge", "torque", "awsbatch"])
 def test_get_supported_compute_instance_types(mocker, scheduler):
     """Verify that the correct function to get supported instance types is called based on the scheduler used."""
-    batch_function_patch = mocker.patch("pcluster.utils.get_supported_batch_instance_types")
-    traditional_scheduler_function_patch = mocker.patch("pcluster.utils.get_supported_instance_types")
+    batch_function_patch = mocker.patch("pcluster.utils.get_supported_batch_instance_types", return_value=["optimal"])
+    traditional_scheduler_function_patch = mocker.patch("pcluster.utils.get_instance_type_offerings")
+    utils.get_supported_compute_instance_types(scheduler)
+    # Batch supported instance types are computed once per region
     utils.get_supported_compute_instance_types(scheduler)
     if scheduler == "awsbatch":
         assert_that(batch_function_patch.call_count).is_equal_to(1)
         traditional_scheduler_function_patch.assert_not_called()
     else:
-        assert_that(traditional_scheduler_function_patch.call_count).is_equal_to(1)
+        assert_that(traditional_scheduler_function_patch.call_count).is_equal_to(2)
         batch_function_patch.assert_not_called()
 
 
@@ -905,6 +1275,26 @@ def test_get_supported_instance_types(mocker, boto3_stubber, generate_error):
         error_patch.assert_not_called()
 
 
+def test_get_instance_type_offerings(boto3_stubber, monkeypatch):
+    """Verify that instance type offerings are retrieved once per region and indexed."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_type_offerings",
+            expected_params={},
+            response={"InstanceTypeOfferings": [{"InstanceType": "c5.xlarge"}, {"InstanceType": "m6g.xlarge"}]},
+        )
+    ]
+    boto3_stubber("ec2", mocked_requests)
+    offerings = utils.get_instance_type_offerings()
+    assert_that(offerings).is_instance_of(utils.InstanceTypeIndex)
+    assert_that(utils.get_instance_type_offerings()).is_same_as(offerings)
+    assert_that(utils.get_supported_compute_instance_types("slurm")).is_same_as(offerings)
+    assert_that("m6g.xlarge" in offerings).is_true()
+    assert_that("t2.micro" in offerings).is_false()
+    assert_that(utils.get_supported_instance_types()).is_equal_to(["c5.xlarge", "m6g.xlarge"])
+
+
 @pytest.mark.parametrize(
     "candidates, knowns",
     [